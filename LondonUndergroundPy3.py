@@ -4,18 +4,34 @@
 # Description     :  This program allows you to display a live London Underground departure board for any Tube station.
 # Python 3 Required.
 
+import sys
+import time
+from startup import profile, reachable, wait_until
+# --StartupProfile: time the imports below, and then each start up phase until the first frame is drawn.
+if "--StartupProfile" in sys.argv:
+	profile.start()
 import argparse
 import inspect
 import json
 import os
-import time
 from datetime import datetime
 from urllib.request import urlopen, Request
 
 from PIL import ImageFont, Image, ImageDraw
 from luma.core import cmdline
-from luma.core.image_composition import ImageComposition, ComposableImage
+from luma.core.image_composition import ComposableImage
+import oled_device
+from composition import create_composition, present
+from frame_scheduler import FrameScheduler, TickClock
+from render_governor import RenderGovernor
+from clock_sprites import ClockSprites
+from fonts import truetype, text_sprite
+from fetch_scheduler import shared as fetches, BackgroundFetch
+from snapshot import Snapshot, default_path
+from energy_saver import EnergySaver
+from departures import Departure, epoch_from_iso, hhmm
 from luma.core.render import canvas
+profile.mark("imported")
 
 
 ###
@@ -49,10 +65,13 @@ parser.add_argument("-d","--Delay", help="How long the display will pause before
 parser.add_argument("-r","--RecoveryTime", help="How long the display will wait before attempting to get new data again after previously failing; default is 100, must be greater than 0.", type=check_positive,default=100)
 parser.add_argument("-n","--NumberOfCards", help="The maximum number of cards you will see before forcing a new data retrieval, a limit is recommend to prevent cycling through data which may become out of data or going too far into scheduled trains; default is 9, must be greater than 0.", type=check_positive,default=9)
 parser.add_argument("-y","--Rotation", help="Defines which way up the screen is rendered; default is 0", type=int,default=0,choices=[0,2])
+parser.add_argument("--Width", help="The width of the panel in pixels; an SSD1322 is 256, 128 or 64 wide, the emulated displays can be any width; default is 256.", type=check_positive, default=256)
+parser.add_argument("--Height", help="The height of the panel in pixels; as many rows as fit above the clock are shown. An SSD1322 is 64, 48 or 32 high, the emulated displays can be any height (e.g. 128 to try a taller layout); default is 64.", type=check_positive, default=64)
 parser.add_argument("-l","--RequestLimit", help="Defines the minium amount of time the display must wait before making a new data request; default is 55(seconds)", type=check_positive,default=55)
 parser.add_argument("-z","--StaticUpdateLimit", help="Defines the amount of time the display will wait before updating the expected arrival time (based upon it's last known predicted arrival time); default is  15(seconds), this should be lower than your 'RequestLimit'", type=check_positive,default=15)
-parser.add_argument("-e","--EnergySaverMode", help="To save screen from burn in and prolong it's life it is recommend to have energy saving mode enabled. 'off' is default, between the hours set the screen will turn off. 'dim' will turn the screen brightness down, but not completely off. 'none' will do nothing and leave the screen on; this is not recommend, you can change your active hours instead.", type=str,choices=["none","dim","off"],default="off")
+parser.add_argument("-e","--EnergySaverMode", help="To save screen from burn in and prolong it's life it is recommend to have energy saving mode enabled. 'off' is default, between the hours set the screen will turn off. 'dim' will turn the screen brightness down and show just the clock, but not completely off. 'none' will do nothing and leave the screen on; this is not recommend, you can change your active hours instead.", type=str,choices=["none","dim","off"],default="off")
 parser.add_argument("-i","--InactiveHours", help="The period of time for which the display will go into 'Energy Saving Mode' if turned on; default is '23:00-07:00'", type=check_time,default="23:00-07:00")
+parser.add_argument("--WarmUpMinutes", default=2, dest='WarmUpMinutes', type=check_positive, help="How many minutes before the end of the inactive hours to start fetching data, so the board is ready to show straight away; default 2.")
 parser.add_argument("-u","--UpdateDays", help="The number of days for which the Pi will wait before rebooting and checking for a new update again during your energy saving period; default 1 day (every day check).", type=check_positive, default=1)
 parser.add_argument("-x","--ExcludeLines", default="", help="List any Lines you do not wish to view. Make sure to capitalise correctly and simply put a single space between each, for example 'Bakerloo Circle'; default is nothing, ie show every service.",  nargs='*')
 parser.add_argument("-p","--Direction", help="For stations which have inbound and outbound services, do you wish to view both directions or only one?; default is both directions", choices=['inbound','outbound','both'],default='both')
@@ -61,11 +80,20 @@ parser.add_argument('--HideIndex', dest='ShowIndex', action='store_false',help="
 parser.add_argument("--IncreasedAnimations", help="If you wish to show an additional animation message which shows 'This is a [Line Name] line train, to [destination]' turn it on with the following; by default this animation isn't shown as it will be the same for a lot of services.", dest='ReducedAnimations', action='store_false', default=True)
 parser.add_argument("--FixNextToArrive",dest='FixToArrive', action='store_true', default=False, help="Keep the train next arrive at the very top of the display until it has left; by default false")
 parser.add_argument('--no-splashscreen', dest='SplashScreen', action='store_false',help="Do you wish to see the splash screen at start up; recommended and on by default.")
+parser.add_argument("--SplashTimeout", default=30, dest='SplashTimeout', type=check_positive, help="The longest the splash screen waits, in seconds, for the network and the first data before starting the board anyway; default 30.")
+parser.add_argument("--SnapshotFile", dest='SnapshotFile', default=None, help="Where the last data fetched is saved, for the board to be shown straight away the next time it starts; by default a file per station in ~/.cache/departureboard.")
+parser.add_argument('--no-snapshot', dest='Snapshot', action='store_false', help="Do not save the last data fetched, so the board always waits for fresh data at start up.")
+parser.add_argument("--StartupProfile", dest='StartupProfile', action='store_true', help="Prints how long each import and each start up phase took, up to the first frame drawn; for finding what slows start up.")
 parser.add_argument('--Warning', dest='warning', default=False, action='store_true',help="Do you want the warning 'STAND BACK TRAIN APPROACHING' message to flash; off by default.")
-parser.add_argument("--Display", default="ssd1322", choices=['ssd1322','pygame','capture','gifanim'], help="Used for development purposes, allows you to switch from a physical display to a virtual emulated one; default 'ssd1322'")
-parser.add_argument("--max-frames", default=60,dest='maxframes', type=check_positive, help="Used only when using gifanim emulator, sets how long the gif should be.")
+parser.add_argument("--Display", default="ssd1322", choices=['ssd1322','pygame','capture','gifanim','gifstream','raw'], help="Used for development purposes, allows you to switch from a physical display to a virtual emulated one; 'gifstream' and 'raw' write each frame to --filename as it is shown, as an animated GIF or an uncompressed 4-bit dump for golden-image tests; default 'ssd1322'")
+parser.add_argument("--Compositor", default="pil", choices=['pil','numpy'], help="How the scrolling rows are composed each frame; 'numpy' is faster on a Pi but needs numpy installed; default 'pil'")
+parser.add_argument("--Accelerated", dest='Accelerated', action='store_true', help="Pack frames for the SSD1322 with NumPy rather than a pixel at a time; with --Compositor numpy the composed frame goes to the panel without a round trip through PIL. Needs numpy installed; off by default.")
+parser.add_argument("--FixedQuality", dest='FixedQuality', action='store_true', help="Turn off the render governor, which lowers the frame rate and then the animations when the Pi cannot keep up, restoring them once it can.")
+parser.add_argument("--Preview", type=check_positive, metavar='PORT', help="Serve what is on the panel over HTTP on this port, e.g. 8080: a live page at /, /frame.png, an MJPEG stream at /stream.mjpg and changed regions as server-sent events at /events; off by default.")
+parser.add_argument("--DedupeFrames", dest='DedupeFrames', action='store_true', help="Used only when using the gifstream or raw emulators, merges identical consecutive frames into one longer frame.")
+parser.add_argument("--max-frames", default=60,dest='maxframes', type=check_positive, help="Used only when using the gifanim, gifstream or raw emulators, sets how many frames to capture.")
 parser.add_argument("--no-console-output",dest='NoConsole', action='store_true', help="Used to stop the program outputting anything to console that isn't an error message, you might want to do this if your logging the program output into a file to record crashes.")
-parser.add_argument("--filename",dest='filename', default="output.gif", help="Used mainly for development, if using a gifanim display, this can be used to set the output gif file name, this should always end in .gif.")
+parser.add_argument("--filename",dest='filename', default="output.gif", help="Used mainly for development, if using a gifanim, gifstream or raw display, this can be used to set the output file name, this should end in .gif (or e.g. .raw for a raw dump).")
 #parser.add_argument("--no-pip-update",dest='NoPipUpdate',  action='store_true', default=False, help="By default, the program will update any software dependencies/ pip libraries, this is to ensure your display still works correctly and has the required security updates. However, if you wish you can use this tag to disable pip updates and downloads. ")
 parser.add_argument("-a","--APIID", help="LEGACY - THIS IS NO LONGER USED OR NEEDED", type=str)
 
@@ -74,12 +102,32 @@ parser.add_argument("-a","--APIID", help="LEGACY - THIS IS NO LONGER USED OR NEE
 requiredNamed = parser.add_argument_group('required named arguments')
 requiredNamed.add_argument("-k","--APIKey", help="Your Transport for London API Key, you can get your own at: https://api-portal.tfl.gov.uk/signup", type=str,required=True)
 requiredNamed.add_argument("-s","--StationID", help="The London Underground Code for the specific station you wish to display.", type=str,required=True)
-Args = parser.parse_args()
+# Parses the start up paramaters; argv defaults to the command line.
+def parse_args(argv=None):
+	args = parser.parse_args(argv)
+	if args.Display == 'ssd1322' and (args.Width, args.Height) not in oled_device.SSD1322_SIZES:
+		parser.error("an SSD1322 is 256, 128 or 64 pixels wide and 64, 48 or 32 high, not %d x %d; other sizes need an emulated --Display" % (args.Width, args.Height))
+	return args
+
+# The start up paramaters, set by configure().
+Args = None
+# The last data fetched, saved for the board to be shown straight away the next time it starts; set by configure().
+snapshot = None
+
+
+# Applies the start up paramaters (parsed arguments or an argv list, by default the command line).
+def configure(config=None):
+	global Args, snapshot
+	Args = config if isinstance(config, argparse.Namespace) else parse_args(config)
+	snapshot = None
+	if Args.Snapshot:
+		snapshot = Snapshot(Args.SnapshotFile or default_path("tube-%s" % Args.StationID), settings=vars(Args))
+	return Args
 
 ## Defines all the programs "global" variables 
 # Defines the basic font used throughout most of the text boxes in the program
 BasicFontHeight = 14
-BasicFont = ImageFont.truetype("%s/resources/lower.ttf" %(os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe()))) ), BasicFontHeight)
+BasicFont = truetype("lower.ttf", BasicFontHeight)
 
 
 ###
@@ -98,48 +146,63 @@ class LiveTimeStud():
 		return False
 		
 	
+# Calls the TfL API and returns the raw list of arrivals (dicts) for a StopPoint; does not depend on the start up paramaters.
+def GetArrivals(stop_point_id, app_id, app_key):
+	url = "https://api.tfl.gov.uk/StopPoint/%s/Arrivals?app_id=%s&app_key=%s" % (stop_point_id, app_id, app_key)
+	req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
+	with urlopen(req) as conn:
+		return json.loads(conn.read())
+
+
+# The wall clock departure times are compared against, in epoch seconds; the render benchmark swaps in its simulated clock.
+wall_time = time.time
+
 # Used to get live data from the TfL API and represent a specific services and it's details.
-class LiveTime(object):
+class LiveTime(Departure):
+	__slots__ = ("Via", "DisplayTime", "LastStaticUpdate")
 	# The last time an API call was made to get new data.
 	LastUpdate = datetime.now()
 	
 	# * Change this method to implement your own API *
 	def __init__(self, Data):
-		self.Destination =  str(Data['towards'])
-		self.ExptArrival = self.convertUTCtoLocal(str(Data['expectedArrival']))
+		# The API gives times in UTC; they are parsed once into epoch seconds, so BST needs no correcting.
+		super().__init__(ID=str(Data['id']), Destination=str(Data['towards']), Expected=epoch_from_iso(Data['expectedArrival']))
 		self.DisplayTime = self.GetDisplayTime()
-		self.ID =  str(Data['id'])
 		self.Via = "This is a %s line train, to %s" % (str(Data['lineName']), str(Data['destinationName'] if 'destinationName' in Data else str(Data['towards'])))
 
-	# The API gives time formats in UTC format, but during BST all times are one hour out. This corrects the issue.
-	def convertUTCtoLocal(self, dateTimeInput):
-		datetimeTemp = datetime.strptime(dateTimeInput, '%Y-%m-%dT%H:%M:%SZ')
-		datetimeTemp = datetimeTemp + (datetime.now() - datetime.utcnow())
-		return datetimeTemp.strftime('%Y-%m-%dT%H:%M:%S')
-
-
 	#Returns the value to display the time on the board.
 	def GetDisplayTime(self):
 		# Last time the display screen was updated to reflect the new time of arrival.
-		self.LastStaticUpdate = datetime.now()
-		if self.TimeInMin() <= 1:
+		self.LastStaticUpdate = wall_time()
+		minutes = self.minutes_until(self.LastStaticUpdate)
+		if minutes <= 1:
 			return ' Due'
-		elif self.TimeInMin() >=15 :
-			return ' ' + datetime.strptime(self.ExptArrival, '%Y-%m-%dT%H:%M:%S').strftime("%H:%M" if (Args.TimeFormat==24) else  "%I:%M")
+		elif minutes >=15 :
+			return ' ' + hhmm(self.due(), Args.TimeFormat)
 		else:
-			return  ' %d mins' % self.TimeInMin()	
+			return  ' %d mins' % minutes
 
 	def TimeInMin(self):
-		return (datetime.strptime(self.ExptArrival, '%Y-%m-%dT%H:%M:%S') - datetime.now()).total_seconds() / 60
+		return self.minutes_until(wall_time())
 
-	# Returns true or false dependent upon if the last time an API data call was made was over the request limit; to prevent spamming the API feed.
+	# Returns the services saved by the last successful GetData(), without those that have left and with their times brought up to date; [] if there are none.
+	@staticmethod
+	def FromSnapshot():
+		if snapshot is None:
+			return []
+		services, extra = snapshot.load(LiveTime, wall_time())
+		for service in services:
+			service.DisplayTime = service.GetDisplayTime()
+		return services
+
+	# Returns true or false dependent upon if the last time an API data call was made was over the request limit; to prevent spamming the API feed. Fetches are also spaced out across every board in the process.
 	@staticmethod
 	def TimePassed():
-		return (datetime.now() - LiveTime.LastUpdate).total_seconds() > Args.RequestLimit
+		return (datetime.now() - LiveTime.LastUpdate).total_seconds() > Args.RequestLimit and fetches.may_fetch()
 
 	# Return true or false dependent upon if the last time the display was updated was over the static update limit. This prevents updating the display to frequently to increase performance.
 	def TimePassedStatic(self):
-		return ("min" in self.DisplayTime) and (datetime.now() - self.LastStaticUpdate).total_seconds() > Args.StaticUpdateLimit 
+		return ("min" in self.DisplayTime) and wall_time() - self.LastStaticUpdate > Args.StaticUpdateLimit
 
 	# Calls the API and gets the data from it, returning a list of LiveTime objects to be used in the program.
 	# * Change this method to implement your own API *
@@ -148,29 +211,28 @@ class LiveTime(object):
 		LiveTime.LastUpdate = datetime.now()
 		services = []
 
-		url = "https://api.tfl.gov.uk/StopPoint/%s/Arrivals?app_id=%s&app_key=%s" % (Args.StationID, Args.APIKey, Args.APIKey)
-		req = Request(url, headers={"User-Agent": "Mozilla/5.0"})
 		try:
-			with urlopen(req) as conn:
-				tempServices = json.loads(conn.read())
-				for service in tempServices:
+			with fetches.slot("tube %s" % Args.StationID):
+				for service in GetArrivals(Args.StationID, Args.APIKey, Args.APIKey):
 					# If not in excluded services list, convert custom API object to LiveTime object and add to list.
 					if str(service['lineName']) not in Args.ExcludeLines:
 						if Args.Direction == 'both' or ("direction" in service and Args.Direction == str(service["direction"])):
 							services.append(LiveTime(service))
 
-			services.sort(key=lambda x: x.TimeInMin())
+				services.sort(key=lambda x: x.TimeInMin())
 
-			if Args.ShowIndex:
-				x = 1
-				for service in services:
-					if x <= 9: 
-						service.Destination = str(x) + ". " + service.Destination
-					else:
-						service.Destination = str(x) + "." + service.Destination
-					x = x + 1
+				if Args.ShowIndex:
+					x = 1
+					for service in services:
+						if x <= 9: 
+							service.Destination = str(x) + ". " + service.Destination
+						else:
+							service.Destination = str(x) + "." + service.Destination
+						x = x + 1
 	
-			return services
+				if snapshot is not None:
+					snapshot.save(services)
+				return services
 		except Exception as e:
 			print("GetData() ERROR")
 			print(str(e))
@@ -186,13 +248,11 @@ class LiveTime(object):
 # Used to create the time and service number on the board or any other basic text box.
 class TextImage():
 	def __init__(self, device, text):
-		self.image = Image.new(device.mode, (device.width, 16))
-		draw = ImageDraw.Draw(self.image)
-		draw.text((0, 0), text, font=BasicFont, fill="white")
+		# Shared with every board in the process; the image is only ever composed, never drawn on.
+		self.image, length = text_sprite(text, BasicFont, (device.width, 16), device.mode)
 	
-		self.width = 5 + int(draw.textlength(text, BasicFont))
+		self.width = 5 + int(length)
 		self.height = 5 + BasicFontHeight
-		del draw
 
 # Used to create the destination and via board.
 class TextImageComplex():
@@ -257,21 +317,31 @@ class NoService():
 ###
 
 # Used to ensure that only 1 animation is playing at any given time, apart from at the start; where all three can animate in.
+# A count of busy tasks is kept alongside each task's state, so checking is O(1) however many rows there are.
 class Synchroniser():
 	def __init__(self):
 		self.synchronised = {}
+		self.busyCount = 0
 
 	def busy(self, task):
-		self.synchronised[id(task)] = False
+		self.set(task, False)
 
 	def ready(self, task):
-		self.synchronised[id(task)] = True
+		self.set(task, True)
+
+	def set(self, task, ready):
+		key = id(task)
+		if self.synchronised.get(key, True) != ready:
+			self.busyCount += -1 if ready else 1
+		self.synchronised[key] = ready
+
+	# Used when a row is deleted, so it no longer holds the others up (and a new row given the same id starts clean).
+	def forget(self, task):
+		if self.synchronised.pop(id(task), True) == False:
+			self.busyCount -= 1
 
 	def is_synchronised(self):
-		for task in self.synchronised.items():
-			if task[1] == False:
-				return False
-		return True
+		return self.busyCount == 0
 
 
 ###
@@ -304,6 +374,9 @@ class ScrollTime():
 		self.image_composition = image_composition
 		self.rectangle = ComposableImage(RectangleCover(device).image, position=(0,16 * position + 16))
 		self.CurrentService = service
+		# The card this row is expected to change to next, rendered ahead of time while idle.
+		self.nextCard = None
+		self.nextCardChecked = False
 		
 		self.generateCard(service)
 		
@@ -322,6 +395,7 @@ class ScrollTime():
 		
 		self.delay = scroll_delay
 		self.ticks = 0
+		self.step = 1.0
 		self.state = self.OPENING_SCROLL if service.ID != 0 else self.STUD
 		self.synchroniser = synchroniser
 		self.render()
@@ -329,15 +403,43 @@ class ScrollTime():
 
 	# Generates all the Images (Text boxes) to be drawn on the display.
 	def generateCard(self,service):
+		self.IDestination, self.IDisplayTime = self.renderRow(service)
+
+	# Renders the destination/via and time text boxes for a service.
+	def renderRow(self, service):
 		displayTimeTemp = TextImage(device, service.DisplayTime)
 		IDestinationTemp  = TextImageComplex(device, service.Destination,service.Via, displayTimeTemp.width)
 
-		self.IDestination =  ComposableImage(IDestinationTemp.image.crop((0,0,IDestinationTemp.width + 10,16)), position=(0, 16 * self.position))
-		self.IDisplayTime =  ComposableImage(displayTimeTemp.image, position=(device.width - displayTimeTemp.width, 16 * self.position))
-		
+		IDestination =  ComposableImage(IDestinationTemp.image.crop((0,0,IDestinationTemp.width + 10,16)), position=(0, 16 * self.position))
+		IDisplayTime =  ComposableImage(displayTimeTemp.image, position=(device.width - displayTimeTemp.width, 16 * self.position))
+		return IDestination, IDisplayTime
+
+	# Renders every image needed to change from previous_service to service; (IStaticOld, IDestination, IDisplayTime).
+	def renderCard(self, service, previous_service):
+		IStaticOld = ComposableImage(StaticTextImage(device,service, previous_service).image, position=(0, (16 * self.position)))
+		return (IStaticOld,) + self.renderRow(service)
+
+	# Renders the card this row will most likely change to next while it is idle, so changeCard only has to swap images in.
+	def prepareNextCard(self):
+		if self.nextCardChecked:
+			return
+		self.nextCardChecked = True
+		service = self.Controller.peekNextService(self.position + 1)
+		if service is not None and service.ID != "0" and service.ID != self.CurrentService.ID:
+			self.nextCard = (service, self.CurrentService, service.DisplayTime, self.CurrentService.DisplayTime) + self.renderCard(service, self.CurrentService)
+
+	# Returns the images for changing to newService, using the pre-rendered card if it still matches.
+	def takeCard(self, newService):
+		card, self.nextCard = self.nextCard, None
+		self.nextCardChecked = False
+		if card is not None and card[:4] == (newService, self.CurrentService, newService.DisplayTime, self.CurrentService.DisplayTime):
+			return card[4:]
+		return self.renderCard(newService, self.CurrentService)
 		
 	# Called when you have new/updated information from an API call and want to update the objects predicted arrival time.
 	def updateCard(self, newService, device):
+		self.nextCard = None
+		self.nextCardChecked = False
 		self.state = self.SCROLL_DECIDER
 		self.synchroniser.ready(self)
 		#Need to regenerate both because the width of the time displayed can shrink. 
@@ -358,12 +460,14 @@ class ScrollTime():
 	# Called when you want to change the row from one service to another.
 	def changeCard(self, newService, device):
 		if newService.ID == "0" and self.CurrentService.ID == "0":
+			self.nextCard = None
+			self.nextCardChecked = False
 			self.state = self.STUD
 			self.synchroniser.ready(self)
 			return 
 				
 		self.synchroniser.busy(self)
-		self.IStaticOld =  ComposableImage(StaticTextImage(device,newService, self.CurrentService).image, position=(0, (16 * self.position)))
+		self.IStaticOld, IDestination, IDisplayTime = self.takeCard(newService)
 	
 		self.image_composition.add_image(self.IStaticOld)
 		self.image_composition.add_image(self.rectangle)
@@ -379,7 +483,7 @@ class ScrollTime():
 			
 		self.image_composition.refresh()
 
-		self.generateCard(newService)
+		self.IDestination, self.IDisplayTime = IDestination, IDisplayTime
 		self.CurrentService = newService
 		self.max_pos = self.IDestination.width
 
@@ -388,6 +492,7 @@ class ScrollTime():
 	
 	# Used when you want to delete the row/card/object.
 	def delete(self):
+		self.synchroniser.forget(self)
 		try:
 			self.image_composition.remove_image(self.IStaticOld)
 			self.image_composition.remove_image(self.rectangle)
@@ -401,7 +506,8 @@ class ScrollTime():
 		self.image_composition.refresh() 
 
 	# Called upon each time you want to get the next frame for the display.
-	def tick(self):
+	def tick(self, step=1.0):
+		self.step = step
 		#Update X min till arrival.
 		if self.CurrentService.TimePassedStatic() and (self.state == self.SCROLL_DECIDER or self.state == self.SCROLLING_WAIT or self.state == self.SCROLLING or self.state == self.WAIT_SYNC):
 			self.image_composition.remove_image(self.IDisplayTime)
@@ -418,7 +524,7 @@ class ScrollTime():
 		elif self.state == self.OPENING_SCROLL:
 			if self.image_y_posA < 16:              
 				self.render()
-				self.image_y_posA += self.speed
+				self.image_y_posA += self.speed * self.step
 			else:
 				self.state = self.OPENING_END
 
@@ -441,7 +547,9 @@ class ScrollTime():
 					if self.synchroniser.is_synchronised():
 						self.synchroniser.busy(self)
 						self.Alternator = 0
-						if Args.ReducedAnimations:
+						if Args.ReducedAnimations or governor.freeze_scrolling:
+							self.state = self.WAIT_SYNC
+						elif governor.partial_animations and self.position != 0:
 							self.state = self.WAIT_SYNC
 						elif self.CurrentService.ID == "0":
 							self.synchroniser.ready(self)
@@ -456,7 +564,7 @@ class ScrollTime():
 		elif self.state == self.SCROLLING:
 			if self.image_x_pos < self.max_pos:
 				self.render()
-				self.image_x_pos += self.speed
+				self.image_x_pos += self.speed * self.step
 			else:
 				self.state = self.WAIT_SYNC
 				
@@ -465,6 +573,7 @@ class ScrollTime():
 				self.image_x_pos = 0
 				self.render()
 			else:
+				self.prepareNextCard()
 				if not self.is_waiting():
 					self.Controller.requestCardChange(self, self.position + 1)
 
@@ -491,7 +600,7 @@ class ScrollTime():
 		elif self.state == self.STUD_SCROLL:
 			if self.image_y_posA < 16:              
 				self.render()
-				self.image_y_posA += self.speed
+				self.image_y_posA += self.speed * self.step
 			else:
 				self.state = self.STUD_END
 
@@ -506,6 +615,7 @@ class ScrollTime():
 			self.synchroniser.ready(self)
 			self.state = self.STUD
 		elif self.state == self.STUD:
+			self.prepareNextCard()
 			if not self.is_waiting():
 				self.Controller.requestCardChange(self, self.position + 1)
 
@@ -528,9 +638,27 @@ class ScrollTime():
 	# Sets the image offest for the animation, telling it how to render.
 	def render(self):
 		if(self.state == self.SCROLLING or self.state == self.WAIT_SYNC):
-			self.IDestination.offset = (self.image_x_pos, 0)
+			self.IDestination.offset = (round(self.image_x_pos), 0)
+			self.image_composition.mark_dirty(self.IDestination)
 		if(self.state == self.OPENING_SCROLL or self.state == self.STUD_SCROLL):
-			self.IStaticOld.offset= (0,self.image_y_posA)
+			self.IStaticOld.offset= (0,round(self.image_y_posA))
+			self.image_composition.mark_dirty(self.IStaticOld)
+
+	# Returns how many upcoming ticks will change nothing on screen, so the main loop can sleep through them. None if it is waiting on another row.
+	def idle_ticks(self):
+		if self.CurrentService.TimePassedStatic() and (self.state == self.SCROLL_DECIDER or self.state == self.SCROLLING_WAIT or self.state == self.SCROLLING or self.state == self.WAIT_SYNC):
+			return 0
+		if self.state == self.SCROLL_DECIDER:
+			return max(0, self.delay - self.ticks) if self.synchroniser.is_synchronised() else None
+		if self.state == self.WAIT_SYNC and self.image_x_pos != 0:
+			return 0
+		if self.state in (self.WAIT_SYNC, self.STUD) and not self.nextCardChecked:
+			return 0
+		if self.state in (self.WAIT_OPENING, self.SCROLLING_WAIT, self.WAIT_SYNC, self.WAIT_STUD, self.STUD):
+			return max(0, self.delay - self.ticks)
+		if self.state == self.TRAIN_APPROACHING and self.Alternator != 0:
+			return 8 - self.Alternator % 9
+		return 0
 	
 	# Used to reset the image on the display.
 	def refresh(self):
@@ -558,7 +686,7 @@ class ScrollTime():
 		
 	# Used to add a time delay between animations.
 	def is_waiting(self):
-		self.ticks += 1
+		self.ticks += self.step
 		if self.ticks > self.delay:
 			self.ticks = 0
 			return False
@@ -568,115 +696,159 @@ class ScrollTime():
 ## Board Controller
 ## Defines the board which controls what each off the rows in the display will show at any time.
 ###
+# Works out how many 16 pixel rows fit on the panel above the clock; a row fits when its text (less descenders) clears the clock.
+def row_count(device):
+	ascent = BasicFont.getmetrics()[0]
+	return max(1, (device.height - 16 - ascent) // 16 + 1)
+
 class boardFixed():
-	def __init__(self, image_composition, scroll_delay, device):
-		self.Services = LiveTime.GetData()   
+	# services is data already fetched (e.g. by Splash()); by default it is fetched here. pending is a BackgroundFetch whose data replaces services once it arrives, e.g. when starting from a snapshot.
+	def __init__(self, image_composition, scroll_delay, device, clock=time.monotonic, services=None, pending=None):
+		self.Services = LiveTime.GetData() if services is None else services
+		self.pending = pending   
 		self.synchroniser = Synchroniser()
 		self.scroll_delay = scroll_delay
 		self.image_composition = image_composition
 		self.device = device
 		self.ticks = 0
+		# Rows advance by the ticks of real time elapsed, so the animation keeps its pace when frames run late.
+		self.tickClock = TickClock(clock=clock)
 		self.setInitalCards()
 		self.State = "alive"
 	
 		NoServiceTemp = NoService(device)
 		self.NoServices = ComposableImage(NoServiceTemp.image, position=(int(device.width/2- NoServiceTemp.width/2),int(device.height/2-NoServiceTemp.height/2)))
 
-		self.top.addPartner(self.middel)
-		self.middel.addPartner(self.bottom)
+		for row, partner in zip(self.rows, self.rows[1:]):
+			row.addPartner(partner)
 
 	
 	# Set up the cards for the initial starting animation.
 	def setInitalCards(self):
 
-		self.top = ScrollTime(image_composition, len(self.Services) >= 1 and self.Services[0] or LiveTimeStud(),LiveTimeStud(), self.scroll_delay, self.synchroniser, device, 0, self)
-		self.middel = ScrollTime(image_composition, len(self.Services) >= 2 and self.Services[1] or LiveTimeStud(),LiveTimeStud(), self.scroll_delay, self.synchroniser, device, 1,self)
-		self.bottom = ScrollTime(image_composition, len(self.Services) >= 3 and self.Services[2] or LiveTimeStud(),LiveTimeStud(), self.scroll_delay, self.synchroniser, device, 2, self)
+		# As many rows as fit on the panel, top to bottom.
+		self.rows = [ScrollTime(image_composition, len(self.Services) > position and self.Services[position] or LiveTimeStud(),LiveTimeStud(), self.scroll_delay, self.synchroniser, device, position, self) for position in range(row_count(device))]
 		
-		self.x = len(self.Services) < 3 and len(self.Services) or 3
+		self.x = min(len(self.Services), len(self.rows))
+
+	# Takes the board off the display, e.g. for the energy saver; it is not used again afterwards.
+	def remove(self):
+		for row in self.rows:
+			row.delete()
+		self.rows = []
+		if self.NoServices in self.image_composition.composed_images:
+			self.image_composition.remove_image(self.NoServices)
+
+	# Starts the rows over with new services, for a board that had none to show.
+	def restart(self, services):
+		self.remove()
+		self.Services = services
+		self.synchroniser = Synchroniser()
+		self.ticks = 0
+		self.setInitalCards()
+		for row, partner in zip(self.rows, self.rows[1:]):
+			row.addPartner(partner)
 
 	# Called upon every time a new frame is needed.
 	def tick(self):
+		self.step = self.tickClock.step()
 		#If no data can be found.
 		if len(self.Services) == 0:
-			if self.ticks == 0:
+			if self.ticks == 0 and self.NoServices not in self.image_composition.composed_images:
 				self.image_composition.add_image(self.NoServices)
 
+			# Started before its data came (e.g. woken by the energy saver while its fetch was still out): show no services
+			# until the background fetch lands rather than fetching again.
+			if self.pending is not None:
+				if self.pending.done():
+					services, self.pending = self.pending.result(), None
+					if services:
+						self.restart(services)
+				return
+
 			#Wait a period of time then try getting new data again.
 			if not self.is_waiting():
-				self.top.delete()
-				del self.top
-				self.middel.delete()
-				del self.middel
-				self.bottom.delete()
-				del self.bottom
+				for row in self.rows:
+					row.delete()
+				self.rows = []
 				self.image_composition.remove_image(self.NoServices)
 				self.State = "dead"
 		else:
 			# Tell all rows of the display next frame is wantted.
-			self.top.tick()
-			self.middel.tick()
-			self.bottom.tick()
+			for row in self.rows:
+				row.tick(self.step)
 	
 	# Called when a row has completed one cycle of it's states and requests to change card, here the program decides what to do.
 	def requestCardChange(self, card, row):
 		# If it has cycled through all cards, cycle from start again, unless enough time has passed for a new API request.
 		if (self.x > Args.NumberOfCards or self.x >len(self.Services)-1):
 			self.x = 1 if Args.FixToArrive else 0
-			if LiveTime.TimePassed():  
+			if self.pending is not None:
+				# Swap in the fresh data once the background fetch has it, carrying on with what is shown if it failed.
+				if self.pending.done():
+					self.Services = self.pending.result() or self.Services
+					self.pending = None
+					print_safe("New Data Retrieved %s" % datetime.now().time())
+			elif LiveTime.TimePassed():  
 				self.Services = LiveTime.GetData()
 				print_safe("New Data Retrieved %s" % datetime.now().time())
 		
-		# If there are more rows (3) than there is services scheduled show nothing.
+		# If there are more rows than there is services scheduled show nothing.
 		if row > len(self.Services):       
 			card.changeCard(LiveTimeStud(),device)
 			return
-		# If there is exactly 3 or less services the order in which they appear on the display is fixed to the order they will arrive in.
-		if len(self.Services) <= 3:
-			if self.Services[row-1].ID == card.CurrentService.ID:
-				card.updateCard(self.Services[row-1],device)
-			else:
-				card.changeCard(self.Services[row-1],device)
+		service = self.serviceFor(row, self.x)
+		if service.ID == card.CurrentService.ID:
+			card.updateCard(service,device)
 		else:
-			# If not they will cycled around showing whatever card is next.
-			if Args.FixToArrive and row == 1:
-				if self.Services[0].ID == card.CurrentService.ID:
-					card.updateCard(self.Services[0],device)
-				else:
-					card.changeCard(self.Services[0],device)
-			else:
-				if self.Services[self.x % len(self.Services)].ID == card.CurrentService.ID:
-					card.updateCard(self.Services[self.x % len(self.Services)],device)
-				else:
-					card.changeCard(self.Services[self.x % len(self.Services)],device)
+			card.changeCard(service,device)
 		
 		if Args.warning:
 			if self.Services[0].TimeInMin() <= Args.WarningTime:
-				self.bottom.SetTrainApproaching()
+				self.rows[-1].SetTrainApproaching()
 			else:
-				self.bottom.SetNotTrainApproaching()
+				self.rows[-1].SetNotTrainApproaching()
 		
 		if  not (Args.FixToArrive and row == 1):
 			self.x = self.x + 1
 
+	# Returns the service a row shows when the rotation is at position x.
+	def serviceFor(self, row, x):
+		# If there are no more services than rows the order in which they appear on the display is fixed to the order they will arrive in.
+		if len(self.Services) <= len(self.rows):
+			return self.Services[row-1]
+		# If not they will cycled around showing whatever card is next.
+		if Args.FixToArrive and row == 1:
+			return self.Services[0]
+		return self.Services[x % len(self.Services)]
+
+	# Returns the service requestCardChange would give a row right now without changing anything; None if new data is due or the row would be blank.
+	def peekNextService(self, row):
+		x = self.x
+		if (x > Args.NumberOfCards or x >len(self.Services)-1):
+			if self.pending.done() if self.pending is not None else LiveTime.TimePassed():
+				return None
+			x = 1 if Args.FixToArrive else 0
+		if row > len(self.Services):
+			return None
+		return self.serviceFor(row, x)
+
+	# Returns how many upcoming ticks will change nothing on screen; None if there is no limit.
+	def idle_ticks(self):
+		if len(self.Services) == 0:
+			return max(0, Args.RecoveryTime - self.ticks) if self.ticks != 0 else 0
+		idle = [i for i in (row.idle_ticks() for row in self.rows) if i is not None]
+		return min(idle) if idle else None
+
 	# Used to add a time delay if there was an error with the last API request (providing a back off and wait mechanism)
 	def is_waiting(self):
-		self.ticks += 1
+		self.ticks += self.step
 		if self.ticks > Args.RecoveryTime:
 			self.ticks = 0
 			return False
 		return True
 	
 
-# Used to work out if the current time is between the inactive hours.
-def is_time_between():
-	# If check time is not given, default to current UTC time
-	check_time = datetime.now().time()
-	if Args.InactiveHours[0] < Args.InactiveHours[1]:
-		return check_time >= Args.InactiveHours[0] and check_time <= Args.InactiveHours[1]
-	else: # crosses midnight
-		return check_time >= Args.InactiveHours[0] or check_time <= Args.InactiveHours[1]
-
 # Checks that the user has allowed outputting to console.
 def print_safe(msg):
 	if not Args.NoConsole:
@@ -687,76 +859,188 @@ def print_safe(msg):
 ## Main
 ## Connects to the display and makes it update forever until ended by the user with a ctrl-c
 ###
-DisplayParser = cmdline.create_parser(description='Dynamically connect to either a vritual or physical display.')
-device = cmdline.create_device( DisplayParser.parse_args(['--display', str(Args.Display),'--interface','spi','--width','256','--rotate',str(Args.Rotation)]))
-if Args.Display == 'gifanim':
-	device._filename  = str(Args.filename)
-	device._max_frames = int(Args.maxframes)
-
-image_composition = ImageComposition(device)
-board = boardFixed(image_composition,Args.Delay,device)
-FontTime = ImageFont.truetype("%s/resources/time.otf" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))),16)
-device.contrast(255)
-energyMode = "normal"
-StartUpDate = datetime.now().date()
-
 # Draws the clock and tells the rest of the display next frame wanted.
+# The frame is only redrawn when something on it has changed, and the time it took is reported to the render governor.
 def display():
-	board.tick()
-	msgTime = str(datetime.now().strftime("%H:%M:%S" if (Args.TimeFormat==24) else "%I:%M:%S"))	
-	with canvas(device, background=image_composition()) as draw:
+	started = time.perf_counter()
+	if board.State != "dead":
+		board.tick()
+	clockChanged = Clock.update()
+	if image_composition.dirty or clockChanged:
 		image_composition.refresh()
-		draw.multiline_text(((device.width - int(draw.textlength(msgTime, FontTime)))/2, device.height-16), msgTime, font=FontTime, align="center")
-
-# Draws the splash screen on start up
+		present(device, image_composition, Clock.draw)
+		image_composition.dirty = False
+		if profile.pending:
+			print_safe(profile.finish("first frame"))
+		scheduler.frame(True)
+		change = governor.record(time.perf_counter() - started)
+		if change:
+			print_safe(change)
+			scheduler.interval = governor.interval
+	else:
+		scheduler.frame(False)
+	scheduler.defer(board.idle_ticks(), scheduler.next_wall_boundary(Clock.period))
+
+# Draws the dimmed display the energy saver leaves up in inactive hours: just the clock, only redrawn when it changes.
+def Standby():
+	if Clock.update() or image_composition.dirty:
+		image_composition.refresh()
+		present(device, image_composition, Clock.draw)
+		image_composition.dirty = False
+		scheduler.frame(True)
+	else:
+		scheduler.frame(False)
+	scheduler.sleep_until(scheduler.next_wall_boundary(Clock.period))
+
+
+# Draws the splash screen on start up and keeps it up until the board is ready: the network is reachable and the first data
+# has been fetched, which is returned for the board to start with, even if empty (None if no fetch was made, or no splash
+# screen, for the board to fetch itself).
+# It used to always wait 30 seconds for the device to connect to WIFI; --SplashTimeout is now only the longest it waits.
 def Splash():
-	if Args.SplashScreen:
-		with canvas(device) as draw:
-			draw.multiline_text((64, 10), "Departure Board", font= ImageFont.truetype("%s/resources/Bold.ttf" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))),20), align="center")
-			draw.multiline_text((45, 35), "Version : 2.11.LU -  By Jonathan Foot", font=ImageFont.truetype("%s/resources/Skinny.ttf" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))),15), align="center")
-		time.sleep(30) #Wait such a long time to allow the device to startup and connect to a WIFI source first.
-
-
-try:
-	if Args.APIID != None:
-		print("NOTICE: App ID is no longer required, please remove it from the parameters used.")
-
-	Splash()
-	# Run the program forever		
-	while True:
-		time.sleep(0.02)
-
-		if 'board' in globals() and board.State == "dead":
-			del board
-			board = boardFixed(image_composition,Args.Delay,device)
-			device.clear()
-
-		# Turns the display into one of the energy saving modes if in the correct time and enabled.
-		if (Args.EnergySaverMode != "none" and is_time_between()):
-			# Check for program updates and restart the pi every 'UpdateDays' Days.
-			# if (datetime.now().date() - StartUpDate).days >= Args.UpdateDays:
-			# 	print_safe("Checking for updates and then restarting Pi.")
-			# 	os.system("sudo git -C %s pull; sudo reboot" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))))
-			# 	sys.exit()
-			if Args.EnergySaverMode == "dim":
-				if energyMode == "normal":
-					device.contrast(15)
-					energyMode = "dim"
-				display()
-			elif Args.EnergySaverMode == "off":
+	if not Args.SplashScreen:
+		return None
+	with canvas(device) as draw:
+		draw.multiline_text((64, 10), "Departure Board", font= truetype("Bold.ttf", 20), align="center")
+		draw.multiline_text((45, 35), "Version : 2.11.LU -  By Jonathan Foot", font=truetype("Skinny.ttf", 15), align="center")
+	profile.mark("splash shown")
+
+	deadline = time.monotonic() + Args.SplashTimeout
+	services = None
+
+	def fetched():
+		nonlocal services
+		services = LiveTime.GetData()
+		return len(services) > 0
+
+	if wait_until(lambda: reachable("api.tfl.gov.uk"), Args.SplashTimeout, interval=1):
+		profile.mark("network reachable")
+		if wait_until(fetched, deadline - time.monotonic(), interval=5):
+			profile.mark("first data fetched")
+	return services
+
+
+# Builds the board: from the data the energy saver fetched ahead (warming, a BackgroundFetch) if it has arrived; else from
+# the last data saved if there is any, shown straight away while fresh data is fetched in the background. Waking without
+# either shows no services until warming lands; only a cold start waits on the splash screen for its data.
+def StartBoard(warming=None):
+	if warming is not None and warming.done() and warming.result():
+		return boardFixed(image_composition,Args.Delay,device,services=warming.result())
+	saved = LiveTime.FromSnapshot()
+	if saved:
+		profile.mark("snapshot loaded")
+		return boardFixed(image_composition,Args.Delay,device,services=saved,pending=warming or BackgroundFetch(LiveTime.GetData))
+	if warming is not None:
+		return boardFixed(image_composition,Args.Delay,device,services=[],pending=warming)
+	return boardFixed(image_composition,Args.Delay,device,services=Splash())
+
+
+# Connects to the display and runs the board until ended by the user with a ctrl-c; config is as for configure().
+# panel is an already opened luma device (e.g. from oled_device.create_devices); by default --Display is opened.
+def run(config=None, panel=None):
+	global device, image_composition, board, FontTime, energyMode, StartUpDate, preview, scheduler, governor, Clock
+	configure(config)
+	if Args.StartupProfile:
+		profile.start(imports=False)
+	profile.mark("configured")
+	if panel is not None:
+		device = panel
+	elif Args.Display in ('gifstream', 'raw'):
+		# Streams frames to --filename as they are shown, in constant memory however long the capture.
+		from capture_stream import StreamingCapture
+		device = StreamingCapture(str(Args.filename), 'gif' if Args.Display == 'gifstream' else 'raw', width=Args.Width, height=Args.Height, rotate=Args.Rotation, max_frames=Args.maxframes, dedupe=Args.DedupeFrames)
+	elif Args.Display == 'ssd1322':
+		# Only pushes the rows/columns that changed since the last frame over SPI; --Accelerated packs them with NumPy.
+		device = oled_device.create_device(driver='ssd1322', width=Args.Width, height=Args.Height, rotate=Args.Rotation, accelerated=Args.Accelerated or None)
+	else:
+		DisplayParser = cmdline.create_parser(description='Dynamically connect to either a vritual or physical display.')
+		device = cmdline.create_device( DisplayParser.parse_args(['--display', str(Args.Display),'--interface','spi','--width',str(Args.Width),'--height',str(Args.Height),'--rotate',str(Args.Rotation)]))
+		if Args.Display == 'gifanim':
+			device._filename  = str(Args.filename)
+			device._max_frames = int(Args.maxframes)
+	profile.mark("display opened")
+
+	# Lets the board be watched remotely; frames are only encoded when someone is watching.
+	preview = None
+	if Args.Preview:
+		from preview_server import PreviewServer
+		preview = PreviewServer(Args.Preview)
+		preview.attach(device)
+		preview.start()
+
+	image_composition = create_composition(device, Args.Compositor)
+	board = StartBoard()
+	profile.mark("board built")
+	FontTime = truetype("time.otf", 16)
+	device.contrast(255)
+	energyMode = "normal"
+	energy = EnergySaver(*Args.InactiveHours, warmup=Args.WarmUpMinutes * 60)
+	warming = None
+	StartUpDate = datetime.now().date()
+	# Paces the main loop, sleeping through frames where nothing on the display changes. Animation is
+	# time based, so frames that run late are dropped rather than caught up.
+	scheduler = FrameScheduler(0.02, max_catchup=0)
+	# Steps the frame rate and then the animations down when frames overrun, and back up once there is headroom.
+	governor = RenderGovernor(scheduler.interval, enabled=not Args.FixedQuality)
+	# The clock at the bottom of the display, built from pre-rendered digits and only redrawn when it changes.
+	Clock = ClockSprites(FontTime, device.width, device.height-16, Args.TimeFormat)
+
+	try:
+		if Args.APIID != None:
+			print("NOTICE: App ID is no longer required, please remove it from the parameters used.")
+
+		# Run the program forever		
+		while True:
+			scheduler.wait()
+
+			if 'board' in globals() and board.State == "dead":
+				del board
+				# Fetched in the background: the fetch slot is shared by every panel in the process, so waiting for it here would stall this panel behind the others' fetches, and theirs behind this one. No services are shown until it lands.
+				board = boardFixed(image_composition,Args.Delay,device,services=[],pending=BackgroundFetch(LiveTime.GetData))
+				device.clear()
+
+			# Outside the active hours the energy saver takes the board down and turns the display off, or dims it to just the
+			# clock. Nothing is fetched or animated then, and the loop only wakes when the clock changes (dim) or a minute
+			# starts (off), the only times the phase can change. For the last --WarmUpMinutes the data is fetched in the
+			# background, so the board is ready the moment it comes back.
+			phase = energy.phase(datetime.now()) if Args.EnergySaverMode != "none" else "active"
+			if phase != "active":
+				# Check for program updates and restart the pi every 'UpdateDays' Days.
+				# if (datetime.now().date() - StartUpDate).days >= Args.UpdateDays:
+				# 	print_safe("Checking for updates and then restarting Pi.")
+				# 	os.system("sudo git -C %s pull; sudo reboot" % (os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))))
+				# 	sys.exit()
 				if energyMode == "normal":
+					board.remove()
 					del board
-					device.clear()
-					device.hide()
-					energyMode = "off"      
-		else:
-			if energyMode != "normal":
-				device.contrast(255)
-				if energyMode == "off":
-					device.show()
-					Splash()
-					board = boardFixed(image_composition,Args.Delay,device)
-				energyMode = "normal"
-			display()
-except KeyboardInterrupt:
-	pass
+					if Args.EnergySaverMode == "dim":
+						device.contrast(15)
+					else:
+						device.clear()
+						device.hide()
+					energyMode = Args.EnergySaverMode
+				if phase == "warming" and warming is None:
+					warming = BackgroundFetch(LiveTime.GetData)
+				if energyMode == "dim":
+					Standby()
+				else:
+					scheduler.sleep_until(scheduler.next_wall_boundary(60))
+			else:
+				if energyMode != "normal":
+					device.contrast(255)
+					if energyMode == "off":
+						device.show()
+					board = StartBoard(warming)
+					warming = None
+					energyMode = "normal"
+				display()
+
+			report = scheduler.report()
+			if report:
+				print_safe(report)
+	except KeyboardInterrupt:
+		pass
+
+
+if __name__ == "__main__":
+	run()
@@ -0,0 +1,113 @@
+"""
+Load test for remote config distribution: a fleet of boards polling one
+config_server.ConfigServer with RemoteConfig.fetch(), as ConfigPoller does.
+
+Starts the server on a free local port over a temporary fleet directory
+(all.yml plus an overlay for every `--overlay-every`th board), then runs
+`--rounds` poll rounds in which every board fetches once, `--clients` at a
+time. all.yml is edited before round `--change-at`, so one round shows what
+a fleet-wide change costs. Reports per round the 200/304 split, bytes sent
+and poll latency (p50/p99), and overall the 304 ratio and server renders.
+Checks that each board ends with all.yml merged with its own overlay, and
+exits non-zero if any does not.
+
+    python -m benchmarks.config_fleet [--boards 300] [--rounds 6] [--clients 32]
+"""
+from __future__ import annotations
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from board_sources import deep_merge
+from config_server import ConfigServer
+from remote_config import RemoteConfig
+
+BASE = {"ui": {"font_size": 22, "line_height": 24, "interleave": False},
+        "defaults": {"national_rail": {"limit": 6}, "tube": {"limit": 6}},
+        "remote": {"cache_ttl_seconds": 60}}
+
+
+def overlay(n: int) -> dict:
+    return {"defaults": {"tube": {"stop_point_id": "940GZZLU%04d" % n, "limit": 3 + n % 4}}}
+
+
+def write(path: str, data: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f)
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-tests remote config polling against config_server.")
+    parser.add_argument("--boards", type=int, default=300, help="Boards in the fleet; default 300")
+    parser.add_argument("--rounds", type=int, default=6, help="Poll rounds; default 6")
+    parser.add_argument("--clients", type=int, default=32, help="Polls in flight at once; default 32")
+    parser.add_argument("--overlay-every", type=int, default=3, help="Every Nth board has its own overlay; default 3")
+    parser.add_argument("--change-at", type=int, default=3, help="Round before which all.yml is edited; default 3")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="fleet-")
+    write(os.path.join(directory, "all.yml"), BASE)
+    for n in range(0, args.boards, args.overlay_every):
+        write(os.path.join(directory, "board-%04d.yml" % n), overlay(n))
+
+    server = ConfigServer(directory, port=0, host="127.0.0.1")
+    server.start()
+    url = "http://%s:%d/config.yml" % server.address
+    boards = [RemoteConfig(url, timeout=10, board_id="board-%04d" % n) for n in range(args.boards)]
+
+    def poll(board: RemoteConfig):
+        started = time.perf_counter()
+        before = board.cached()
+        result = board.fetch()
+        return time.perf_counter() - started, result is not None and result is not before
+
+    base = BASE
+    print("%d boards, %d with overlays, %d polls in flight" % (args.boards, len(range(0, args.boards, args.overlay_every)), args.clients))
+    print("round   200s   304s  errors   bytes  p50 ms  p99 ms   wall s")
+    try:
+        with ThreadPoolExecutor(args.clients) as pool:
+            for round in range(args.rounds):
+                if round == args.change_at:
+                    base = deep_merge(BASE, {"ui": {"font_size": 24}}).thaw()
+                    write(os.path.join(directory, "all.yml"), base)
+                counted = server.stats()
+                started = time.perf_counter()
+                results = list(pool.map(poll, boards))
+                wall = time.perf_counter() - started
+                now = server.stats()
+                print("%5d  %5d  %5d  %6d  %6d  %6.2f  %6.2f  %7.2f" % (
+                    round, now["200"] - counted["200"], now["304"] - counted["304"], now["errors"] - counted["errors"],
+                    now["bytes"] - counted["bytes"], 1000 * percentile([t for t, _ in results], 0.5),
+                    1000 * percentile([t for t, _ in results], 0.99), wall))
+    finally:
+        server.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    stats = server.stats()
+    polls = stats["200"] + stats["304"]
+    print("304 ratio %.1f%% of %d polls; %d documents rendered" % (100.0 * stats["304"] / max(polls, 1), polls, stats["renders"]))
+
+    wrong = 0
+    for n, board in enumerate(boards):
+        expected = deep_merge(base, overlay(n)) if n % args.overlay_every == 0 else deep_merge(base, {})
+        wrong += board.cached() != expected.thaw()
+    print("boards with the wrong config: %d" % wrong)
+    return 1 if wrong or stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
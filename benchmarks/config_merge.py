@@ -0,0 +1,122 @@
+"""
+Checks and micro-benchmark for board_sources' layered config merge.
+
+Merges config.yml, an environment overlay and a remote override the way
+load_with_env_and_remote() does, checking the result against the old
+deep-copying merge, that untouched parts are shared rather than copied, and
+that config_diff() reports exactly what a remote change altered. It then
+times a load (two merges) and a remote poll (merge and diff) both ways.
+
+    python -m benchmarks.config_merge [--polls 20000]
+
+Exits non-zero if any check fails.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+from copy import deepcopy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from board_sources import MISSING, config_diff, deep_merge, diff_touches, freeze, load_config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV = {"tfl": {"app_key": "key"}, "defaults": {"national_rail": {"crs": "RDG", "to_crs": None}},
+       "john_options": {"time_format": "12", "speed": "3"}}
+REMOTE = {"ui": {"font_size": 24}, "defaults": {"tube": {"limit": 4}}}
+
+
+def old_merge(a: dict, b: dict) -> dict:
+    """The merge board_sources used to do: a deep copy of a at every level."""
+    out = deepcopy(a)
+    if not isinstance(b, dict):
+        return out
+    for k, v in b.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = old_merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def check(base: dict) -> int:
+    failures = 0
+
+    def expect(what: str, ok: bool) -> None:
+        nonlocal failures
+        failures += not ok
+        print("  %-4s %s" % ("ok" if ok else "FAIL", what))
+
+    merged = deep_merge(deep_merge(base, ENV), REMOTE)
+    expect("same result as the deep-copying merge",
+           merged.thaw() == old_merge(old_merge(base, ENV), REMOTE))
+    layered = deep_merge(base, ENV)
+    again = deep_merge(layered, REMOTE)
+    expect("untouched sections are shared, not copied",
+           again["rtt"] is layered["rtt"] and again["defaults"]["national_rail"] is layered["defaults"]["national_rail"])
+    expect("an override that changes nothing returns the same config",
+           deep_merge(again, REMOTE) is again and deep_merge(again, {"ui": {"font_size": 24}}) is again)
+    expect("identical snapshots diff to nothing", config_diff(again, deep_merge(again, REMOTE)) == {})
+
+    diff = config_diff(layered, again)
+    expect("the diff is the remote change",
+           diff == {("ui", "font_size"): (22, 24), ("defaults", "tube", "limit"): (6, 4)})
+    expect("diff_touches() finds changed sections only",
+           diff_touches(diff, ("ui",)) and diff_touches(diff, ("defaults", "tube"))
+           and not diff_touches(diff, ("defaults", "national_rail"), ("rtt",)))
+    expect("added and removed keys diff against MISSING",
+           config_diff(freeze({"a": 1}), freeze({"b": 2})) == {("a",): (1, MISSING), ("b",): (MISSING, 2)})
+    try:
+        again["ui"]["font_size"] = 1
+        expect("merged configs are read-only", False)
+    except TypeError:
+        expect("merged configs are read-only", True)
+    return failures
+
+
+def bench(base: dict, polls: int) -> None:
+    start = time.perf_counter()
+    for _ in range(polls):
+        old_merge(old_merge(base, ENV), REMOTE)
+    old_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(polls):
+        deep_merge(deep_merge(base, ENV), REMOTE)
+    new_load = time.perf_counter() - start
+
+    frozen = deep_merge(freeze(base), ENV)
+    current = deep_merge(frozen, REMOTE)
+    start = time.perf_counter()
+    for _ in range(polls):
+        config_diff(current, deep_merge(frozen, REMOTE))
+    new_poll = time.perf_counter() - start
+
+    plain = old_merge(base, ENV)
+    current = old_merge(plain, REMOTE)
+    start = time.perf_counter()
+    for _ in range(polls):
+        current != old_merge(plain, REMOTE)
+    old_poll = time.perf_counter() - start
+
+    print("  load (file, env, remote)  deep copy %.1f us, shared %.1f us" % (1e6 * old_load / polls, 1e6 * new_load / polls))
+    print("  remote poll (merge, diff) deep copy %.1f us, shared %.1f us" % (1e6 * old_poll / polls, 1e6 * new_poll / polls))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checks and benchmarks the layered config merge.")
+    parser.add_argument("--polls", type=int, default=20000, help="Loads and polls to time; default 20000")
+    args = parser.parse_args(argv)
+
+    base = load_config(os.path.join(ROOT, "config.yml"))
+    print("Checks:")
+    failures = check(base)
+    print("Cost:")
+    bench(base, args.polls)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark for the SSD1322 4bpp packing path.
+
+Pushes the same frames through luma's stock ssd1322 and oled_device.PackedSSD1322
+(both on a recording no-op serial interface), checks they send identical
+bytes, and reports the time per frame for full frames and for a typical
+partial update (the bottom text row).
+
+    python -m benchmarks.pack [--frames 200]
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+from luma.core.framebuffer import full_frame
+from luma.oled.device import ssd1322
+
+from frame_diff import DirtyRegionFramebuffer
+from oled_device import PackedSSD1322
+
+
+class RecordingSerial:
+    """Serial stand-in that keeps a copy of every data write."""
+
+    def __init__(self):
+        self.sent = []
+
+    def command(self, *cmd):
+        pass
+
+    def data(self, data):
+        self.sent.append(bytes(data))
+
+    def cleanup(self):
+        pass
+
+
+def frames(count: int, width: int = 256, height: int = 64):
+    """A board-like frame with a scrolling bottom row and antialiased text."""
+    for i in range(count):
+        image = Image.new("RGB", (width, height))
+        draw = ImageDraw.Draw(image)
+        draw.text((0, 0), "1st  10:42  London Paddington      On time", fill="white")
+        draw.text((0, 16), "Calling at: Reading, Didcot Parkway, Oxford", fill="white")
+        draw.text((width - (i * 3) % (width + 200), 32), "2nd  10:51  Bristol Temple Meads  Exp 10:55", fill=(200, 180, 160))
+        draw.text((96, 50), "10:%02d:%02d" % (i // 60 % 60, i % 60), fill="white")
+        yield image
+
+
+def run(device_cls, framebuffer, images):
+    serial = RecordingSerial()
+    device = device_cls(serial, width=256, height=64, framebuffer=framebuffer)
+    serial.sent.clear()
+    start = time.perf_counter()
+    for image in images:
+        device.display(image)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(images), serial.sent
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare stock and NumPy SSD1322 packing.")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args(argv)
+    images = list(frames(args.frames))
+
+    for label, make_fb in (("full frame", full_frame), ("dirty windows", DirtyRegionFramebuffer)):
+        stock, stock_sent = run(ssd1322, make_fb(), images)
+        packed, packed_sent = run(PackedSSD1322, make_fb(), images)
+        same = stock_sent == packed_sent
+        print("%-14s stock %7.2f ms  packed %7.2f ms  x%5.1f  identical=%s" % (
+            label, stock * 1000, packed * 1000, stock / packed, same))
+        if not same:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Headless render benchmark for the departure board scripts.
+
+Imports the rail, bus and tube scripts' board code (configured with their
+own command line options, without calling run()), points it at an SSD1322
+driver on a no-op serial interface and replays fixture service data from benchmarks/fixtures on a
+simulated clock. Each board runs N simulated minutes at 50 ticks a second,
+as fast as the host allows. We then report:
+
+  - tick cost per ScrollTime state (OPENING_SCROLL, SCROLLING, WAIT_SYNC...)
+  - composition (refresh + clock) and device (diff + 4bpp packing) time
+  - allocated memory blocks per frame (sys.getallocatedblocks, net), and
+    optionally the peak transient bytes per frame with --trace-allocations
+  - p50/p99/max frame times
+
+Every board is driven the same way, so the numbers are comparable across
+scripts and across commits.
+
+    python -m benchmarks.render [--minutes 5] [--boards rail bus tube] [--compositor pil|numpy]
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import io
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, ROOT)
+
+from PIL import ImageDraw, ImageFont
+from luma.core.interface.serial import noop
+from luma.oled.device import ssd1322
+
+from clock_sprites import ClockSprites
+from composition import create_composition
+from fetch_scheduler import FetchScheduler
+from frame_diff import DirtyRegionFramebuffer
+from render_governor import RenderGovernor
+
+TICK = 0.02
+
+
+class SimClock:
+    """Wall-clock time for the board code, advanced one tick at a time."""
+
+    def __init__(self, start: float):
+        self.t = start
+
+    def advance(self, seconds: float) -> None:
+        self.t += seconds
+
+
+def sim_datetime(clock: SimClock):
+    """A datetime class whose now()/utcnow() read the simulated clock."""
+
+    class SimDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(clock.t, tz)
+
+        @classmethod
+        def utcnow(cls):
+            return datetime.fromtimestamp(clock.t, timezone.utc).replace(tzinfo=None)
+
+    return SimDatetime
+
+
+def occurrences(items, period_minutes: float, start: float, now: float):
+    """Next (time, repeat, item) for every fixture entry, repeating each `period_minutes`."""
+    period = period_minutes * 60
+    due = []
+    for item in items:
+        first = start + item["due"] * 60
+        repeat = max(0, math.ceil((now - first) / period))
+        due.append((first + repeat * period, repeat, item))
+    return sorted(due, key=lambda d: d[0])
+
+
+def load_board(module: str, argv: list[str]) -> dict:
+    """Imports and configures a board script, returning its globals for the replay hooks."""
+    board = importlib.import_module(module)
+    board.configure(argv)
+    return vars(board)
+
+
+def install_tube(ns, clock, fixture, start):
+    def urlopen(request):
+        arrivals = []
+        for when, repeat, item in occurrences(fixture["arrivals"], fixture["period"], start, clock.t):
+            arrival = dict(item, id="%s-%d" % (fixture["arrivals"].index(item), repeat))
+            arrival["expectedArrival"] = datetime.fromtimestamp(when, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            arrivals.append(arrival)
+        return io.BytesIO(json.dumps(arrivals).encode())
+
+    ns["urlopen"] = urlopen
+
+
+def install_bus(ns, clock, fixture, start):
+    def urlopen(url):
+        if url.startswith("route:"):
+            stops = [{"stop_name": s.split(",")[0], "locality": s} for s in fixture["routes"][url[6:]]]
+            return io.BytesIO(json.dumps({"stops": stops}).encode())
+        departures = []
+        for when, repeat, item in occurrences(fixture["departures"], fixture["period"], start, clock.t):
+            departure = dict(item, id="route:%s" % item["line_name"])
+            departure["aimed_departure_time"] = time.strftime("%H:%M", time.localtime(when))
+            departure["best_departure_estimate"] = time.strftime("%H:%M", time.localtime(when + item["delay"] * 60))
+            departures.append(departure)
+        return io.BytesIO(json.dumps({"departures": {"all": departures}}).encode())
+
+    ns["urlopen"] = urlopen
+
+
+def install_rail(ns, clock, fixture, start):
+    class ReplayDarwinSession:
+        def __init__(self, wsdl=None, api_key=None):
+            self.details = {}
+
+        def get_station_board(self, crs):
+            services = []
+            for when, repeat, item in occurrences(fixture["services"], fixture["period"], start, clock.t):
+                std = time.strftime("%H:%M", time.localtime(when))
+                etd = "On time" if not item["delay"] else time.strftime("%H:%M", time.localtime(when + item["delay"] * 60))
+                service_id = "%s-%d" % (item["id"], repeat)
+                common = dict(std=std, etd=etd, sta=None, eta=None, platform=item["platform"], service_id=service_id)
+                self.details[service_id] = SimpleNamespace(
+                    operator_name=item["operator"],
+                    subsequent_calling_points=[SimpleNamespace(location_name=n) for n in item["calling_at"]],
+                    **common)
+                services.append(SimpleNamespace(destination_text=item["destination"], **common))
+            return SimpleNamespace(location_name=fixture["location_name"], train_services=services)
+
+        def get_service_details(self, service_id):
+            return self.details[service_id]
+
+    ns["DarwinLdbSession"] = ReplayDarwinSession
+
+
+BOARDS = {
+    "rail": dict(module="NationalRailPy3", argv=["-k", "bench", "-s", "RDG"], fixture="rail.json",
+                 install=install_rail, clock_size=lambda ns: ns["TimeSize"], seconds=True),
+    "bus": dict(module="NationalBusesPy3", argv=["-a", "bench", "-k", "bench", "-s", "bench", "-b", "no"], fixture="bus.json",
+                install=install_bus, clock_size=lambda ns: 16, seconds=False),
+    "tube": dict(module="LondonUndergroundPy3", argv=["-k", "bench", "-s", "bench"], fixture="tube.json",
+                 install=install_tube, clock_size=lambda ns: 16, seconds=True),
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def bench(name: str, minutes: float, compositor: str, start: float, trace: bool) -> dict:
+    spec = BOARDS[name]
+    ns = load_board(spec["module"], spec["argv"] + ["--Compositor", compositor, "--no-console-output", "--no-snapshot"])
+    with open(os.path.join(FIXTURES, spec["fixture"]), encoding="utf-8") as f:
+        fixture = json.load(f)
+
+    clock = SimClock(start)
+    ns["datetime"] = sim_datetime(clock)
+    ns["wall_time"] = lambda: clock.t
+    ns["LiveTime"].LastUpdate = ns["datetime"].now()
+    spec["install"](ns, clock, fixture, start)
+
+    # The scripts' board code reads `device` and `image_composition` as module globals.
+    device = ssd1322(noop(), width=256, height=64, framebuffer=DirtyRegionFramebuffer())
+    composition = create_composition(device, compositor)
+    ns["device"], ns["image_composition"] = device, composition
+    # Full quality throughout, so runs stay comparable on machines of different speeds.
+    ns["governor"] = RenderGovernor(TICK, enabled=False)
+    # Fetch spacing follows the simulated clock too, and each run starts with fresh sessions.
+    ns["fetches"] = FetchScheduler(clock=lambda: clock.t)
+    args = ns["Args"]
+    board = ns["boardFixed"](composition, args.Delay, device, clock=lambda: clock.t)
+    header = board.GetHeader() if hasattr(board, "GetHeader") else None
+    size = spec["clock_size"](ns)
+    font = ImageFont.truetype(os.path.join(ROOT, "resources", "time.otf"), size)
+    clock_y = device.height - (size + 1) if name == "rail" else device.height - 16
+    clock_sprites = ClockSprites(font, device.width, clock_y, args.TimeFormat, seconds=spec["seconds"])
+
+    # Samples go into arrays so recording them does not itself show up as allocated blocks.
+    state_times = defaultdict(lambda: array("d"))
+    scroll_time = ns["ScrollTime"]
+    original_tick = scroll_time.tick
+    state_names = {v: k for k, v in vars(scroll_time).items() if k.isupper() and isinstance(v, int)}
+
+    def timed_tick(row, *args):
+        state = state_names.get(row.state, row.state)
+        t0 = time.perf_counter()
+        result = original_tick(row, *args)
+        state_times[state].append(time.perf_counter() - t0)
+        return result
+
+    scroll_time.tick = timed_tick
+
+    frame_times, compose_times, device_times, block_deltas, peaks = (array("d") for _ in range(5))
+    composed = 0
+    if trace:
+        tracemalloc.start()
+    try:
+        for _ in range(int(minutes * 60 / TICK)):
+            clock.advance(TICK)
+            if trace:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+            blocks = sys.getallocatedblocks()
+            t0 = time.perf_counter()
+
+            if board.State == "dead":
+                board = ns["boardFixed"](composition, args.Delay, device, clock=lambda: clock.t)
+            board.tick()
+
+            t1 = time.perf_counter()
+            clock_changed = clock_sprites.update(clock.t)
+            if composition.dirty or clock_changed:
+                composition.refresh()
+                image = composition().copy()
+                draw = ImageDraw.Draw(image)
+                if header is not None:
+                    draw.multiline_text((0, 0), header, font=ns["BasicFont"])
+                clock_sprites.draw(draw)
+                composition.dirty = False
+                t2 = time.perf_counter()
+                device.display(image)
+                t3 = time.perf_counter()
+                compose_times.append(t2 - t1)
+                device_times.append(t3 - t2)
+                composed += 1
+            else:
+                t3 = time.perf_counter()
+
+            blocks = sys.getallocatedblocks() - blocks
+            frame_times.append(t3 - t0)
+            block_deltas.append(blocks)
+            if trace:
+                peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        scroll_time.tick = original_tick
+        if trace:
+            tracemalloc.stop()
+
+    return {
+        "board": name,
+        "frames": len(frame_times),
+        "composed": composed,
+        "states": {s: {"ticks": len(v), "mean_us": 1e6 * sum(v) / len(v), "p99_us": 1e6 * percentile(v, 99)}
+                   for s, v in state_times.items()},
+        "compose_ms": 1e3 * sum(compose_times) / max(1, len(compose_times)),
+        "device_ms": 1e3 * sum(device_times) / max(1, len(device_times)),
+        "blocks_per_frame": sum(block_deltas) / max(1, len(block_deltas)),
+        "peak_bytes_per_frame": sum(peaks) / len(peaks) if peaks else None,
+        "frame_p50_ms": 1e3 * percentile(frame_times, 50),
+        "frame_p99_ms": 1e3 * percentile(frame_times, 99),
+        "frame_max_ms": 1e3 * max(frame_times, default=0.0),
+    }
+
+
+def report(result: dict) -> str:
+    lines = ["%s: %d ticks, %d frames composed" % (result["board"], result["frames"], result["composed"]),
+             "  frame p50 %.3f ms  p99 %.3f ms  max %.3f ms" % (
+                 result["frame_p50_ms"], result["frame_p99_ms"], result["frame_max_ms"]),
+             "  compose %.3f ms  device %.3f ms  (per composed frame)" % (result["compose_ms"], result["device_ms"]),
+             "  allocated blocks %+.2f per tick" % result["blocks_per_frame"]]
+    if result["peak_bytes_per_frame"] is not None:
+        lines[-1] += "  peak %.0f bytes per tick" % result["peak_bytes_per_frame"]
+    for state, s in result["states"].items():
+        lines.append("  %-18s %8d ticks  mean %8.1f us  p99 %8.1f us" % (state, s["ticks"], s["mean_us"], s["p99_us"]))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless render benchmark for the departure boards.")
+    parser.add_argument("--minutes", type=float, default=5.0, help="Simulated minutes per board; default 5")
+    parser.add_argument("--boards", nargs="+", choices=sorted(BOARDS), default=sorted(BOARDS))
+    parser.add_argument("--compositor", choices=["pil", "numpy"], default="pil")
+    parser.add_argument("--start", default="2024-03-12T08:00", help="Simulated local start time; default 2024-03-12T08:00")
+    parser.add_argument("--trace-allocations", dest="trace", action="store_true",
+                        help="Also measure peak transient bytes per tick with tracemalloc (slow)")
+    parser.add_argument("--json", dest="json_path", help="Write the results to this file as JSON")
+    args = parser.parse_args(argv)
+
+    start = datetime.strptime(args.start, "%Y-%m-%dT%H:%M").timestamp()
+    results = []
+    for name in args.boards:
+        try:
+            result = bench(name, args.minutes, args.compositor, start, args.trace)
+        except ImportError as e:
+            print("%s: skipped (%s)" % (name, e))
+            continue
+        results.append(result)
+        print(report(result))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
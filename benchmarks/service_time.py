@@ -0,0 +1,99 @@
+"""
+Checks and micro-benchmark for resolving feed "HH:MM" times to epoch seconds.
+
+Runs departures.ServiceDay in Europe/London over the awkward cases (either
+side of midnight, the spring and autumn clock changes), checking each against
+the expected countdown and showing what attaching today's date (the boards'
+old approach) gave instead. It then reports the cost per time of a typical
+refresh for both approaches.
+
+    python -m benchmarks.service_time [--refreshes 2000]
+
+Exits non-zero if any case resolves wrongly.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import departures
+from departures import ServiceDay
+
+# (what, local time now, feed time, minutes until it is due)
+CASES = [
+    ("same day", "2024-03-12 08:00", "08:15", 15),
+    ("just after midnight", "2024-03-12 23:58", "00:05", 7),
+    ("late, from before midnight", "2024-03-13 00:03", "23:55", -8),
+    ("a long way past midnight", "2024-03-12 22:30", "03:10", 280),
+    ("spring forward: across the change", "2024-03-31 00:50", "02:10", 20),
+    ("spring forward: skipped time", "2024-03-31 00:50", "01:30", 40),
+    ("spring forward: across midnight", "2024-03-30 23:50", "00:20", 30),
+    ("fall back: repeated time", "2024-10-27 00:50", "01:20", 30),
+    ("fall back: after the change", "2024-10-27 00:50", "02:10", 140),
+    ("fall back: across midnight", "2024-10-26 23:55", "00:10", 15),
+]
+
+
+def today_approach(now: float, text: str) -> float:
+    """What the boards used to do: attach today's date to the time."""
+    when = datetime.strptime(str(datetime.fromtimestamp(now).date()) + " " + text, "%Y-%m-%d %H:%M")
+    return when.timestamp()
+
+
+def check() -> int:
+    failures = 0
+    for what, now_text, feed, expected in CASES:
+        now = datetime.strptime(now_text, "%Y-%m-%d %H:%M").timestamp()
+        got = (ServiceDay(now).resolve(feed) - now) / 60
+        old = (today_approach(now, feed) - now) / 60
+        ok = got == expected
+        failures += not ok
+        print("  %-4s %-36s now %s, %s: %+6.0f min (expected %+d; today's date gave %+.0f)" % (
+            "ok" if ok else "FAIL", what, now_text, feed, got, expected, old))
+    return failures
+
+
+def bench(refreshes: int, per_refresh: int = 10) -> None:
+    now = datetime.strptime("2024-03-12 23:40", "%Y-%m-%d %H:%M").timestamp()
+    feed = ["%02d:%02d" % divmod((23 * 60 + 45 + 7 * i) % 1440, 60) for i in range(per_refresh)]
+
+    start = time.perf_counter()
+    for i in range(refreshes):
+        times = ServiceDay(now + i)
+        for text in feed:
+            times.resolve(text)
+    resolver = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(refreshes):
+        for text in feed:
+            today_approach(now + i, text)
+    old = time.perf_counter() - start
+
+    count = refreshes * per_refresh
+    print("  ServiceDay        %.2f us per time" % (1e6 * resolver / count))
+    print("  today's date      %.2f us per time (strptime)" % (1e6 * old / count))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Checks and benchmarks feed time resolution.")
+    parser.add_argument("--refreshes", type=int, default=2000, help="Simulated refreshes of 10 services; default 2000")
+    args = parser.parse_args(argv)
+
+    os.environ["TZ"] = "Europe/London"
+    time.tzset()
+    departures._local_epoch.cache_clear()
+
+    print("Europe/London:")
+    failures = check()
+    print("Cost:")
+    bench(args.refreshes)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,11 @@
 from __future__ import annotations
 import os
+import socket
 import yaml
+from collections.abc import Mapping
 from pathlib import Path
-from copy import deepcopy
 
+from departures import Departure
 from rtt import RTTClient, get_departures_as_livetimes
 from tube_from_london_underground_py3 import tube_legacy_as_livetimes
 from remote_config import RemoteConfig
@@ -11,17 +13,138 @@ from remote_config import RemoteConfig
 
 # ---------- merge helpers ----------
 
-def deep_merge(a: dict, b: dict) -> dict:
-    """Deep merge dicts; values from b override a."""
-    out = deepcopy(a)
-    if not isinstance(b, dict):
-        return out
+# Stands for a key missing from one side of a config_diff().
+MISSING = type("Missing", (), {"__repr__": lambda self: "MISSING", "__bool__": lambda self: False})()
+
+
+class FrozenConfig(Mapping):
+    """
+    A read-only config (see freeze()). Nested dicts are FrozenConfigs and
+    lists tuples, so one config can be handed to every board, kept as a
+    snapshot and shared between merges without anyone changing it under the
+    others. thaw() gives back plain dicts and lists, e.g. for yaml.safe_dump.
+    """
+
+    __slots__ = ("_data", "_hash")
+
+    def __init__(self, data: dict):
+        self._data = data
+        self._hash = None
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # Straight to the dict rather than Mapping's generic versions; merges and diffs lean on these.
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def keys(self):
+        return self._data.keys()
+
+    def items(self):
+        return self._data.items()
+
+    def values(self):
+        return self._data.values()
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenConfig):
+            return self._data == other._data
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._data.items()))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return "FrozenConfig(%r)" % (self._data,)
+
+    def thaw(self) -> dict:
+        return {k: _thaw(v) for k, v in self._data.items()}
+
+
+# What the config code treats as a section: YAML and JSON give dicts. (Checking concrete types is much quicker than Mapping.)
+_TABLES = (dict, FrozenConfig)
+
+
+def freeze(value):
+    """`value` with every dict made a FrozenConfig and every list a tuple; anything already frozen is returned as it is."""
+    if isinstance(value, FrozenConfig):
+        return value
+    if isinstance(value, dict) or isinstance(value, Mapping):  # dict first, as the quick check for the usual case
+        return FrozenConfig({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, FrozenConfig):
+        return value.thaw()
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+def deep_merge(a: Mapping, b: Mapping) -> FrozenConfig:
+    """
+    Deep merge dicts; values from b override a. Returns a frozen config that
+    shares whatever b leaves unchanged with (frozen) a, so only the dicts on
+    the paths b changes are new; if b changes nothing, that is a itself.
+    """
+    a = freeze(a)
+    if not isinstance(b, _TABLES) or not b:
+        return a
+    out = None
     for k, v in b.items():
-        if isinstance(v, dict) and isinstance(out.get(k), dict):
-            out[k] = deep_merge(out[k], v)
+        old = a._data.get(k, MISSING)
+        if isinstance(v, _TABLES) and isinstance(old, FrozenConfig):
+            new = deep_merge(old, v)
         else:
-            out[k] = v
-    return out
+            new = freeze(v)
+        if new is old or (type(new) is type(old) and new == old):
+            continue
+        if out is None:
+            out = dict(a._data)
+        out[k] = new
+    return a if out is None else FrozenConfig(out)
+
+
+def config_diff(old: Mapping, new: Mapping, _path: tuple = ()) -> dict:
+    """
+    What changed between two configs, as {path: (old value, new value)} with
+    paths as key tuples, e.g. {("ui", "font_size"): (22, 24)}; MISSING stands
+    for an absent key. Parts that two merged configs share are skipped
+    without being looked into, so comparing snapshots costs about as much as
+    the merge that made them.
+    """
+    changes = {}
+    if old is new:
+        return changes
+    for k in old.keys() | new.keys():
+        before, after = old.get(k, MISSING), new.get(k, MISSING)
+        if before is after:
+            continue
+        if isinstance(before, _TABLES) and isinstance(after, _TABLES):
+            changes.update(config_diff(before, after, _path + (k,)))
+        elif type(before) is not type(after) or before != after:
+            changes[_path + (k,)] = (before, after)
+    return changes
+
+
+def diff_touches(diff: dict, *prefixes: tuple) -> bool:
+    """True if any change in `diff` is at or below one of the paths `prefixes`, e.g. diff_touches(diff, ("ui",))."""
+    return any(path[:len(prefix)] == prefix for path in diff for prefix in prefixes)
 
 
 # ---------- config loaders ----------
@@ -111,6 +234,7 @@ def read_env_overlay() -> dict:
         remote["timeout_seconds"] = env_int(os.getenv("REMOTE_TIMEOUT_SECONDS"), 5)
     if "REMOTE_CACHE_TTL_SECONDS" in os.environ:
         remote["cache_ttl_seconds"] = env_int(os.getenv("REMOTE_CACHE_TTL_SECONDS"), 60)
+    if os.getenv("REMOTE_BOARD_ID"): remote["board_id"] = os.getenv("REMOTE_BOARD_ID")
     if remote: overlay["remote"] = remote
 
     # Optional: stash John-style options (if you later use them in rendering)
@@ -153,20 +277,31 @@ def read_env_overlay() -> dict:
     return overlay
 
 
+def load_layered(path: str | Path = "config.yml") -> FrozenConfig:
+    """The local layers: (config.yml) -> (env overlay). Remote overrides go on top of this."""
+    return deep_merge(load_config(path), read_env_overlay())
+
+
+def remote_from(cfg: Mapping) -> RemoteConfig | None:
+    """A RemoteConfig for the config's `remote:` section, or None if remote config is not enabled."""
+    r = cfg.get("remote") or {}
+    if not r.get("enabled"):
+        return None
+    return RemoteConfig(url=r.get("url", ""), timeout=int(r.get("timeout_seconds", 5)),
+                        board_id=r.get("board_id") or socket.gethostname())
+
+
 def load_with_env_and_remote(path: str | Path = "config.yml"):
     """
     Final config = (config.yml) -> (env overlay) -> (remote overrides if enabled).
-    Returns (merged_cfg, remote_config_or_none).
+    Returns (merged_cfg, remote_config_or_none); merged_cfg is a FrozenConfig.
+    To pick up later remote changes, hand the RemoteConfig to a config_poller.ConfigPoller.
     """
-    base = load_config(path)
-    env_overlay = read_env_overlay()
-    merged = deep_merge(base, env_overlay)
-
-    r = merged.get("remote") or {}
-    if not r.get("enabled"):
+    merged = load_layered(path)
+    rc = remote_from(merged)
+    if rc is None:
         return merged, None
 
-    rc = RemoteConfig(url=r.get("url", ""), timeout=int(r.get("timeout_seconds", 5)))
     remote = rc.fetch(force=True)
     if remote:
         merged = deep_merge(merged, remote)
@@ -184,7 +319,7 @@ def make_clients(cfg: dict):
 
 def get_national_rail_board(cfg: dict, *, crs: str | None = None, to_crs: str | None = None,
                             arrivals: bool | None = None, limit: int | None = None,
-                            include_calling_at: bool = True) -> list[dict]:
+                            include_calling_at: bool = True) -> list[Departure]:
     rttc = make_clients(cfg)
     d = cfg["defaults"]["national_rail"]
     return get_departures_as_livetimes(
@@ -196,7 +331,7 @@ def get_national_rail_board(cfg: dict, *, crs: str | None = None, to_crs: str |
         include_calling_at=include_calling_at,
     )
 
-def get_tube_board(cfg: dict, *, stop_point_id: str | None = None, limit: int | None = None) -> list[dict]:
+def get_tube_board(cfg: dict, *, stop_point_id: str | None = None, limit: int | None = None) -> list[Departure]:
     d = cfg["defaults"]["tube"]
     return tube_legacy_as_livetimes(
         stop_point_id=stop_point_id or d["stop_point_id"],
@@ -205,7 +340,7 @@ def get_tube_board(cfg: dict, *, stop_point_id: str | None = None, limit: int |
         limit=d.get("limit", 6) if limit is None else limit,
     )
 
-def interleave(a: list[dict], b: list[dict]) -> list[dict]:
+def interleave(a: list[Departure], b: list[Departure]) -> list[Departure]:
     out = []
     for i in range(max(len(a), len(b))):
         if i < len(a): out.append(a[i])
@@ -0,0 +1,210 @@
+from __future__ import annotations
+import io
+import struct
+import sys
+import time
+
+from PIL import Image, ImageChops
+from luma.core.device import dummy
+
+from frame_diff import _GREY_WEIGHTS, quantise
+
+try:
+    import numpy as np
+except ImportError:  # optional; quantising with PIL gives the same bytes, only slower
+    np = None
+
+# The 16 grey levels an SSD1322 can show, as an RGB palette.
+PALETTE = bytes(level * 17 for level in range(16) for _ in range(3))
+RAW_MAGIC = b"LDB4"
+
+
+def grey4(image: Image.Image) -> bytes:
+    """The 4-bit grey level (0-15) of each pixel, one byte a pixel, mapped as luma's ssd1322 does."""
+    if np is None:
+        return quantise(image).tobytes()
+    if image.mode == "1":
+        image = image.convert("L")
+    pixels = np.asarray(image)
+    if pixels.ndim == 3:
+        grey = (pixels[..., :3].astype(np.uint32) @ np.array(_GREY_WEIGHTS, dtype=np.uint32)) >> 14
+    else:
+        grey = pixels >> 4
+    return grey.astype(np.uint8).tobytes()
+
+
+def pack4(grey: bytes) -> bytes:
+    """Packs one-byte grey levels into 4bpp, even pixel in the high nibble: the bytes an SSD1322 is sent."""
+    if np is not None:
+        levels = np.frombuffer(grey, dtype=np.uint8)
+        return ((levels[0::2] << 4) | levels[1::2]).tobytes()
+    return bytes((grey[i] << 4) | grey[i + 1] for i in range(0, len(grey), 2))
+
+
+class GifWriter:
+    """
+    Appends frames to an animated GIF as they arrive, so memory stays flat
+    however long the capture. Frames use the panel's 16 greys and only the
+    box that changed since the previous frame is stored; each box is
+    LZW-compressed by Pillow and spliced into the stream.
+    """
+
+    def __init__(self, filename: str, size: tuple[int, int]):
+        self.size = size
+        self._file = open(filename, "wb")
+        self._file.write(b"GIF89a" + struct.pack("<HHBBB", size[0], size[1], 0xF3, 0, 0) + PALETTE)
+        self._file.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever
+        self._previous = None
+        self._elapsed = 0.0
+        self._written_cs = 0
+
+    def write(self, grey: bytes, repeats: int, seconds: float) -> None:
+        frame = Image.frombytes("L", self.size, grey)
+        box = (0, 0) + self.size
+        if self._previous is not None:
+            box = ImageChops.difference(self._previous, frame).getbbox() or (0, 0, 1, 1)
+        self._previous = frame
+
+        # Delays are whole centiseconds; rounding the running total keeps long captures in time.
+        self._elapsed += seconds
+        delay = max(1, int(round(self._elapsed * 100)) - self._written_cs)
+        self._written_cs += delay
+
+        patch = frame.crop(box)
+        patch = Image.frombytes("P", patch.size, patch.tobytes())
+        patch.putpalette(PALETTE)
+        table, descriptor, data = _gif_image(patch)
+        descriptor[1:5] = struct.pack("<HH", box[0], box[1])
+        if table[:len(PALETTE)] != PALETTE:  # Pillow remapped the colours; carry its table with the frame
+            descriptor[9] = 0x80 | ((len(table) // 3).bit_length() - 2)
+        else:
+            table = b""
+        # Graphic control extension: keep the previous frame underneath (disposal 1) for `delay`.
+        self._file.write(b"\x21\xf9\x04\x04" + struct.pack("<H", delay) + b"\x00\x00")
+        self._file.write(bytes(descriptor) + table + data)
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.write(b"\x3b")
+            self._file.close()
+
+
+class RawWriter:
+    """
+    Uncompressed dump for golden-image tests: a header of RAW_MAGIC, width and
+    height, then per frame a little-endian uint32 repeat count and the frame
+    packed 4bpp as the panel receives it. See read_raw().
+    """
+
+    def __init__(self, filename: str, size: tuple[int, int]):
+        self._file = open(filename, "wb")
+        self._file.write(RAW_MAGIC + struct.pack("<HH", *size))
+
+    def write(self, grey: bytes, repeats: int, seconds: float) -> None:
+        self._file.write(struct.pack("<I", repeats) + pack4(grey))
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def read_raw(filename: str):
+    """Yields (repeats, image) for each frame of a raw dump; images are "L" with the 16 greys spread over 0-255."""
+    with open(filename, "rb") as f:
+        if f.read(4) != RAW_MAGIC:
+            raise ValueError("%s is not a raw frame dump" % filename)
+        width, height = struct.unpack("<HH", f.read(4))
+        frame_bytes = width * height // 2
+        while True:
+            record = f.read(4 + frame_bytes)
+            if len(record) < 4 + frame_bytes:
+                return
+            packed = record[4:]
+            grey = bytearray(width * height)
+            grey[0::2] = bytes(b >> 4 for b in packed)
+            grey[1::2] = bytes(b & 0x0F for b in packed)
+            yield struct.unpack("<I", record[:4])[0], Image.frombytes("L", (width, height), bytes(grey)).point(lambda v: v * 17)
+
+
+class StreamingCapture(dummy):
+    """
+    Emulated display that streams what it is shown to a file: an animated GIF
+    (gifstream) or a raw 4bpp dump (raw). Unlike luma's gifanim, which keeps
+    every frame until exit, only the frame being timed is held, so captures of
+    thousands of frames run in constant memory.
+
+    Frames are timed by `clock` (when each was displayed), and with dedupe=True
+    identical consecutive frames are merged into one longer frame. After
+    max_frames frames the file is finished and the program exits, as gifanim
+    does.
+    """
+
+    def __init__(self, filename: str, format: str = "gif", width: int = 256, height: int = 64, rotate: int = 0,
+                 mode: str = "RGB", max_frames: int | None = None, dedupe: bool = False, clock=time.monotonic, **kwargs):
+        super().__init__(width=width, height=height, rotate=rotate, mode=mode, **kwargs)
+        self.filename = filename
+        self.format = format
+        self.max_frames = max_frames
+        self.dedupe = dedupe
+        self.frames = 0
+        self._clock = clock
+        self._writer = None
+        self._pending = None    # [grey, repeats, displayed at] of the frame still on screen
+
+    def display(self, image):
+        assert image.size == self.size
+        self.image = self.preprocess(image)
+        grey = grey4(self.image)
+        now = self._clock()
+        if self._writer is None:
+            self._writer = (RawWriter if self.format == "raw" else GifWriter)(self.filename, self.image.size)
+        self.frames += 1
+
+        if self._pending is not None and self.dedupe and self._pending[0] == grey:
+            self._pending[1] += 1
+        else:
+            self._flush(now)
+            self._pending = [grey, 1, now]
+
+        if self.max_frames and self.frames >= self.max_frames:
+            self.close()
+            sys.exit(0)
+
+    def _flush(self, now: float) -> None:
+        if self._pending is not None:
+            grey, repeats, shown = self._pending
+            self._writer.write(grey, repeats, now - shown)
+            self._pending = None
+
+    def close(self) -> None:
+        """Writes the last frame and finishes the file; further frames are ignored."""
+        if self._writer is not None:
+            self._flush(self._clock())
+            self._writer.close()
+        self.display = lambda image: None
+
+    def cleanup(self):
+        # Unlike a panel, there is nothing to blank at exit; clearing would only add a black frame.
+        self.close()
+
+
+def _gif_image(image: Image.Image):
+    """Has Pillow encode one "P" image as a GIF and returns (colour table, image descriptor, LZW data) from it."""
+    buffer = io.BytesIO()
+    image.save(buffer, "GIF", optimize=False)
+    data = buffer.getvalue()
+    flags, position, table = data[10], 13, b""
+    if flags & 0x80:
+        table = data[13:13 + (3 << ((flags & 7) + 1))]
+        position += len(table)
+    while data[position] == 0x21:  # skip extensions
+        position += 2
+        while data[position]:
+            position += data[position] + 1
+        position += 1
+    descriptor = bytearray(data[position:position + 10])
+    position += 10
+    if descriptor[9] & 0x80:
+        table = data[position:position + (3 << ((descriptor[9] & 7) + 1))]
+        position += len(table)
+    descriptor[9] &= 0x40  # keep only interlacing; the table, if any, is set by the caller
+    return table, descriptor, data[position:-1]
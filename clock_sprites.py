@@ -0,0 +1,109 @@
+from __future__ import annotations
+import time
+from PIL import Image, ImageChops, ImageDraw
+
+
+class ClockSprites:
+    """
+    The board's bottom clock, composed from pre-rendered glyph sprites.
+
+    The glyphs for 0-9, ':' and the AM/PM suffixes are drawn once with the clock
+    font. update() only rebuilds the clock image when the displayed text changes
+    (once a second, or once a minute without seconds) and reports whether the
+    clock region is dirty. draw() stamps the cached image onto a frame. A 12
+    hour clock is followed by AM or PM unless meridiem=False.
+    """
+
+    GLYPHS = "0123456789:"
+    SUFFIXES = ("AM", "PM")
+
+    def __init__(self, font, width: int, y: int, time_format: int = 24, seconds: bool = True,
+                 meridiem: bool = True):
+        self.font = font
+        self.width = width
+        self.y = y
+        self.time_format = time_format
+        self.seconds = seconds
+        self.meridiem = meridiem and time_format == 12
+        self.period = 1 if seconds else 60
+
+        ascent, descent = font.getmetrics()
+        self.height = ascent + descent
+        # Centring can land the clock on a half pixel; text is rendered sub-pixel, so keep both phases.
+        self.sprites = {phase: {ch: self._render(ch, phase) for ch in self.GLYPHS} for phase in (0.0, 0.5)}
+        self.suffixes = {phase: {s: self._render(s, phase) for s in self.SUFFIXES} for phase in (0.0, 0.5)}
+
+        self.text = ""
+        self.image = Image.new("L", (1, self.height))
+        self.position = (0, y)
+        self.dirty = True
+        self._second = None
+
+    def _render(self, text: str, phase: float):
+        advance = self.font.getlength(text)
+        image = Image.new("L", (max(1, int(advance) + 2), self.height))
+        ImageDraw.Draw(image).text((phase, 0), text, font=self.font, fill=255)
+        return image, advance
+
+    def format(self, now: float) -> str:
+        t = time.localtime(now)
+        hour = t.tm_hour
+        if self.time_format == 12:
+            hour = hour % 12 or 12
+        text = "%02d:%02d" % (hour, t.tm_min)
+        if self.seconds:
+            text += ":%02d" % t.tm_sec
+        if self.meridiem:
+            text += " " + self.SUFFIXES[t.tm_hour >= 12]
+        return text
+
+    def update(self, now: float | None = None) -> bool:
+        """Rebuilds the clock if its text changed; returns True when the clock region is dirty."""
+        now = time.time() if now is None else now
+        second = int(now)
+        if second != self._second:
+            self._second = second
+            text = self.format(now)
+            if text != self.text:
+                self.text = text
+                self._compose(text)
+                self.dirty = True
+        return self.dirty
+
+    def _compose(self, text: str) -> None:
+        # Each part is a glyph or suffix key, or None for the gap before AM/PM.
+        parts = []
+        for token in text.split(" "):
+            parts.append(None)
+            parts.extend([token] if token in self.SUFFIXES else token)
+        parts.pop(0)
+
+        gap = self.font.getlength(" ")
+        total = sum(gap if p is None else self.sprites[0.0].get(p, self.suffixes[0.0].get(p))[1] for p in parts)
+        left = (self.width - int(total)) / 2
+        phase = 0.5 if left % 1 else 0.0
+        sprites, suffixes = self.sprites[phase], self.suffixes[phase]
+
+        image = Image.new("L", (int(total) + 2, self.height))
+        x = 0.0
+        for p in parts:
+            if p is None:
+                x += gap
+                continue
+            sprite, advance = sprites[p] if p in sprites else suffixes[p]
+            box = (int(x), 0, int(x) + sprite.width, sprite.height)
+            # Glyph cells can overlap slightly; keep the brighter pixel as text rendering would.
+            image.paste(ImageChops.lighter(image.crop(box), sprite), box)
+            x += advance
+        self.image = image
+        self.position = (int(left), self.y)
+
+    @property
+    def bbox(self) -> tuple[int, int, int, int]:
+        x, y = self.position
+        return (x, y, x + self.image.width, y + self.image.height)
+
+    def draw(self, draw) -> None:
+        """Stamps the clock onto an ImageDraw (e.g. a luma canvas) and clears the dirty flag."""
+        draw.bitmap(self.position, self.image, fill="white")
+        self.dirty = False
@@ -0,0 +1,185 @@
+from __future__ import annotations
+from PIL import Image, ImageDraw
+from luma.core.image_composition import ImageComposition
+from luma.core.render import canvas
+
+# numpy, imported by _numpy() the first time the "numpy" compositor is asked for; importing it costs
+# more than the rest of the board's imports together, a couple of seconds on a Pi Zero.
+np = None
+
+
+def _numpy():
+    """The numpy module, imported on first use; None when it is not installed (it is optional)."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+
+class TrackedComposition(ImageComposition):
+    """
+    ImageComposition that remembers whether anything changed since the last
+    frame was drawn, so the main loop can skip redrawing a static board.
+    Adding/removing images marks it dirty; callers that move an image's
+    offset call mark_dirty() themselves.
+
+    It also keeps the damaged region, the union of the footprints of every
+    image added, removed or marked since the last refresh(), and refresh() only
+    recomposes that region. A frame where one row scrolls then costs the same
+    however many rows the board has.
+    """
+
+    def __init__(self, device):
+        super().__init__(device)
+        self.dirty = True
+        self.damage = (0, 0) + device.size
+
+    def add_image(self, image):
+        super().add_image(image)
+        self.mark_dirty(image)
+
+    def remove_image(self, image):
+        super().remove_image(image)
+        self.mark_dirty(image)
+
+    def mark_dirty(self, image=None):
+        """Marks the frame for redrawing; only `image`'s footprint is recomposed if given, else the whole frame."""
+        self.dirty = True
+        # Boxes here are (left, top, right, bottom) with right and bottom exclusive; luma's bounding_box is inclusive.
+        box = self.footprint(image) if image is not None else (0, 0) + self._device.size
+        if self.damage is not None:
+            box = (min(box[0], self.damage[0]), min(box[1], self.damage[1]),
+                   max(box[2], self.damage[2]), max(box[3], self.damage[3]))
+        self.damage = box
+
+    def footprint(self, image):
+        """The device pixels an image covers; luma draws min(device, image) from its position, padding included."""
+        width, height = self._device.size
+        x, y = int(image.position[0]), int(image.position[1])
+        return (x, y, x + min(width, image.width), y + min(height, image.height))
+
+    def take_damage(self):
+        """Returns the damaged region clipped to the device (None if nothing needs recomposing) and clears it."""
+        box, self.damage = self.damage, None
+        if box is None:
+            return None
+        width, height = self._device.size
+        box = (max(0, box[0]), max(0, box[1]), min(width, box[2]), min(height, box[3]))
+        return box if box[0] < box[2] and box[1] < box[3] else None
+
+    def refresh(self):
+        box = self.take_damage()
+        if box is None:
+            return
+        if box == (0, 0) + self._device.size:
+            super().refresh()
+            return
+        background = self._background_image
+        ImageDraw.Draw(background).rectangle((box[0], box[1], box[2] - 1, box[3] - 1), fill="black")
+        for img in self.composed_images:
+            x0, y0, x1, y1 = self.footprint(img)
+            left, top, right, bottom = max(x0, box[0]), max(y0, box[1]), min(x1, box[2]), min(y1, box[3])
+            if left >= right or top >= bottom:
+                continue
+            ox, oy = int(img.offset[0]), int(img.offset[1])
+            background.paste(img._image.crop((ox + left - x0, oy + top - y0, ox + right - x0, oy + bottom - y0)),
+                             (left, top))
+
+
+class ArrayComposition(TrackedComposition):
+    """
+    Drop-in for ImageComposition that composites with NumPy.
+
+    Each ComposableImage is converted once to a uint8 greyscale array (cached on
+    the image itself). refresh() copies the layers over the damaged region into
+    a preallocated (H, W) framebuffer with array slices, using the same
+    offset/crop/paste rules as luma, so ScrollTime's add/remove/offset calls
+    behave exactly as before.
+    present() hands `framebuffer` straight to PackedSSD1322.display_array for
+    4bpp packing; calling the composition returns a PIL image for canvas() as usual.
+    """
+
+    def __init__(self, device):
+        if _numpy() is None:
+            raise RuntimeError("ArrayComposition requires numpy (pip install numpy)")
+        super().__init__(device)
+        self.framebuffer = np.zeros((device.height, device.width), dtype=np.uint8)
+        self._stale = False
+
+    def __call__(self):
+        if self._stale:
+            image = Image.fromarray(self.framebuffer, "L")
+            self._background_image = image if self._device.mode == "L" else image.convert(self._device.mode)
+            self._stale = False
+        return self._background_image
+
+    def refresh(self):
+        box = self.take_damage()
+        if box is None:
+            return
+        self.framebuffer[box[1]:box[3], box[0]:box[2]] = 0
+        for img in self.composed_images:
+            self._blit(self._layer(img), img.position, img.offset, box)
+        self._stale = True
+
+    @staticmethod
+    def _layer(img):
+        source = img._image
+        cached = getattr(img, "_layer_array", None)
+        if cached is None or cached[0] is not source:
+            grey = source if source.mode == "L" else source.convert("L")
+            cached = (source, np.asarray(grey, dtype=np.uint8))
+            img._layer_array = cached
+        return cached[1]
+
+    def _blit(self, layer, position, offset, box):
+        fb = self.framebuffer
+        height, width = fb.shape
+        h, w = layer.shape
+        px, py = int(position[0]), int(position[1])
+        left, top = int(offset[0]), int(offset[1])
+
+        # luma crops min(device, image) from the offset and pastes the whole box,
+        # black padding included, so a layer always overwrites what is below it.
+        dx0, dy0 = max(box[0], px), max(box[1], py)
+        dx1, dy1 = min(box[2], px + min(width, w)), min(box[3], py + min(height, h))
+        if dx0 >= dx1 or dy0 >= dy1:
+            return
+        sx0, sy0 = left + dx0 - px, top + dy0 - py
+        sx1, sy1 = sx0 + (dx1 - dx0), sy0 + (dy1 - dy0)
+
+        cx0, cy0, cx1, cy1 = max(sx0, 0), max(sy0, 0), min(sx1, w), min(sy1, h)
+        if (cx0, cy0, cx1, cy1) != (sx0, sy0, sx1, sy1):
+            fb[dy0:dy1, dx0:dx1] = 0
+        if cx0 < cx1 and cy0 < cy1:
+            fb[dy0 + cy0 - sy0:dy0 + cy1 - sy0, dx0 + cx0 - sx0:dx0 + cx1 - sx0] = layer[cy0:cy1, cx0:cx1]
+
+
+def present(device, composition, overlay) -> None:
+    """
+    Shows the composed frame with overlay(draw) (the clock, a header) drawn over
+    it. An ArrayComposition on a device that packs arrays
+    (PackedSSD1322.display_array) is sent straight from its framebuffer;
+    anything else goes through a luma canvas.
+    """
+    if isinstance(composition, ArrayComposition) and hasattr(device, "display_array"):
+        # fromarray shares the framebuffer read-only; drawing copies it, so the overlay is not left behind.
+        image = Image.fromarray(composition.framebuffer, "L")
+        overlay(ImageDraw.Draw(image))
+        device.display_array(np.asarray(image))
+        return
+    with canvas(device, background=composition()) as draw:
+        overlay(draw)
+
+
+def create_composition(device, compositor: str = "pil"):
+    """Returns the board's image composition; 'numpy' selects ArrayComposition when numpy is installed."""
+    if compositor == "numpy":
+        if _numpy() is not None:
+            return ArrayComposition(device)
+        print("numpy is not installed, falling back to the PIL compositor.")
+    return TrackedComposition(device)
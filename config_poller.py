@@ -0,0 +1,106 @@
+from __future__ import annotations
+import threading
+
+from board_sources import config_diff, deep_merge, diff_touches, freeze
+
+
+class ConfigPoller:
+    """
+    Keeps a running board's config up to date with its remote overrides, with
+    no restart.
+
+    poll() sends one conditional request (see RemoteConfig); a 304, an error or
+    an unchanged body leaves the config alone. Changed overrides are merged onto
+    `layered`, the local layers (config.yml and the env overlay), so a key the
+    remote drops goes back to its local value. The new snapshot is published by
+    assigning `config`, which readers on other threads pick up without locking.
+    Each subscriber whose prefixes the change touches is then called with
+    (config, diff), so fonts, layout, stations and limits each reload only when
+    their part of the config changed. Subscribers run on the poller's thread,
+    so a slow reload (loading a font, refetching a board) never holds up a
+    render loop; they hand their results back the same way, by assignment.
+
+    run() polls every `ttl` seconds, by default the current config's
+    remote.cache_ttl_seconds (so the remote can change it too); start() runs it
+    on a daemon thread. With `validate` (e.g. config_schema.compile_config),
+    each new snapshot is passed to it first, and one it raises on is not
+    published; the board carries on with the config it has.
+    """
+
+    def __init__(self, layered, remote, ttl: float | None = None, validate=None):
+        self.layered = freeze(layered)
+        self.remote = remote
+        self._ttl = ttl
+        self._validate = validate
+        self._overrides = remote.cached()
+        self.config = deep_merge(self.layered, self._overrides or {})
+        self.version = 0        # how many changes have been published
+        self._subscribers = []  # (callback, prefixes)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        ttl = (self.config.get("remote") or {}).get("cache_ttl_seconds", 60)
+        try:
+            return max(float(ttl or 60), 1.0)
+        except (TypeError, ValueError):
+            return 60.0
+
+    def subscribe(self, callback, *prefixes: tuple) -> None:
+        """
+        Calls callback(config, diff) after each change at or below one of
+        `prefixes` (key tuples, e.g. ("ui", "font_size")), or after every
+        change if there are none. Subscribers are called in the order they
+        subscribed, so a redraw can come after the reloads it depends on.
+        """
+        self._subscribers.append((callback, prefixes))
+
+    def poll(self) -> dict:
+        """Fetches the remote overrides once and publishes any change; returns the config_diff() ({} for none)."""
+        overrides = self.remote.fetch()
+        if overrides is None or overrides is self._overrides:
+            return {}
+        self._overrides = overrides
+        config = deep_merge(self.layered, overrides)
+        diff = config_diff(self.config, config)
+        if not diff:
+            return diff
+        if self._validate is not None:
+            try:
+                self._validate(config)
+            except ValueError as e:
+                print("Remote config rejected")
+                print(str(e))
+                return {}
+        self.config = config
+        self.version += 1
+        for callback, prefixes in self._subscribers:
+            if prefixes and not diff_touches(diff, *prefixes):
+                continue
+            try:
+                callback(config, diff)
+            except Exception as e:
+                print("Config reload ERROR")
+                print(str(e))
+        return diff
+
+    def run(self) -> None:
+        """Polls every `ttl` seconds until stop() is called."""
+        while not self._stop.wait(self.ttl):
+            try:
+                self.poll()
+            except Exception as e:
+                print("Config poll ERROR")
+                print(str(e))
+
+    def start(self) -> ConfigPoller:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="config", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
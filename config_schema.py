@@ -0,0 +1,322 @@
+from __future__ import annotations
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from datetime import datetime, time as clock_time
+from functools import lru_cache
+
+from board_sources import FrozenConfig, freeze
+
+BOARDS = ("rail", "bus", "tube")
+
+
+class ConfigError(ValueError):
+    """Everything wrong with a config, found in one pass; `problems` lists them as "path: what is wrong"."""
+
+    def __init__(self, problems: list[str]):
+        super().__init__("Invalid config:\n  " + "\n  ".join(problems))
+        self.problems = problems
+
+
+# ---------- value parsers ----------
+# Each takes a value as YAML, JSON or the env overlay gives it (so numbers and flags may arrive as strings) and returns it
+# typed, or raises ValueError saying what it should have been.
+
+def text(value) -> str:
+    if isinstance(value, (Mapping, tuple, list)):
+        raise ValueError("must be text, got %r" % (value,))
+    return "" if value is None else str(value)
+
+
+def optional_text(value) -> str | None:
+    return text(value) or None
+
+
+def flag(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    word = str(value).strip().lower()
+    if word in {"1", "true", "yes", "y", "on"}:
+        return True
+    if word in {"0", "false", "no", "n", "off", ""}:
+        return False
+    raise ValueError("must be true or false, got %r" % (value,))
+
+
+def integer(value, minimum: int = 0) -> int:
+    try:
+        if isinstance(value, bool) or float(value) != int(float(value)):
+            raise ValueError
+        number = int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("must be a whole number, got %r" % (value,)) from None
+    if number < minimum:
+        raise ValueError("must be at least %d, got %r" % (minimum, value))
+    return number
+
+
+def positive(value) -> int:
+    return integer(value, minimum=1)
+
+
+def seconds(value) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("must be a number of seconds, got %r" % (value,)) from None
+    if not number > 0:
+        raise ValueError("must be more than 0 seconds, got %r" % (value,))
+    return number
+
+
+def choice(*choices):
+    def parse(value):
+        for c in choices:
+            if str(value).strip().lower() == str(c):
+                return c
+        raise ValueError("must be one of %s, got %r" % (", ".join(map(str, choices)), value))
+    return parse
+
+
+def words(value) -> tuple:
+    """A list of names, as the board scripts' nargs='*' options take; "1 2", "1,2" and [1, 2] all give ("1", "2")."""
+    if isinstance(value, (tuple, list)):
+        return tuple(text(v) for v in value)
+    return tuple(text(value).replace(",", " ").split())
+
+
+def time_range(value) -> tuple:
+    """"23:00-07:00" as (start, end) datetime.times, as the board scripts' --InactiveHours."""
+    if isinstance(value, tuple) and len(value) == 2 and all(isinstance(t, clock_time) for t in value):
+        return value
+    try:
+        start, end = str(value).split("-")
+        return datetime.strptime(start.strip(), "%H:%M").time(), datetime.strptime(end.strip(), "%H:%M").time()
+    except ValueError:
+        raise ValueError("must be in the form XX:XX-YY:YY (24 hour), got %r" % (value,)) from None
+
+
+def setting(default, parse):
+    return field(default=default, metadata={"parse": parse})
+
+
+def section(cls):
+    return field(default_factory=cls, metadata={"section": cls})
+
+
+# ---------- schema ----------
+
+@dataclass(frozen=True, slots=True)
+class RttConfig:
+    base_url: str = setting("", text)
+    username: str = setting("", text)
+    password: str = setting("", text)
+
+
+@dataclass(frozen=True, slots=True)
+class TflConfig:
+    app_id: str = setting("", text)
+    app_key: str = setting("", text)
+
+
+@dataclass(frozen=True, slots=True)
+class NationalRailDefaults:
+    crs: str = setting("WNC", text)
+    to_crs: str | None = setting("PAD", optional_text)
+    arrivals: bool = setting(False, flag)
+    limit: int = setting(6, positive)
+
+
+@dataclass(frozen=True, slots=True)
+class TubeDefaults:
+    stop_point_id: str = setting("940GZZLUSWK", text)
+    limit: int = setting(6, positive)
+
+
+@dataclass(frozen=True, slots=True)
+class Defaults:
+    national_rail: NationalRailDefaults = section(NationalRailDefaults)
+    tube: TubeDefaults = section(TubeDefaults)
+
+
+@dataclass(frozen=True, slots=True)
+class UiConfig:
+    interleave: bool = setting(False, flag)
+    font_path: str | None = setting("fonts/DotMatrix-Regular.ttf", optional_text)
+    font_bold_path: str | None = setting(None, optional_text)
+    font_size: int = setting(22, positive)
+    line_height: int = setting(24, positive)
+    left_margin: int = setting(4, integer)
+
+
+@dataclass(frozen=True, slots=True)
+class RemoteSettings:
+    enabled: bool = setting(False, flag)
+    url: str = setting("", text)
+    timeout_seconds: float = setting(5.0, seconds)
+    cache_ttl_seconds: float = setting(60.0, seconds)
+    board_id: str | None = setting(None, optional_text)
+
+
+def option(parse, name: str, boards: tuple = BOARDS, when: bool | None = None):
+    """
+    A board script option: passed as `name` and the value to the `boards`
+    given, or for a switch (`when` set), `name` alone when the value is `when`.
+    None, the default, leaves the script's own default.
+    """
+    return board_option(parse, {board: (name, when) for board in boards})
+
+
+def board_option(parse, flags: dict):
+    """An option spelt differently per board script: {board: (flag, when)}, as for option()."""
+    return field(default=None, metadata={"parse": parse, "flags": flags})
+
+
+@dataclass(frozen=True, slots=True)
+class BoardOptions:
+    """
+    The board scripts' start up parameters, as set in john_options (e.g. from
+    the TIME_FORMAT or SHOW_INDEX environment variables), checked as the
+    scripts would check them. argv(board) turns them into command line
+    arguments for that board; options a board does not have are left out.
+    """
+
+    time_format: int | None = option(choice(12, 24), "--TimeFormat")
+    speed: int | None = option(positive, "--Speed")
+    delay: int | None = option(positive, "--Delay")
+    recovery_time: int | None = option(positive, "--RecoveryTime")
+    number_of_cards: int | None = option(positive, "--NumberOfCards")
+    rotation: int | None = option(choice(0, 2), "--Rotation")
+    request_limit: int | None = option(positive, "--RequestLimit")
+    static_update_limit: int | None = option(positive, "--StaticUpdateLimit")
+    energy_saving_mode: str | None = option(choice("none", "dim", "off"), "--EnergySaverMode")
+    inactive_hours: tuple | None = option(time_range, "--InactiveHours")
+    update_days: int | None = option(positive, "--UpdateDays")
+    excluded_platforms: tuple | None = option(words, "--ExcludedPlatforms", ("rail",))
+    header: str | None = option(choice("desc", "loc", "date", "none"), "--Header", ("rail",))
+    header_alignment: str | None = option(choice("right", "center"), "--HeaderAlignment", ("rail",))
+    design: str | None = option(choice("full", "compact"), "--Design", ("rail",))
+    show_calling_at_for_direct: bool | None = option(flag, "--ShowCallingAtForDirect", ("rail",), when=True)
+    hide_platform: bool | None = option(flag, "--HidePlatform", ("rail",), when=True)
+    show_index: bool | None = board_option(flag, {"rail": ("--ShowIndex", True), "bus": ("--ShowIndex", True),
+                                                  "tube": ("--HideIndex", False)})
+    reduced_animations: bool | None = option(flag, "--ReducedAnimations", ("rail", "bus"), when=True)
+    fix_next_to_arrive: bool | None = board_option(flag, {"rail": ("--FixNextToArrive", True),
+                                                          "bus": ("--UnfixNextToArrive", False),
+                                                          "tube": ("--FixNextToArrive", True)})
+    no_splashscreen: bool | None = option(flag, "--no-splashscreen", when=True)
+    exclude_lines: tuple | None = option(words, "--ExcludeLines", ("tube",))
+    direction: str | None = option(choice("inbound", "outbound", "both"), "--Direction", ("tube",))
+    warning_time: int | None = option(positive, "--WarningTime", ("tube",))
+    increased_animations: bool | None = option(flag, "--IncreasedAnimations", ("tube",), when=True)
+    display: str | None = option(choice("ssd1322", "pygame", "capture", "gifanim", "gifstream", "raw"), "--Display")
+    max_frames: int | None = option(positive, "--max-frames")
+    no_pip_update: bool | None = board_option(flag, {})  # accepted for old .env files; the scripts no longer update pip
+
+    def argv(self, board: str) -> list[str]:
+        args = []
+        for f in fields(self):
+            value = getattr(self, f.name)
+            spelling = f.metadata["flags"].get(board)
+            if value is None or spelling is None:
+                continue
+            name, when = spelling
+            if when is None:
+                args += [name] + _arguments(value)
+            elif value == when:
+                args.append(name)
+        return args
+
+
+def _panels(value) -> tuple:
+    if value is None:
+        return ()
+    if not isinstance(value, tuple):
+        raise ValueError("must be a list of panels, got %r" % (value,))
+    panels = []
+    for index, spec in enumerate(value):
+        if not isinstance(spec, Mapping) or not isinstance(spec.get("board"), str):
+            raise ValueError("panel %d must name its board, got %r" % (index, spec))
+        device = spec.get("device")
+        panels.append(PanelConfig(board=spec["board"], args=tuple(str(arg) for arg in spec.get("args") or ()),
+                                  device=device.thaw() if isinstance(device, FrozenConfig) else device,
+                                  name=spec.get("name")))
+    return tuple(panels)
+
+
+@dataclass(frozen=True, slots=True)
+class PanelConfig:
+    """One entry of `panels:` (see panels.py); `device` is a plain dict of create_device() arguments, or None."""
+    board: str
+    args: tuple = ()
+    device: dict | None = None
+    name: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class BoardConfig:
+    """
+    A whole config, typed and checked: config.yml's sections as attributes,
+    e.g. config.defaults.tube.limit or config.ui.font_size, with the
+    defaults of config.yml for anything left out. `source` is the frozen
+    config it was compiled from, for code that takes the mapping.
+    """
+
+    rtt: RttConfig = section(RttConfig)
+    tfl: TflConfig = section(TflConfig)
+    defaults: Defaults = section(Defaults)
+    panels: tuple = setting((), _panels)
+    ui: UiConfig = section(UiConfig)
+    remote: RemoteSettings = section(RemoteSettings)
+    john_options: BoardOptions = section(BoardOptions)
+    source: FrozenConfig = field(default=None, compare=False, repr=False)
+
+
+def compile_config(cfg) -> BoardConfig:
+    """
+    The BoardConfig for a config mapping (e.g. from load_with_env_and_remote),
+    raising ConfigError listing every bad value and unknown key at once.
+    Compiled once per config: as merged configs are frozen, asking again for
+    the same snapshot (or an equal one) returns the same object.
+    """
+    return _compile(freeze(cfg))
+
+
+@lru_cache(maxsize=8)
+def _compile(cfg: FrozenConfig) -> BoardConfig:
+    problems = []
+    config = _build(BoardConfig, cfg, (), problems, source=cfg)
+    if problems:
+        raise ConfigError(problems)
+    return config
+
+
+def _build(cls, data, path: tuple, problems: list, **extra):
+    if data is None:
+        data = {}
+    elif not isinstance(data, Mapping):
+        problems.append("%s: must be a section of settings, got %r" % (".".join(path), data))
+        data = {}
+    settings = {f.name: f for f in fields(cls) if f.metadata}
+    for key in data:
+        if key not in settings:
+            problems.append("%s: unknown setting" % ".".join(path + (str(key),)))
+    values = dict(extra)
+    for name, f in settings.items():
+        if name not in data:
+            continue
+        if "section" in f.metadata:
+            values[name] = _build(f.metadata["section"], data[name], path + (name,), problems)
+            continue
+        try:
+            values[name] = f.metadata["parse"](data[name])
+        except ValueError as e:
+            problems.append("%s: %s" % (".".join(path + (name,)), e))
+    return cls(**values)
+
+
+def _arguments(value) -> list[str]:
+    if isinstance(value, tuple) and value and isinstance(value[0], clock_time):
+        return ["-".join(t.strftime("%H:%M") for t in value)]
+    if isinstance(value, tuple):
+        return list(value)
+    return [str(value)]
@@ -0,0 +1,240 @@
+"""
+A stand-in for the central config URL boards poll (remote.url), for trying
+out config distribution across a fleet offline.
+
+    python config_server.py FLEET_DIR [--port 8000] [--host 0.0.0.0]
+
+FLEET_DIR holds remote_config-style YAML documents of overrides: all.yml for
+every board, and <board id>.yml for one board (its hostname, or remote.board_id).
+Point the boards' remote.url at http://<host>:<port>/config.yml.
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import yaml
+
+from board_sources import deep_merge, freeze
+
+BASE = "all"
+BOARD_ID = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]{0,63}$")
+
+
+class Document:
+    """One board's rendered config: the YAML body, its gzipped form and the validators for both."""
+
+    __slots__ = ("body", "gzipped", "etag", "last_modified", "modified")
+
+    def __init__(self, data):
+        self.body = yaml.safe_dump(data, sort_keys=True).encode("utf-8")
+        self.gzipped = gzip.compress(self.body, mtime=0)
+        digest = hashlib.sha1(self.body).hexdigest()[:16]
+        # Strong validators, one per representation, as the two bodies differ byte for byte.
+        self.etag = {False: '"%s"' % digest, True: '"%s-gzip"' % digest}
+        self.modified = None
+        self.last_modified = None
+
+    def date(self, modified: int) -> None:
+        self.modified = modified
+        self.last_modified = formatdate(modified, usegmt=True)
+
+
+class ConfigServer:
+    """
+    Serves each board the overrides in all.yml with its own <board id>.yml
+    merged on top. The board is named by the X-Board-Id header RemoteConfig
+    sends, or a ?board= query; anything else gets all.yml alone.
+
+    Documents are rendered and gzipped once per change to the files behind
+    them (checked by mtime on each request) and shared by every board with
+    the same overlay, so a poll costs two stat() calls and, usually, a 304:
+    responses carry a strong ETag and Last-Modified, and If-None-Match (or,
+    without it, If-Modified-Since) is honoured. Bodies are gzipped for
+    clients that accept it.
+
+    Last-Modified is not taken from the files: deleting an overlay, or
+    replacing it with an older file, would move it backwards. Each new
+    document is dated when it is rendered, one second past the last date
+    given out if need be, so no two documents share one; If-Modified-Since
+    is then answered by comparing for equality.
+    """
+
+    def __init__(self, directory: str, port: int = 8000, host: str = "0.0.0.0"):
+        self.directory = directory
+        self.address = (host, port)
+        self._lock = threading.Lock()
+        self._documents = {}    # board id or None -> ((mtime, ...), Document)
+        self._dated = 0         # the last Last-Modified given out, in epoch seconds
+        self._server = None
+        self._stats = {"requests": 0, "200": 0, "304": 0, "errors": 0, "bytes": 0, "renders": 0}
+
+    def document(self, board: str | None) -> Document | None:
+        """The document for `board` (None for all.yml alone), rendered again only if its files changed; None if all.yml is missing."""
+        base = self._mtime(BASE)
+        if base is None:
+            return None
+        overlay = self._mtime(board) if board else None
+        key = board if overlay is not None else None
+        stamp = (base, overlay)
+        with self._lock:
+            cached = self._documents.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+        data = freeze(self._load(BASE))
+        if overlay is not None:
+            data = deep_merge(data, self._load(board))
+        document = Document(data.thaw())
+        with self._lock:
+            if cached is not None and cached[1].etag == document.etag:
+                document = cached[1]  # the files were touched, not changed; keep its date
+            else:
+                self._dated = max(int(time.time()), self._dated + 1)
+                document.date(self._dated)
+            self._documents[key] = (stamp, document)
+            self._stats["renders"] += 1
+        return document
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name + ".yml")
+
+    def _mtime(self, name: str) -> float | None:
+        try:
+            return os.stat(self._path(name)).st_mtime
+        except OSError:
+            return None
+
+    def _load(self, name: str) -> dict:
+        with open(self._path(name), "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        return data if isinstance(data, dict) else {}
+
+    def count(self, what: str, sent: int = 0) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats[what] += 1
+            self._stats["bytes"] += sent
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+    def start(self) -> None:
+        """Starts serving on a daemon thread."""
+        self._server = self._make_server()
+        threading.Thread(target=self._server.serve_forever, name="config-server", daemon=True).start()
+
+    def serve_forever(self) -> None:
+        self._server = self._make_server()
+        self._server.serve_forever()
+
+    def _make_server(self) -> ThreadingHTTPServer:
+        config_server = self
+
+        class Handler(ConfigHandler):
+            server_config = config_server
+        server = FleetHTTPServer(self.address, Handler)
+        self.address = server.server_address
+        return server
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class FleetHTTPServer(ThreadingHTTPServer):
+    # Boards poll in bursts (the whole fleet after a power cut, say); with the default backlog of 5, connections beyond
+    # it are dropped and each waits a second for its SYN to be resent.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class ConfigHandler(BaseHTTPRequestHandler):
+    server_config: ConfigServer = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server_config
+        path, _, query = self.path.partition("?")
+        if path == "/stats":
+            self.send_body(json.dumps(server.stats()).encode("utf-8"), "application/json", {"Cache-Control": "no-store"})
+            return
+        board = self.headers.get("X-Board-Id") or parse_qs(query).get("board", [None])[0]
+        if board and not BOARD_ID.match(board):
+            server.count("errors")
+            self.send_error(400, "Bad board id")
+            return
+        document = server.document(board)
+        if document is None:
+            server.count("errors")
+            self.send_error(404, "No %s.yml" % BASE)
+            return
+
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        headers = {"ETag": document.etag[gzipped], "Last-Modified": document.last_modified,
+                   "Cache-Control": "no-cache", "Vary": "Accept-Encoding, X-Board-Id"}
+        if self.not_modified(document, gzipped):
+            server.count("304")
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if gzipped:
+            headers["Content-Encoding"] = "gzip"
+        body = document.gzipped if gzipped else document.body
+        server.count("200", len(body))
+        self.send_body(body, "application/yaml; charset=utf-8", headers)
+
+    def not_modified(self, document: Document, gzipped: bool) -> bool:
+        match = self.headers.get("If-None-Match")
+        if match is not None:
+            return match.strip() == "*" or document.etag[gzipped] in (tag.strip() for tag in match.split(","))
+        since = self.headers.get("If-Modified-Since")
+        if since is not None:
+            try:
+                return parsedate_to_datetime(since).timestamp() == document.modified
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def send_body(self, body: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serves remote config overrides to a fleet of boards.")
+    parser.add_argument("directory", help="Directory holding all.yml and any <board id>.yml overlays")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--host", default="0.0.0.0")
+    args = parser.parse_args(argv)
+
+    server = ConfigServer(args.directory, port=args.port, host=args.host)
+    print("Serving %s on http://%s:%d/config.yml" % (args.directory, args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
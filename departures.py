@@ -0,0 +1,157 @@
+from __future__ import annotations
+import time
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+
+class Departure:
+    """
+    One service on a board: the record the board scripts' LiveTime classes
+    extend and the rtt/tube adapters return.
+
+    Scheduled and Expected are epoch seconds, parsed once when the data
+    arrives (None when unknown); Status replaces the expected time with text
+    such as "On time", "Delayed" or "Cancelled". SchArrival and ExptArrival
+    give the "HH:MM" strings the adapters used to return, formatted once per
+    minute, and the record can be read and updated like those dicts
+    (row["ExptArrival"], row["Index"] = 2).
+    """
+
+    __slots__ = ("Index", "ID", "Operator", "Destination", "Scheduled", "Expected", "Status",
+                 "CallingAt", "Platforms", "IsCancelled", "DisruptionReason", "DisplayText")
+    # The keys of the adapters' old dicts, in their order.
+    FIELDS = ("Index", "ID", "Operator", "Destination", "SchArrival", "ExptArrival", "CallingAt",
+              "Platforms", "IsCancelled", "DisruptionReason", "DisplayText")
+
+    def __init__(self, ID: str = "0", Destination: str = " ", Scheduled: int | None = None,
+                 Expected: int | None = None, Status: str | None = None, Index=0, Operator: str = "",
+                 CallingAt: str = "", Platforms: str = "", IsCancelled: bool = False,
+                 DisruptionReason: str = "", DisplayText: str = ""):
+        self.Index = Index
+        self.ID = ID
+        self.Operator = Operator
+        self.Destination = Destination
+        self.Scheduled = Scheduled
+        self.Expected = Expected
+        self.Status = Status
+        self.CallingAt = CallingAt
+        self.Platforms = Platforms
+        self.IsCancelled = IsCancelled
+        self.DisruptionReason = DisruptionReason
+        self.DisplayText = DisplayText
+
+    @property
+    def SchArrival(self) -> str:
+        return hhmm(self.Scheduled) if self.Scheduled is not None else "--:--"
+
+    @property
+    def ExptArrival(self) -> str:
+        if self.Status is not None:
+            return self.Status
+        return hhmm(self.Expected) if self.Expected is not None else self.SchArrival
+
+    def due(self) -> int | None:
+        """Epoch seconds the service is expected, falling back to the scheduled time."""
+        return self.Expected if self.Expected is not None else self.Scheduled
+
+    def minutes_until(self, now: float) -> float:
+        """Minutes from `now` (epoch seconds) until the service is due."""
+        return (self.due() - now) / 60
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS and key not in Departure.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in Departure.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key) -> bool:
+        return key in self.FIELDS or key in Departure.__slots__
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def as_dict(self) -> dict:
+        return {key: self[key] for key in self.FIELDS}
+
+    def __repr__(self) -> str:
+        return "%s(%r)" % (type(self).__name__, self.as_dict())
+
+
+@lru_cache(maxsize=1024)
+def _format_minute(minute: int, pattern: str) -> str:
+    return time.strftime(pattern, time.localtime(minute * 60))
+
+
+def hhmm(epoch: float, time_format: int = 24) -> str:
+    """Local "HH:MM" of `epoch` (12 hour "II:MM" with time_format=12); each minute is formatted once."""
+    return _format_minute(int(epoch) // 60, "%H:%M" if time_format == 24 else "%I:%M")
+
+
+class ServiceDay:
+    """
+    Places the bare "HH:MM" local times of a feed (Darwin, the Transport API)
+    on the nearest plausible day: a 00:05 train seen at 23:58 is tomorrow's,
+    and a 23:55 train still running at 00:03 is yesterday's.
+
+    Each time goes on the first of yesterday, today and tomorrow that is no
+    more than `lookback` seconds before `now`, so it lands between `lookback`
+    ago and a day after that. Times are converted on their own day, so a DST
+    change in between is accounted for; a time skipped by the spring change
+    counts as the hour before it (01:30 is 02:30 BST), and one repeated in the
+    autumn is its first occurrence.
+
+    Make one per refresh, from a single clock read, and resolve every time of
+    that refresh with it.
+    """
+
+    def __init__(self, now: float, lookback: float = 6 * 3600):
+        self.now = now
+        self.lookback = lookback
+        today = datetime.fromtimestamp(now).date().toordinal()
+        self._days = (today - 1, today, today + 1)
+
+    def resolve(self, text) -> int | None:
+        """Epoch seconds of `text` ("HH:MM"); None when it is not a time, e.g. "On time" or None."""
+        minute = _minute_of_day(text)
+        if minute is None:
+            return None
+        earliest = self.now - self.lookback
+        for day in self._days:
+            epoch = _local_epoch(day, minute)
+            if epoch >= earliest:
+                break
+        return epoch
+
+
+def _minute_of_day(text) -> int | None:
+    try:
+        hours, minutes = str(text).split(":")
+        hour, minute = int(hours), int(minutes)
+    except ValueError:
+        return None
+    return hour * 60 + minute if 0 <= hour < 24 and 0 <= minute < 60 else None
+
+
+@lru_cache(maxsize=4096)
+def _local_epoch(day: int, minute: int) -> int:
+    """Epoch seconds of local time `minute` past midnight on ordinal `day`; boards ask for the same few."""
+    moment = datetime.combine(date.fromordinal(day), datetime.min.time()) + timedelta(minutes=minute)
+    return int(moment.timestamp())
+
+
+def epoch_from_iso(text) -> int | None:
+    """Epoch seconds of an ISO 8601 time such as TfL's "2024-03-12T08:15:30Z" (UTC unless it says otherwise)."""
+    try:
+        moment = datetime.fromisoformat(str(text).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from datetime import datetime, time as clock_time
+
+DAY = 24 * 60 * 60
+
+
+class EnergySaver:
+    """
+    Works out from the --InactiveHours range (two datetime.times, which may
+    span midnight) what a board should be doing at a given local time:
+
+        "active"    showing departures as usual
+        "inactive"  off or dimmed; nothing is fetched or animated
+        "warming"   the last `warmup` seconds of the inactive hours, when the
+                    board fetches in the background so it has fresh data the
+                    moment it wakes
+
+    The range starts at `start` and ends at `end` (exclusive); equal times mean
+    always inactive, as before. Both are whole minutes, so the phase can only
+    change as a minute starts.
+    """
+
+    def __init__(self, start: clock_time, end: clock_time, warmup: float = 120.0):
+        self.start = _seconds(start)
+        self.end = _seconds(end)
+        self.warmup = warmup
+
+    def inactive(self, now: datetime) -> bool:
+        t = _seconds(now.time())
+        if self.start < self.end:
+            return self.start <= t < self.end
+        return t >= self.start or t < self.end  # crosses midnight
+
+    def phase(self, now: datetime) -> str:
+        if not self.inactive(now):
+            return "active"
+        return "warming" if self._until(self.end, now) <= self.warmup else "inactive"
+
+    @staticmethod
+    def _until(moment: float, now: datetime) -> float:
+        """Seconds from `now` until the time of day `moment` (in seconds) next comes round."""
+        return (moment - _seconds(now.time())) % DAY
+
+
+def _seconds(t: clock_time) -> float:
+    return t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class FetchScheduler:
+    """
+    Coordinates the network fetches of every board in the process.
+
+    Boards still decide when their own data is stale; may_fetch() additionally
+    keeps fetches `spacing` seconds apart, so panels driven from one process do
+    not all block on the network in the same frame. slot(name) runs one fetch at
+    a time and times it for reporting, and session(key, factory) hands out one
+    client per key (e.g. a SOAP session whose WSDL is expensive to load) to
+    whichever board asks; as fetches never overlap, clients need not be thread
+    safe. Safe to use from several panel threads.
+    """
+
+    def __init__(self, spacing: float = 2.0, clock=time.monotonic):
+        self.spacing = spacing
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._fetching = threading.RLock()
+        self._active = 0
+        self._last = None
+        self._sessions = {}
+        self._stats = defaultdict(lambda: {"fetches": 0, "errors": 0, "seconds": 0.0})
+
+    def may_fetch(self) -> bool:
+        """True when no fetch is running and none has started in the last `spacing` seconds."""
+        with self._lock:
+            return self._active == 0 and (self._last is None or self._clock() - self._last >= self.spacing)
+
+    @contextmanager
+    def slot(self, name: str):
+        """Wraps one fetch, waiting for any other to finish; records its duration (and any error) under `name`."""
+        with self._fetching:
+            with self._lock:
+                self._last = start = self._clock()
+                self._active += 1
+            stats = self._stats[name]
+            try:
+                yield
+            except Exception:
+                stats["errors"] += 1
+                raise
+            finally:
+                with self._lock:
+                    self._active -= 1
+                stats["fetches"] += 1
+                stats["seconds"] += self._clock() - start
+
+    def session(self, key, factory):
+        """Returns the shared client for `key`, creating it with factory() on first use."""
+        with self._lock:
+            if key in self._sessions:
+                return self._sessions[key]
+        # Built outside the lock, as clients can take seconds to set up; if two boards race, the first one wins.
+        client = factory()
+        with self._lock:
+            return self._sessions.setdefault(key, client)
+
+    def forget(self, key) -> None:
+        """Drops a shared client (e.g. after it failed) so the next session() call makes a new one."""
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def stats(self) -> dict:
+        return {name: dict(s) for name, s in self._stats.items()}
+
+
+class BackgroundFetch:
+    """
+    Runs fetch() once on a daemon thread, for data the board can carry on
+    without until it arrives; poll done() from the render loop and then take
+    result(). fetch() should handle its own errors, as the boards' GetData() do.
+    """
+
+    def __init__(self, fetch):
+        self._result = None
+        self._done = threading.Event()
+        threading.Thread(target=self._run, args=(fetch,), name="fetch", daemon=True).start()
+
+    def _run(self, fetch) -> None:
+        try:
+            self._result = fetch()
+        finally:
+            self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self):
+        """What fetch() returned; None before it is done (or if it raised)."""
+        return self._result
+
+
+# The scheduler every board in the process shares.
+shared = FetchScheduler()
@@ -0,0 +1,29 @@
+from __future__ import annotations
+import os
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+
+
+@lru_cache(maxsize=None)
+def truetype(name: str, size: int) -> ImageFont.FreeTypeFont:
+    """
+    The process-wide font registry: each (font file, size) is loaded once, however
+    many boards or panels ask for it. `name` is a file in resources/ or a path.
+    """
+    path = name if os.path.isabs(name) else os.path.join(RESOURCES, name)
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=1024)
+def text_sprite(text: str, font: ImageFont.FreeTypeFont, size: tuple[int, int], mode: str = "RGB"):
+    """
+    Renders one line of white text at the top left of a `size` image and returns
+    (image, advance width). Results are shared by every board in the process, so
+    callers must treat the image as read-only (crop or copy it before drawing).
+    """
+    image = Image.new(mode, size)
+    draw = ImageDraw.Draw(image)
+    draw.text((0, 0), text, font=font, fill="white")
+    return image, draw.textlength(text, font)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+from PIL import Image, ImageChops, ImageMath
+
+# 8-bit grey -> 4-bit panel level, the same depth the SSD1322 actually shows.
+_NIBBLE_LUT = [v >> 4 for v in range(256)]
+# luma's RGB -> 4-bit grey weights (Y' = 0.299R' + 0.587G' + 0.114B', scaled by 2**14)
+_GREY_WEIGHTS = (306, 601, 117)
+
+
+def quantise(image: Image.Image) -> Image.Image:
+    """The 4-bit grey level (0-15) of each pixel, as an "L" image, mapped as luma's ssd1322 and PackedSSD1322 map it."""
+    if image.mode == "1":
+        image = image.convert("L")
+    if image.mode == "L":
+        return image.point(_NIBBLE_LUT)
+    r, g, b = image.split()[:3]
+    # Board frames are almost always grey, where every weighting gives the level of any one band.
+    if ImageChops.difference(r, g).getbbox() is None and ImageChops.difference(g, b).getbbox() is None:
+        return r.point(_NIBBLE_LUT)
+    wr, wg, wb = _GREY_WEIGHTS
+    return ImageMath.lambda_eval(lambda c: (c["r"] * wr + c["g"] * wg + c["b"] * wb) >> 14, r=r, g=g, b=b).convert("L")
+
+
+class DirtyRegionFramebuffer:
+    """
+    luma framebuffer strategy for 4-bit greyscale panels (SSD1322).
+
+    Each frame is quantised to the panel's 4-bit depth and compared with the
+    previous one. Only the horizontal bands that changed are yielded, each
+    trimmed to its changed columns, so an unchanged row sends no SPI traffic.
+    A full frame is sent on the first redraw, after invalidate(), when the
+    frame size changes, or when the dirty area is big enough that a single
+    transfer is cheaper than several windows.
+
+    Use it as a drop-in for luma's diff_to_previous / full_frame:
+        device.framebuffer = DirtyRegionFramebuffer()
+    """
+
+    def __init__(self, band_height: int = 8, full_frame_ratio: float = 0.6, column_align: int = 4):
+        self.band_height = max(1, int(band_height))
+        self.full_frame_ratio = full_frame_ratio
+        self.column_align = max(1, int(column_align))
+        self.prev_image = None
+        self.full_frames = 0
+        self.partial_frames = 0
+        self.skipped_frames = 0
+
+    def invalidate(self) -> None:
+        """Forget the previous frame so the next redraw pushes everything."""
+        self.prev_image = None
+
+    def dirty_windows(self, image: Image.Image) -> list[tuple[int, int, int, int]] | None:
+        """
+        Returns the changed (left, top, right, bottom) windows of `image` compared
+        with the previous frame, [] when nothing changed, or None when a full
+        frame should be sent instead. Does not update the previous frame.
+        """
+        return self._windows(quantise(image))
+
+    def redraw(self, image: Image.Image):
+        """
+        Yields (image segment, bounding box) pairs for the areas that need sending,
+        following the luma framebuffer protocol.
+        """
+        current = quantise(image)
+        windows = self._windows(current)
+        if windows is None:
+            self.full_frames += 1
+            self.prev_image = current
+            yield image, (0, 0) + image.size
+            return
+        if not windows:
+            self.skipped_frames += 1
+            return
+
+        self.partial_frames += 1
+        self.prev_image = current
+        for box in windows:
+            yield image.crop(box), box
+
+    def _windows(self, current: Image.Image) -> list[tuple[int, int, int, int]] | None:
+        if self.prev_image is None or self.prev_image.size != current.size:
+            return None
+
+        diff = ImageChops.difference(self.prev_image, current)
+        if diff.getbbox() is None:
+            return []
+
+        width, height = current.size
+        windows: list[list[int]] = []
+        for top in range(0, height, self.band_height):
+            bottom = min(height, top + self.band_height)
+            box = diff.crop((0, top, width, bottom)).getbbox()
+            if box is None:
+                continue
+            left, right = self._align(box[0], box[2], width)
+            last = windows[-1] if windows else None
+            # Merge with the band directly above; one window costs fewer commands than two.
+            if last is not None and last[3] == top:
+                last[0] = min(last[0], left)
+                last[2] = max(last[2], right)
+                last[3] = bottom
+            else:
+                windows.append([left, top, right, bottom])
+
+        area = sum((r - l) * (b - t) for l, t, r, b in windows)
+        if area >= self.full_frame_ratio * width * height:
+            return None
+        return [tuple(w) for w in windows]
+
+    def _align(self, left: int, right: int, width: int) -> tuple[int, int]:
+        a = self.column_align
+        left = left - (left % a)
+        right = min(width, right + (-right % a))
+        return left, right
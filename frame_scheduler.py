@@ -0,0 +1,148 @@
+from __future__ import annotations
+import math
+import time
+
+
+class FrameScheduler:
+    """
+    Deadline-based pacing for the board main loop.
+
+    Frames sit on a fixed grid of `interval` seconds. wait() sleeps until the next
+    deadline and returns how many grid slots (ticks) are due, so the caller can
+    advance its state machines by that many steps. When nothing is animating the
+    caller can defer() the next wake-up by a number of idle ticks and/or until a
+    wall-clock event (the next clock change), and the loop sleeps straight
+    through instead of waking every interval.
+
+    Rendering decisions stay with the caller; it reports each frame with
+    frame(rendered) and the scheduler keeps achieved fps and idle percentage.
+
+    The idle ticks given to defer() are nominal ticks of `tick` seconds (by
+    default the interval it starts with), the boards' TickClock ticks, so a
+    longer interval set later (the render governor's reduced_fps) does not
+    stretch idle waits along with it.
+    """
+
+    def __init__(self, interval: float = 0.02, max_catchup: int = 5, max_idle: float = 1.0,
+                 report_every: float = 300.0, clock=time.monotonic, sleep=time.sleep, tick: float | None = None):
+        self.interval = interval
+        self.tick = interval if tick is None else tick
+        self.max_catchup = max_catchup
+        self.max_idle = max_idle
+        self.report_every = report_every
+        self._clock = clock
+        self._sleep = sleep
+        self._next = None
+        self._target = None
+        self._window_start = clock()
+        self._slept = 0.0
+        self._rendered = 0
+        self._skipped = 0
+        self._dropped = 0
+
+    def defer(self, ticks: int | None, wake_at: float | None = None) -> None:
+        """
+        Lets the next wake-up slide `ticks` idle ticks past the next deadline
+        (None = no tick bound), but no later than `wake_at` (a clock() time) and
+        never more than max_idle seconds away.
+        """
+        if self._next is None:
+            return
+        target = self._next + self.max_idle
+        if ticks is not None:
+            target = min(target, self._next + max(0, ticks) * self.tick)
+        if wake_at is not None:
+            target = min(target, wake_at)
+        self._target = max(self._next, target)
+
+    def sleep_until(self, wake_at: float) -> None:
+        """
+        Lets the next wake-up be as late as `wake_at` (a clock() time), past
+        max_idle; for when nothing can change before then, e.g. while the energy
+        saver has the display off.
+        """
+        if self._next is not None:
+            self._target = max(self._next, wake_at)
+
+    def wait(self) -> int:
+        """Sleeps until the next deadline, returning the number of ticks now due (>= 1)."""
+        now = self._clock()
+        if self._next is None:
+            self._next = now
+        target = self._target if self._target is not None else self._next
+        self._target = None
+
+        if target > now:
+            self._sleep(target - now)
+            self._slept += target - now
+            now = self._clock()
+
+        due = max(1, int((now - self._next) / self.interval + 1e-6) + 1)
+        planned = max(1, int(round((target - self._next) / self.interval)) + 1)
+        if due > planned + self.max_catchup:
+            # Running late (stall, GC, slow fetch): drop the backlog instead of bursting.
+            self._dropped += due - planned - self.max_catchup
+            due = planned + self.max_catchup
+            self._next = now + self.interval
+        else:
+            self._next += due * self.interval
+        return due
+
+    def next_wall_boundary(self, period: float = 1.0) -> float:
+        """clock() time at which the wall clock next crosses a multiple of `period` seconds."""
+        wall = time.time()
+        return self._clock() + (math.floor(wall / period) + 1) * period - wall
+
+    def frame(self, rendered: bool) -> None:
+        if rendered:
+            self._rendered += 1
+        else:
+            self._skipped += 1
+
+    def stats(self) -> dict:
+        elapsed = max(1e-9, self._clock() - self._window_start)
+        return {
+            "fps": self._rendered / elapsed,
+            "idle_pct": 100.0 * min(1.0, self._slept / elapsed),
+            "rendered": self._rendered,
+            "skipped": self._skipped,
+            "dropped": self._dropped,
+        }
+
+    def report(self) -> str | None:
+        """Returns a one-line summary every report_every seconds (and resets the window), else None."""
+        if self._clock() - self._window_start < self.report_every:
+            return None
+        s = self.stats()
+        self._window_start = self._clock()
+        self._slept = 0.0
+        self._rendered = self._skipped = self._dropped = 0
+        return "Frames: %.1f fps, %.0f%% idle, %d skipped, %d dropped" % (
+            s["fps"], s["idle_pct"], s["skipped"], s["dropped"])
+
+
+class TickClock:
+    """
+    Measures how many nominal ticks (1/rate seconds) have passed since the last
+    call, from a monotonic clock.
+
+    The boards' Speed and Delay settings are in pixels/ticks per tick at 50
+    ticks a second. Scaling them by step() keeps that on-screen pace (Speed*50
+    pixels a second, Delay/50 seconds) however often the board actually gets
+    ticked, so slow or dropped frames no longer slow the animation down.
+    """
+
+    def __init__(self, rate: float = 50.0, max_step: float = 50.0, clock=time.monotonic):
+        self.rate = rate
+        self.max_step = max_step
+        self._clock = clock
+        self._last = None
+
+    def step(self) -> float:
+        """Ticks elapsed since the previous call (1.0 on the first), capped at max_step after a stall."""
+        now = self._clock()
+        step = 1.0 if self._last is None else min(self.max_step, max(0.0, (now - self._last) * self.rate))
+        # Rounded to a thousandth of a tick so clock jitter does not nudge the delay/scroll thresholds.
+        step = round(step, 3)
+        self._last = now
+        return step
@@ -1,8 +1,101 @@
 from __future__ import annotations
 import os
+from PIL import Image
 from luma.core.interface.serial import spi, i2c
 from luma.oled.device import ssd1322, ssd1306, sh1106
 
+from frame_diff import _GREY_WEIGHTS, DirtyRegionFramebuffer
+
+# numpy, imported by _numpy() when PackedSSD1322 is first asked for; it is optional, and importing it costs a couple
+# of seconds on a Pi Zero that a board without --Accelerated should not pay.
+np = None
+
+
+def _numpy():
+    """The numpy module, imported on first use; None when it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+
+# The (width, height) sizes luma's ssd1322 can drive; opening it at any other raises DeviceDisplayModeError.
+SSD1322_SIZES = frozenset((width, height) for width in (256, 128, 64) for height in (64, 48, 32))
+
+
+class PackedSSD1322(ssd1322):
+    """
+    ssd1322 whose greyscale -> 4bpp packing is done with NumPy instead of a
+    per-pixel Python loop.
+
+    Only the windows the framebuffer reports as dirty are packed (inflated to the
+    panel's 4-column granularity, as luma does), into an output buffer that is
+    allocated once and reused every frame. The bytes sent are identical to the
+    stock device's.
+    """
+
+    def __init__(self, serial_interface=None, width=256, height=64, rotate=0, mode="RGB",
+                 framebuffer=None, **kwargs):
+        if _numpy() is None:
+            raise RuntimeError("PackedSSD1322 requires numpy (pip install numpy)")
+        # Allocated before super().__init__, which clears the panel through display().
+        self._out = np.zeros(width * height // 2, dtype=np.uint8)
+        self._weights = np.array(_GREY_WEIGHTS, dtype=np.uint32)
+        super().__init__(serial_interface, width=width, height=height, rotate=rotate, mode=mode,
+                         framebuffer=framebuffer, **kwargs)
+
+    def display(self, image):
+        if self.mode == "1":
+            return super().display(image)
+        assert image.mode == self.mode
+        assert image.size == self.size
+
+        image = self.preprocess(image)
+        for _, bounding_box in self.framebuffer.redraw(image):
+            box = self._inflate_bbox(bounding_box)
+            self._set_position(box[1], box[2], box[3], box[0])
+            self.data(self.pack(image, box))
+
+    def display_array(self, frame):
+        """
+        Shows a (height, width) uint8 greyscale frame, e.g. ArrayComposition.framebuffer,
+        packing the dirty windows straight from the array instead of from a PIL image.
+        A rotated or monochrome panel goes through display() as usual.
+        """
+        image = Image.fromarray(frame, "L")
+        if self.mode == "1" or self.rotate:
+            # Not self.display, which a preview may have wrapped to publish the frame as well.
+            return PackedSSD1322.display(self, image.convert(self.mode))
+        if not isinstance(self.framebuffer, DirtyRegionFramebuffer):
+            # luma's own framebuffers compare frames in the device's mode; ours quantises either.
+            image = image.convert(self.mode)
+        for _, bounding_box in self.framebuffer.redraw(image):
+            left, top, right, bottom = self._inflate_bbox(bounding_box)
+            self._set_position(top, right, bottom, left)
+            self.data(self._nibbles(frame[top:bottom, left:right] >> 4))
+
+    def pack(self, image, box):
+        """Packs the `box` window of `image` into 4bpp nibbles (even pixel high); returns a memoryview of the reused buffer."""
+        pixels = np.asarray(image.crop(box))
+        if pixels.ndim == 3:
+            grey = (pixels[..., :3].astype(np.uint32) @ self._weights) >> 14
+        else:
+            grey = pixels >> 4
+        return self._nibbles(grey)
+
+    def _nibbles(self, grey):
+        height, width = grey.shape
+        size = width * height >> 1
+        out = self._out[:size].reshape(height, width >> 1)
+        np.left_shift(grey[:, 0::2], 4, out=out, casting="unsafe")
+        np.bitwise_or(out, grey[:, 1::2], out=out, casting="unsafe")
+        return memoryview(self._out)[:size]
+
+
 def create_device(
     *,
     driver: str | None = None,
@@ -20,13 +113,30 @@ def create_device(
     width: int = 256,
     height: int = 64,
     rotate: int = 0,        # 0 / 1 / 2 / 3 (quarters)
+    # SSD1322 frame diffing; None -> DirtyRegionFramebuffer
+    framebuffer=None,
+    # SSD1322 NumPy packing (PackedSSD1322); None -> OLED_ACCELERATED=1
+    accelerated: bool | None = None,
 ):
     """
     Returns a luma.oled device instance.
     Defaults for SSD1322 256x64 over SPI (port 0, device 0, DC=24, RST=25).
     Set OLED_DRIVER=ssd1322|ssd1306|sh1106 to override, or pass driver="ssd1322".
+    SSD1322 panels only receive the rows/columns that changed between frames
+    (see frame_diff.DirtyRegionFramebuffer); pass framebuffer= to override.
+    accelerated=True (or OLED_ACCELERATED=1) packs SSD1322 frames with NumPy
+    via PackedSSD1322, falling back to the stock device if numpy is missing.
     """
     drv = (driver or os.getenv("OLED_DRIVER") or "ssd1322").lower()
+    framebuffer = framebuffer or DirtyRegionFramebuffer()
+    if accelerated is None:
+        accelerated = os.getenv("OLED_ACCELERATED", "0") == "1"
+    greyscale = ssd1322
+    if accelerated and drv == "ssd1322":
+        if _numpy() is not None:
+            greyscale = PackedSSD1322
+        else:
+            print("numpy is not installed, falling back to the stock SSD1322 packing.")
 
     # Try SPI
     try:
@@ -39,7 +149,7 @@ def create_device(
             bus_speed_hz=spi_bus_speed_hz,
         )
         if drv == "ssd1322":
-            return ssd1322(serial, width=width, height=height, rotate=rotate)
+            return greyscale(serial, width=width, height=height, rotate=rotate, framebuffer=framebuffer)
         elif drv == "sh1106":
             return sh1106(serial, rotate=rotate)
         else:
@@ -50,8 +160,19 @@ def create_device(
         if drv == "ssd1322":
             # Most SSD1322 panels are SPI; I2C fallback likely not applicable.
             # If yours is I2C-capable, and wired accordingly, this will work.
-            return ssd1322(serial, width=width, height=height, rotate=rotate)
+            return greyscale(serial, width=width, height=height, rotate=rotate, framebuffer=framebuffer)
         elif drv == "sh1106":
             return sh1106(serial, rotate=rotate)
         else:
-            return ssd1306(serial, rotate=rotate)
\ No newline at end of file
+            return ssd1306(serial, rotate=rotate)
+
+
+def create_devices(panels: list[dict]) -> list:
+    """
+    Opens several panels from one process, each given as create_device() keyword
+    arguments; e.g. two SSD1322s on SPI0's chip-selects:
+    [{"spi_device": 0}, {"spi_device": 1, "gpio_reset": None}].
+    Panels sharing a reset line should only pass it for the first panel,
+    otherwise opening a later panel resets the ones already set up.
+    """
+    return [create_device(**panel) for panel in panels]
@@ -3,23 +3,28 @@ import os
 from PIL import ImageFont
 from luma.core.render import canvas
 
-from board_sources import load_with_remote_overrides, get_national_rail_board, get_tube_board, interleave
+from board_sources import load_layered, load_with_env_and_remote, get_national_rail_board, get_tube_board, interleave
+from config_poller import ConfigPoller
+from config_schema import compile_config
 from oled_device import create_device
 
 # Create SSD1322 @ SPI0.0 (CE0). If you need rotation, pass rotate=2 (for 180°), etc.
 device = create_device(driver="ssd1322", width=256, height=64, rotate=0)
 
-def _load_font(cfg: dict, bold=False):
-    ui = cfg.get("ui", {})
-    path = ui.get("font_bold_path" if bold else "font_path")
-    size = int(ui.get("font_size", 22))
+CONFIG = "config.yml"
+
+def _load_font(config, bold=False):
+    path = config.ui.font_bold_path if bold else config.ui.font_path
     if path and os.path.exists(path):
         try:
-            return ImageFont.truetype(path, size=size)
+            return ImageFont.truetype(path, size=config.ui.font_size)
         except Exception:
             pass
     return ImageFont.load_default()
 
+def _load_fonts(config):
+    return _load_font(config, bold=False), _load_font(config, bold=True)
+
 def _trim_to_width(draw, text, font, max_w):
     w = draw.textlength(text, font=font)
     if w <= max_w:
@@ -35,12 +40,10 @@ def _trim_to_width(draw, text, font, max_w):
             hi = mid
     return text[:hi-1] + ell
 
-def draw_board(device, rows, cfg):
-    font = _load_font(cfg, bold=False)
-    font_bold = _load_font(cfg, bold=True)
-    ui = cfg.get("ui", {})
-    lh = int(ui.get("line_height", 24))
-    x = int(ui.get("left_margin", 4))
+def draw_board(device, rows, config, fonts=None):
+    font, font_bold = fonts or _load_fonts(config)
+    lh = config.ui.line_height
+    x = config.ui.left_margin
     y = 0
 
     # SSD1322 is 4-bit grayscale; luma maps 0..255 → intensity. Use 255 for white.
@@ -60,15 +63,46 @@ def draw_board(device, rows, cfg):
             if y > device.height - lh:
                 break
 
-def main():
-    cfg, _ = load_with_remote_overrides("config.yml")
-    rail = get_national_rail_board(cfg, limit=cfg["defaults"]["national_rail"]["limit"])
-    tube = get_tube_board(cfg, limit=cfg["defaults"]["tube"]["limit"])
-    rows = interleave(rail, tube) if cfg.get("ui", {}).get("interleave", False) else (rail + tube)
+def _fetch_boards(config):
+    rail = get_national_rail_board(config.source, limit=config.defaults.national_rail.limit)
+    tube = get_tube_board(config.source, limit=config.defaults.tube.limit)
+    return rail, tube
+
+def _rows(config, rail, tube):
+    rows = interleave(rail, tube) if config.ui.interleave else (rail + tube)
     # Re-index neatly
     for i, r in enumerate(rows, start=1):
         r["Index"] = i
-    draw_board(device, rows, cfg)
+    return rows
+
+def main():
+    cfg, remote = load_with_env_and_remote(CONFIG)
+    config = compile_config(cfg)
+    fonts = _load_fonts(config)
+    rail, tube = _fetch_boards(config)
+    draw_board(device, _rows(config, rail, tube), config, fonts)
+    if remote is None:
+        return
+
+    # With remote config on, keep running and apply changes in place: reload only what a change touches, then redraw.
+    shown = {"fonts": fonts, "boards": (rail, tube)}
+
+    def reload_fonts(cfg, diff):
+        shown["fonts"] = _load_fonts(compile_config(cfg))
+
+    def refetch(cfg, diff):
+        shown["boards"] = _fetch_boards(compile_config(cfg))
+
+    def redraw(cfg, diff):
+        config = compile_config(cfg)
+        draw_board(device, _rows(config, *shown["boards"]), config, shown["fonts"])
+
+    # Remote changes are compiled (and so checked) before they are published; a bad one leaves the board as it is.
+    poller = ConfigPoller(load_layered(CONFIG), remote, validate=compile_config)
+    poller.subscribe(reload_fonts, ("ui", "font_path"), ("ui", "font_bold_path"), ("ui", "font_size"))
+    poller.subscribe(refetch, ("defaults",), ("rtt",), ("tfl",))
+    poller.subscribe(redraw, ("ui",), ("defaults",), ("rtt",), ("tfl",))
+    poller.run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+
+def english(n: int) -> str:
+    """1st, 2nd, 3rd, 4th ... 11th, 12th, 13th ... 21st, 22nd ..."""
+    if n % 100 in (11, 12, 13):
+        return "%dth" % n
+    return "%d%s" % (n, {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th"))
+
+
+class Ordinals:
+    """
+    Ordinal indexes ("1st", "2nd"...) for the boards, from a table built once
+    per locale. The rail board only numbers as many services as it shows, so
+    anything past the table is formatted on demand.
+
+    register() adds a locale: a function from a number to its ordinal text,
+    e.g. ordinal.register("fr", lambda n: "1er" if n == 1 else "%de" % n).
+    """
+
+    def __init__(self, size: int = 100):
+        self.size = size
+        self._formats = {}
+        self._tables = {}
+        self.register("en", english)
+
+    def register(self, locale: str, format) -> None:
+        self._formats[locale] = format
+        self._tables[locale] = tuple(format(n) for n in range(self.size))
+
+    def __call__(self, n: int, locale: str = "en") -> str:
+        table = self._tables[locale]
+        return table[n] if 0 <= n < len(table) else self._formats[locale](n)
+
+
+# The table every board shares; ordinal(3) == "3rd".
+ordinal = Ordinals()
@@ -0,0 +1,152 @@
+"""
+Drives several panels from one process, e.g. a rail and a tube board on two
+SSD1322s sharing a Pi's SPI bus.
+
+Each panel in the `panels:` section of config.yml names a board script, the
+arguments it would take on the command line and, optionally, create_device()
+arguments for its panel (chip-select, reset line, ...); without `device` the
+board opens its own --Display as usual. Start up parameters set in john_options
+(e.g. TIME_FORMAT in .env) are passed to every panel ahead of its own
+arguments, so the panel's own win. Every panel runs its board on its own
+thread, with a private copy of the board module so two panels can even show
+the same board type. Fonts, rendered text and network fetches are shared
+through fonts.py and fetch_scheduler.py, and CPU time and image memory are
+reported per panel.
+
+Usage: python panels.py [config.yml] [--report-every SECONDS]
+"""
+from __future__ import annotations
+import argparse
+import importlib.util
+import os
+import resource
+import threading
+import time
+import traceback
+
+from board_sources import load_layered
+from config_schema import compile_config
+from fetch_scheduler import shared as fetches
+from fonts import text_sprite, truetype
+from oled_device import create_devices
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BOARDS = {"rail": "NationalRailPy3", "bus": "NationalBusesPy3", "tube": "LondonUndergroundPy3"}
+
+
+def load_board(board: str, name: str):
+    """Loads a private copy of a board script, so every panel keeps its own globals (Args, board, device...)."""
+    path = os.path.join(HERE, BOARDS.get(board, board) + ".py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Panel:
+    """One board running on its own thread, with its CPU clock for per-panel reporting."""
+
+    def __init__(self, name: str, module, argv: list[str], device=None):
+        self.name = name
+        self.module = module
+        self.argv = argv
+        self.device = device
+        self.error = None
+        self._cpu_clock = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run(self) -> None:
+        try:
+            self._cpu_clock = time.pthread_getcpuclockid(threading.get_ident())
+        except (AttributeError, OSError):  # not available on every platform
+            pass
+        try:
+            self.module.run(self.argv, panel=self.device)
+        except Exception:
+            self.error = traceback.format_exc()
+            print("Panel %s stopped:\n%s" % (self.name, self.error))
+
+    def cpu_seconds(self) -> float | None:
+        if self._cpu_clock is None or not self.alive:
+            return None
+        try:
+            return time.clock_gettime(self._cpu_clock)
+        except OSError:  # the thread has just exited
+            return None
+
+    def image_bytes(self) -> int:
+        """Bytes held in the panel's composed images and framebuffer (shared text sprites are counted once per panel)."""
+        composition = getattr(self.module, "image_composition", None)
+        if composition is None:
+            return 0
+        images = [composition._background_image] + [img._image for img in composition.composed_images]
+        total = sum(image.width * image.height * len(image.getbands()) for image in images)
+        framebuffer = getattr(composition, "framebuffer", None)
+        return total + (framebuffer.nbytes if framebuffer is not None else 0)
+
+
+def load_panels(config_path: str) -> list[Panel]:
+    config = compile_config(load_layered(config_path))
+    if not config.panels:
+        raise SystemExit("No panels configured; add a 'panels:' list to %s" % config_path)
+    devices = create_devices([spec.device for spec in config.panels if spec.device is not None])
+    panels = []
+    for index, spec in enumerate(config.panels):
+        name = spec.name or "%s%d" % (spec.board, index)
+        module = load_board(spec.board, "panel_%d_%s" % (index, BOARDS.get(spec.board, spec.board)))
+        device = devices.pop(0) if spec.device is not None else None
+        # john_options (e.g. TIME_FORMAT in .env) apply to every panel; a panel's own args come after, so they win.
+        argv = config.john_options.argv(spec.board) + list(spec.args)
+        panels.append(Panel(name, module, argv, device))
+    return panels
+
+
+def report(panels: list[Panel], elapsed: float, last_cpu: dict) -> None:
+    for panel in panels:
+        cpu = panel.cpu_seconds()
+        if cpu is None:
+            usage = "stopped" if not panel.alive else "cpu n/a"
+        else:
+            usage = "cpu %.1f%%" % (100.0 * (cpu - last_cpu.get(panel.name, 0.0)) / elapsed)
+            last_cpu[panel.name] = cpu
+        scheduler = getattr(panel.module, "scheduler", None)
+        fps = scheduler.stats()["fps"] if scheduler is not None else 0.0
+        print("Panel %s: %s, %.2f MB images, %.1f fps" % (panel.name, usage, panel.image_bytes() / 1e6, fps))
+
+    sprites, fonts = text_sprite.cache_info(), truetype.cache_info()
+    fetched = ", ".join("%s %d (%d errors, %.1fs)" % (name, s["fetches"], s["errors"], s["seconds"])
+                        for name, s in sorted(fetches.stats().items()))
+    print("Shared: %d fonts, text sprites %d cached / %d hits / %d misses, max RSS %.1f MB; fetches: %s" % (
+        fonts.currsize, sprites.currsize, sprites.hits, sprites.misses,
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, fetched or "none"))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Run several departure boards, one per panel, in one process.")
+    parser.add_argument("config", nargs="?", default=os.path.join(HERE, "config.yml"))
+    parser.add_argument("--report-every", type=float, default=300.0,
+                        help="Seconds between per-panel CPU/memory reports; default 300")
+    args = parser.parse_args(argv)
+
+    panels = load_panels(args.config)
+    for panel in panels:
+        panel.start()
+
+    last_cpu = {}
+    try:
+        while any(panel.alive for panel in panels):
+            time.sleep(args.report_every)
+            report(panels, args.report_every, last_cpu)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+from __future__ import annotations
+import base64
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image, ImageChops
+
+PAGE = b"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Departure board preview</title>
+<style>body{background:#111;margin:2em}canvas{width:100%;image-rendering:pixelated;background:#000}</style></head>
+<body><canvas id="panel"></canvas><script>
+const panel = document.getElementById("panel"), ctx = panel.getContext("2d");
+let chain = Promise.resolve();
+new EventSource("events").onmessage = e => {
+  const d = JSON.parse(e.data);
+  // Deltas must land in order, so decoding is chained rather than left to Image.onload.
+  chain = chain.then(() => fetch("data:image/png;base64," + d.png)).then(r => r.blob())
+    .then(createImageBitmap).then(bitmap => {
+      if (d.key) { panel.width = d.size[0]; panel.height = d.size[1]; }
+      ctx.drawImage(bitmap, d.box[0], d.box[1]);
+    });
+};
+</script></body></html>
+"""
+
+
+class PreviewServer:
+    """
+    Serves what is on the panel over HTTP, for watching boards remotely.
+
+        /             a page showing the live board
+        /frame.png    the current frame (with an ETag, so pollers get 304s)
+        /stream.mjpg  an MJPEG stream, for browsers, VLC or ffmpeg
+        /events       server-sent events carrying only the region that
+                      changed since the client's last frame, as a PNG crop
+
+    attach(device) hooks the device's display(), so every frame pushed to the
+    panel (and only those) is published; publishing just keeps a reference and
+    never encodes on the render thread. Encoding happens on the clients'
+    threads, once per frame and format however many clients watch, and not at
+    all when nobody does. Each encode's CPU time is followed by enough idle
+    time to keep encoding under `max_cpu_share` of one core, and streams send
+    at most `max_fps` frames a second, skipping frames they cannot keep up with.
+    """
+
+    def __init__(self, port: int = 8080, host: str = "0.0.0.0", max_fps: float = 10.0,
+                 max_cpu_share: float = 0.05, quality: int = 85, history: int = 8):
+        self.address = (host, port)
+        self.max_fps = max_fps
+        self.max_cpu_share = max_cpu_share
+        self.quality = quality
+        self.history = history
+        self._changed = threading.Condition()
+        self._frames = OrderedDict()    # seq -> image, the last `history` frames published
+        self._seq = 0
+        self._encode = threading.Lock()
+        self._encoded = OrderedDict()   # (format, seq[, base]) -> bytes
+        self._ready_at = 0.0
+        self._server = None
+        self.encodes = 0
+        self.encode_seconds = 0.0
+
+    def attach(self, device) -> None:
+        """Publishes every frame `device` displays, after the panel has been updated."""
+        display = device.display
+
+        def display_and_publish(image):
+            display(image)
+            self.publish(image)
+        device.display = display_and_publish
+
+        display_array = getattr(device, "display_array", None)
+        if display_array is not None:
+            def display_array_and_publish(frame):
+                display_array(frame)
+                self.publish(Image.fromarray(frame, "L").convert(device.mode))
+            device.display_array = display_array_and_publish
+
+    def publish(self, image) -> None:
+        """
+        Makes `image` the current frame. It is kept by reference, so it must not
+        be drawn on afterwards; luma's canvas() makes a new image every frame.
+        """
+        with self._changed:
+            self._seq += 1
+            self._frames[self._seq] = image
+            if len(self._frames) > self.history:
+                self._frames.popitem(last=False)
+            self._changed.notify_all()
+
+    def start(self) -> None:
+        """Starts serving on a daemon thread."""
+        preview = self
+
+        class Handler(PreviewHandler):
+            server_preview = preview
+        self._server = ThreadingHTTPServer(self.address, Handler)
+        self.address = self._server.server_address
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="preview", daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def latest(self):
+        """(seq, image) of the current frame; (0, None) before the first."""
+        with self._changed:
+            return self._seq, self._frames.get(self._seq)
+
+    def wait_frame(self, after: int, timeout: float = 15.0):
+        """Waits up to `timeout` seconds for a frame newer than `after`; returns latest()."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._seq != after, timeout)
+            return self._seq, self._frames.get(self._seq)
+
+    def png(self, seq: int, image) -> bytes:
+        return self._cached(("png", seq), lambda: _save(image, "PNG", optimize=False))
+
+    def jpeg(self, seq: int, image) -> bytes:
+        return self._cached(("jpeg", seq), lambda: _save(image.convert("RGB"), "JPEG", quality=self.quality))
+
+    def delta(self, base: int | None, seq: int, image) -> bytes | None:
+        """
+        An SSE data line updating a client that has frame `base` to frame `seq`:
+        the changed box as a PNG crop, or the whole frame (key) when `base` is no
+        longer held. None when nothing visible changed.
+        """
+        with self._changed:
+            previous = self._frames.get(base) if base is not None else None
+
+        def encode():
+            if previous is None or previous.size != image.size or previous.mode != image.mode:
+                box, key = (0, 0) + image.size, True
+            else:
+                box, key = ImageChops.difference(previous, image).getbbox(), False
+                if box is None:
+                    return b""
+            payload = {"seq": seq, "key": key, "size": image.size, "box": box,
+                       "png": base64.b64encode(_save(image.crop(box), "PNG")).decode("ascii")}
+            return ("data: %s\n\n" % json.dumps(payload, separators=(",", ":"))).encode("ascii")
+        return self._cached(("delta", seq, base if previous is not None else None), encode) or None
+
+    def _cached(self, key, encode) -> bytes:
+        """Encodes once per key, holding back new encodes to stay within the CPU share."""
+        with self._encode:
+            if key in self._encoded:
+                return self._encoded[key]
+            pause = self._ready_at - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            started = time.thread_time()
+            data = encode()
+            cost = time.thread_time() - started
+            self._ready_at = time.monotonic() + cost * (1.0 / self.max_cpu_share - 1.0)
+            self.encodes += 1
+            self.encode_seconds += cost
+            self._encoded[key] = data
+            if len(self._encoded) > 4 * self.history:
+                self._encoded.popitem(last=False)
+            return data
+
+    def stats(self) -> dict:
+        return {"frames": self._seq, "encodes": self.encodes, "encode_seconds": self.encode_seconds}
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    server_preview: PreviewServer = None
+    BOUNDARY = "frame"
+
+    def log_message(self, format, *args):
+        pass  # the boards' console output is for the boards
+
+    def do_GET(self):
+        route = {"/": self.index, "/frame.png": self.frame_png,
+                 "/stream.mjpg": self.stream_mjpeg, "/events": self.events}.get(self.path.split("?")[0])
+        if route is None:
+            self.send_error(404)
+            return
+        try:
+            route()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client went away
+
+    def index(self):
+        self.send_body(PAGE, "text/html; charset=utf-8")
+
+    def frame_png(self):
+        preview = self.server_preview
+        seq, image = preview.latest()
+        if image is None:
+            self.send_error(503, "No frame displayed yet")
+            return
+        etag = '"%d"' % seq
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_body(preview.png(seq, image), "image/png", {"ETag": etag, "Cache-Control": "no-cache"})
+
+    def stream_mjpeg(self):
+        preview = self.server_preview
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=%s" % self.BOUNDARY)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for seq, image in self.frames():
+            data = preview.jpeg(seq, image)
+            self.wfile.write(b"--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % (
+                self.BOUNDARY.encode("ascii"), len(data)))
+            self.wfile.write(data + b"\r\n")
+            self.wfile.flush()
+
+    def events(self):
+        preview = self.server_preview
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        base = None
+        for seq, image in self.frames(keepalive=b": keepalive\n\n"):
+            data = preview.delta(base, seq, image)
+            if data:
+                self.wfile.write(data)
+                self.wfile.flush()
+            base = seq
+
+    def frames(self, keepalive: bytes | None = None):
+        """Yields (seq, image) for each new frame, at most max_fps a second, skipping any that were missed."""
+        preview = self.server_preview
+        last, next_at = 0, 0.0
+        while True:
+            pause = next_at - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            seq, image = preview.wait_frame(last)
+            if seq == last or image is None:
+                if keepalive:
+                    self.wfile.write(keepalive)
+                    self.wfile.flush()
+                continue
+            next_at = time.monotonic() + 1.0 / preview.max_fps
+            yield seq, image
+            last = seq
+
+    def send_body(self, body: bytes, content_type: str, headers: dict | None = None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _save(image, format: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format, **params)
+    return buffer.getvalue()
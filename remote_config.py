@@ -1,4 +1,6 @@
+from __future__ import annotations
 import os
+import time
 import requests
 import yaml
 
@@ -19,6 +21,58 @@ def load_config(local_path="config.yml"):
     with open(local_path, "r") as f:
         return yaml.safe_load(f)
 
+
+class RemoteConfig:
+    """
+    Remote config overrides fetched over HTTP. After the first fetch, requests
+    are conditional (ETag / Last-Modified), so an unchanged config costs a
+    304; fetch() then returns the very same cached dict, so callers can tell
+    "unchanged" by identity. `board_id` is sent as X-Board-Id, for servers that
+    give each board its own overlay (see config_server.py).
+    """
+
+    def __init__(self, url: str, timeout: int = 5, board_id: str | None = None):
+        self.url = url
+        self.timeout = timeout
+        self.board_id = board_id
+        self._etag = None
+        self._last_modified = None
+        self._cache = None
+        self._last_fetch_ts = 0.0
+
+    def fetch(self, force: bool = False) -> dict | None:
+        headers = {"X-Board-Id": self.board_id} if self.board_id else {}
+        if not force:
+            if self._etag:
+                headers["If-None-Match"] = self._etag
+            if self._last_modified:
+                headers["If-Modified-Since"] = self._last_modified
+        try:
+            r = requests.get(self.url, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            return None
+
+        if r.status_code == 304:
+            self._last_fetch_ts = time.time()
+            return self._cache
+        if r.status_code != 200:
+            return None
+
+        try:
+            data = yaml.safe_load(r.text) or {}
+        except Exception:
+            return None
+
+        self._etag = r.headers.get("ETag") or self._etag
+        self._last_modified = r.headers.get("Last-Modified") or self._last_modified
+        self._cache = data
+        self._last_fetch_ts = time.time()
+        return data
+
+    def cached(self) -> dict | None:
+        return self._cache
+
+
 if __name__ == "__main__":
     cfg = load_config()
     print(cfg)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import time
+from array import array
+
+
+class RenderGovernor:
+    """
+    Trades animation quality for frame time when the CPU cannot keep up.
+
+    The caller reports how long each rendered frame took (board tick, compose
+    and device push) with record(). When too many frames in a window overrun the
+    current frame interval the governor steps down one level:
+
+        0 full          normal frame rate and animations
+        1 reduced_fps   frame interval doubled
+        2 partial       only the top row scrolls (as --PartialAnimations)
+        3 frozen        no scrolling at all (as --ReducedAnimations)
+
+    It steps back up one level at a time once frames fit comfortably inside the
+    tighter budget of the level above, and only after `hold` seconds at the
+    current level. A restore that has to be undone straight away doubles the
+    hold, so a board on the edge of its budget does not flap between levels.
+    """
+
+    LEVELS = ("full", "reduced_fps", "partial", "frozen")
+
+    def __init__(self, interval: float = 0.02, window: int = 50, overrun_share: float = 0.25,
+                 headroom: float = 0.6, hold: float = 60.0, max_hold: float = 1800.0,
+                 enabled: bool = True, clock=time.monotonic):
+        self.base_interval = interval
+        self.window = window
+        self.overrun_share = overrun_share
+        self.headroom = headroom
+        self.base_hold = hold
+        self.max_hold = max_hold
+        self.enabled = enabled
+        self._clock = clock
+        self.level = 0
+        self.hold = hold
+        self.steps_down = 0
+        self._samples = array("d")
+        self._changed_at = clock()
+        self._restored_at = None
+
+    @property
+    def name(self) -> str:
+        return self.LEVELS[self.level]
+
+    @property
+    def interval(self) -> float:
+        """Frame interval the main loop should run at."""
+        return self.base_interval * (2 if self.level >= 1 else 1)
+
+    @property
+    def partial_animations(self) -> bool:
+        return self.level >= 2
+
+    @property
+    def freeze_scrolling(self) -> bool:
+        return self.level >= 3
+
+    def record(self, seconds: float) -> str | None:
+        """
+        Adds one rendered frame's cost. Returns a metric line when the level
+        changes (for the caller to log), else None.
+        """
+        if not self.enabled:
+            return None
+        self._samples.append(seconds)
+        if len(self._samples) < self.window:
+            return None
+
+        samples = sorted(self._samples)
+        del self._samples[:]
+        p90 = samples[int(len(samples) * 0.9) - 1]
+        budget = self.interval
+        overruns = sum(1 for s in samples if s > budget)
+        now = self._clock()
+
+        if self.level < len(self.LEVELS) - 1 and overruns >= self.overrun_share * len(samples):
+            if self._restored_at is not None and now - self._restored_at < self.hold:
+                self.hold = min(self.max_hold, self.hold * 2)
+            self._restored_at = None
+            self.level += 1
+            self.steps_down += 1
+            return self._change(now, "down", p90, budget)
+
+        # Restoring must fit the budget of the level above, which is tighter at level 1.
+        target = self.base_interval if self.level == 1 else budget
+        if self.level > 0 and now - self._changed_at >= self.hold and p90 < self.headroom * target:
+            self.level -= 1
+            self._restored_at = now
+            return self._change(now, "up", p90, target)
+        if self._restored_at is not None and now - self._restored_at >= self.hold:
+            # Held steady since the last restore; forget any earlier backoff.
+            self._restored_at = None
+            self.hold = self.base_hold
+        return None
+
+    def _change(self, now: float, direction: str, p90: float, budget: float) -> str:
+        self._changed_at = now
+        return "Render governor: %s level=%d quality=%s frame_p90_ms=%.1f budget_ms=%.1f steps_down=%d hold_s=%.0f" % (
+            direction, self.level, self.name, p90 * 1000, budget * 1000, self.steps_down, self.hold)
@@ -3,6 +3,8 @@ import datetime as _dt
 import typing as _t
 import requests
 
+from departures import Departure
+
 class RTTError(Exception):
     pass
 
@@ -45,10 +47,10 @@ class RTTClient:
 def get_departures_as_livetimes(*, client: RTTClient, crs: str, to_crs: _t.Optional[str] = None,
                                 limit: int = 12, include_calling_at: bool = True, arrivals: bool = False,
                                 date: _t.Optional[_dt.date] = None, time_hhmm: _t.Optional[str] = None,
-                                passenger_only: bool = True) -> list[dict]:
+                                passenger_only: bool = True) -> list[Departure]:
     raw = client.get_location_lineup(crs, to_station=to_crs, date=date, time_hhmm=time_hhmm, arrivals=arrivals)
     services = raw.get("services") or []
-    out: list[dict] = []
+    out: list[Departure] = []
     for s in services:
         if passenger_only and not s.get("isPassenger", False):
             continue
@@ -58,12 +60,10 @@ def get_departures_as_livetimes(*, client: RTTClient, crs: str, to_crs: _t.Optio
         platform = loc.get("platform") or "-"
         disp = (loc.get("displayAs") or "").upper()
         planned_cancel = bool(s.get("plannedCancel", False))
-        if arrivals:
-            gbtt = loc.get("gbttBookedArrival"); rt = loc.get("realtimeArrival")
-        else:
-            gbtt = loc.get("gbttBookedDeparture"); rt = loc.get("realtimeDeparture")
-        sch = _fmt(gbtt) if gbtt else "--:--"
-        expt = _fmt(rt) if rt else sch
+        kind = "Arrival" if arrivals else "Departure"
+        # Parsed once into epoch seconds on the service's run date; times after midnight are flagged NextDay.
+        sch = _epoch(loc.get("gbttBooked" + kind), s.get("runDate"), loc.get("gbttBooked%sNextDay" % kind))
+        expt = _epoch(loc.get("realtime" + kind), s.get("runDate"), loc.get("realtime%sNextDay" % kind))
         calling = ""
         if include_calling_at and s.get("serviceUid") and s.get("runDate"):
             try:
@@ -71,19 +71,19 @@ def get_departures_as_livetimes(*, client: RTTClient, crs: str, to_crs: _t.Optio
                 calling = _calling_for_station(sinfo, crs, arrivals)
             except Exception:
                 calling = ""
-        out.append({
-            "Index": len(out) + 1,
-            "ID": f"{s.get('serviceUid','')}-{s.get('runDate','')}",
-            "Operator": op,
-            "Destination": dest,
-            "SchArrival": sch,
-            "ExptArrival": expt,
-            "CallingAt": calling,
-            "Platforms": str(platform),
-            "IsCancelled": planned_cancel or disp.startswith("CANCELLED"),
-            "DisruptionReason": "",
-            "DisplayText": s.get("runningIdentity") or s.get("trainIdentity") or "",
-        })
+        out.append(Departure(
+            Index=len(out) + 1,
+            ID=f"{s.get('serviceUid','')}-{s.get('runDate','')}",
+            Operator=op,
+            Destination=dest,
+            Scheduled=sch,
+            Expected=expt,
+            CallingAt=calling,
+            Platforms=str(platform),
+            IsCancelled=planned_cancel or disp.startswith("CANCELLED"),
+            DisruptionReason="",
+            DisplayText=s.get("runningIdentity") or s.get("trainIdentity") or "",
+        ))
         if len(out) >= limit:
             break
     return out
@@ -91,8 +91,17 @@ def get_departures_as_livetimes(*, client: RTTClient, crs: str, to_crs: _t.Optio
 def _is_hhmm(s: str) -> bool:
     return isinstance(s, str) and len(s) == 4 and s.isdigit() and int(s[:2]) < 24 and int(s[2:]) < 60
 
-def _fmt(s: _t.Optional[str]) -> str:
-    return f"{s[:2]}:{s[2:]}" if s and len(s) == 4 and s.isdigit() else "--:--"
+def _epoch(hhmm: _t.Optional[str], run_date: _t.Optional[str], next_day: bool = False) -> _t.Optional[int]:
+    """Epoch seconds of an RTT "HHMM" local time on the run date (today if unknown); None if not a time."""
+    if not _is_hhmm(hhmm):
+        return None
+    try:
+        day = _dt.date.fromisoformat(run_date) if run_date else _dt.date.today()
+    except ValueError:
+        day = _dt.date.today()
+    if next_day:
+        day += _dt.timedelta(days=1)
+    return int(_dt.datetime(day.year, day.month, day.day, int(hhmm[:2]), int(hhmm[2:])).timestamp())
 
 def _first_desc(pairs: _t.Optional[list]) -> _t.Optional[str]:
     try:
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+
+# Start up parameters that only change how a board runs, not what it shows; changing them keeps the snapshot.
+RUNTIME_SETTINGS = frozenset(("Display", "filename", "maxframes", "DedupeFrames", "Preview", "Compositor", "FixedQuality",
+                              "NoConsole", "SplashScreen", "SplashTimeout", "StartupProfile", "Snapshot", "SnapshotFile"))
+
+
+def default_path(name: str) -> str:
+    """Where a board's snapshot is kept unless it is given a file: the user's cache directory."""
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "departureboard", "%s.json" % name)
+
+
+class Snapshot:
+    """
+    The last data a board fetched, kept on disk so that after a reboot, or the
+    energy saver turning the display back on, the board can be shown straight
+    away while fresh data is fetched.
+
+    save() writes the services (any Departure records) after each successful
+    fetch, atomically, so a power cut leaves either the old file or the new
+    one; it skips the write when nothing changed, to spare the SD card.
+    load() gives them back with the services that have already left dropped,
+    or nothing if the snapshot is older than `max_age` seconds or was saved
+    with different `settings`, the board's start up parameters (e.g. another
+    station, or options that change what is displayed; RUNTIME_SETTINGS are
+    left out). Settings are only kept as a hash, so API keys among them are
+    not written out.
+    """
+
+    def __init__(self, path: str, settings=None, max_age: float = 3600):
+        self.path = path
+        self.max_age = max_age
+        shown = sorted((name, value) for name, value in (settings or {}).items() if name not in RUNTIME_SETTINGS)
+        self.key = hashlib.sha1(repr(shown).encode("utf-8")).hexdigest()
+        self._saved = None
+
+    def save(self, services, extra: dict | None = None, now: float | None = None) -> None:
+        """Saves `services` along with `extra` (a dict of anything else load() should give back, e.g. the station name)."""
+        body = {"key": self.key, "fields": _fields(services), "extra": extra or {},
+                "services": [[getattr(s, field, None) for field in _fields(services)] for s in services]}
+        if body == self._saved:
+            return
+        data = dict(body, saved=time.time() if now is None else now)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temporary = self.path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.path)
+            self._saved = body
+        except (OSError, TypeError, ValueError) as e:
+            print("Snapshot save ERROR")
+            print(str(e))
+
+    def load(self, cls, now: float | None = None):
+        """
+        (services, extra) from the snapshot, rebuilt as instances of `cls` and
+        left in their saved order; ([], {}) when there is no usable snapshot.
+        """
+        now = time.time() if now is None else now
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return [], {}
+        # A snapshot from the future means the clock is wrong (a Pi has no clock of its own until it syncs), so
+        # which services have left can not be told.
+        if (not isinstance(data, dict) or data.get("key") != self.key or data.get("fields") != list(_slots(cls))
+                or not now - self.max_age <= data.get("saved", 0) <= now):
+            return [], {}
+
+        services = []
+        for values in data["services"]:
+            service = cls.__new__(cls)
+            for field, value in zip(data["fields"], values):
+                setattr(service, field, value)
+            if service.due() is not None and service.due() >= now:
+                services.append(service)
+        return services, data["extra"]
+
+
+def _slots(cls) -> tuple:
+    """Every slot of `cls`, its bases' first."""
+    return tuple(slot for klass in reversed(cls.__mro__) for slot in klass.__dict__.get("__slots__", ()))
+
+
+def _fields(services) -> list:
+    return list(_slots(type(services[0]))) if services else []
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import builtins
+import socket
+import sys
+import time
+
+
+class StartupProfile:
+    """
+    Where the time goes between a board script starting and its first frame,
+    for --StartupProfile.
+
+    start() turns it on and, with imports=True, times every import statement
+    run from then on that loads something new (the time includes whatever it
+    imports in turn); board scripts start it straight after importing this
+    module, so their own imports are covered. mark(phase) records how far into
+    startup a phase finished. Does nothing until started, so marks can be left
+    in place.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.enabled = False
+        self.pending = False    # started and not yet finished
+        self.imports = []       # (what, seconds)
+        self.phases = []        # (phase, seconds since started)
+        self._import = None
+        self._depth = 0
+
+    def start(self, imports: bool = True) -> None:
+        if self.enabled:
+            return
+        self.enabled = self.pending = True
+        if imports:
+            self._import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if self._depth:
+            return self._import(name, globals, locals, fromlist, level)
+        loaded = len(sys.modules)
+        started = self._clock()
+        self._depth += 1
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth -= 1
+            if len(sys.modules) > loaded:
+                what = "." * level + name + (" (%s)" % ", ".join(fromlist) if fromlist else "")
+                self.imports.append((what, self._clock() - started))
+
+    def mark(self, phase: str) -> None:
+        if self.enabled:
+            self.phases.append((phase, self._clock() - self.started))
+
+    def finish(self, phase: str) -> str:
+        """Marks the last phase, stops timing imports and returns the report."""
+        self.mark(phase)
+        self.pending = False
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+        return self.report()
+
+    def report(self) -> str:
+        lines = ["Startup profile (ms since the board script started):"]
+        previous = 0.0
+        for phase, at in self.phases:
+            lines.append("  %8.1f  %+8.1f  %s" % (at * 1000, (at - previous) * 1000, phase))
+            previous = at
+        if self.imports:
+            lines.append("Imports, slowest first (ms, including what they import):")
+            for what, seconds in sorted(self.imports, key=lambda item: -item[1]):
+                lines.append("  %8.1f  %s" % (seconds * 1000, what))
+        return "\n".join(lines)
+
+
+def reachable(host: str, port: int = 443, timeout: float = 2.0) -> bool:
+    """True when a TCP connection to host:port can be opened, i.e. the network is up and the name resolves."""
+    try:
+        socket.create_connection((host, port), timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+def wait_until(ready, ceiling: float, interval: float = 2.0, clock=time.monotonic, sleep=time.sleep) -> bool:
+    """Calls ready() every `interval` seconds until it returns true or `ceiling` seconds have passed; returns whether it did."""
+    deadline = clock() + ceiling
+    while not ready():
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return False
+        sleep(min(interval, remaining))
+    return True
+
+
+# The profile every board in the process shares.
+profile = StartupProfile()
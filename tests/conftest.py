@@ -0,0 +1,27 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import departures
+
+
+@pytest.fixture
+def london():
+    """Runs the test in Europe/London local time, with departures' per-minute caches cleared either side."""
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "Europe/London"
+    time.tzset()
+    departures._local_epoch.cache_clear()
+    departures._format_minute.cache_clear()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+    departures._local_epoch.cache_clear()
+    departures._format_minute.cache_clear()
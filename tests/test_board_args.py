@@ -0,0 +1,34 @@
+import importlib
+
+import pytest
+
+REQUIRED = {
+    "NationalRailPy3": ["-k", "token", "-s", "WNC"],
+    "NationalBusesPy3": ["-a", "id", "-k", "key", "-s", "stop", "-b", "no"],
+    "LondonUndergroundPy3": ["-k", "key", "-s", "940GZZLUWLO"],
+}
+
+
+@pytest.fixture(params=sorted(REQUIRED))
+def parse(request):
+    board = importlib.import_module(request.param)
+    return lambda *argv: board.parse_args(REQUIRED[request.param] + list(argv))
+
+
+@pytest.mark.parametrize("width, height", [(256, 64), (128, 32), (64, 48)])
+def test_ssd1322_sizes(parse, width, height):
+    args = parse("--Width", str(width), "--Height", str(height))
+    assert (args.Width, args.Height) == (width, height)
+
+
+@pytest.mark.parametrize("width, height", [(256, 128), (200, 64)])
+def test_a_size_the_ssd1322_can_not_drive_is_an_argument_error(parse, capsys, width, height):
+    with pytest.raises(SystemExit) as raised:
+        parse("--Width", str(width), "--Height", str(height))
+    assert raised.value.code == 2
+    assert "not %d x %d" % (width, height) in capsys.readouterr().err
+
+
+def test_emulated_displays_take_any_size(parse):
+    args = parse("--Display", "capture", "--Height", "128")
+    assert args.Height == 128
@@ -0,0 +1,110 @@
+import pytest
+
+from board_sources import (MISSING, FrozenConfig, config_diff, deep_merge, diff_touches, freeze, load_layered,
+                           read_env_overlay)
+
+BASE = {"ui": {"font_size": 22, "interleave": False},
+        "defaults": {"national_rail": {"crs": "WNC", "limit": 6}, "tube": {"limit": 6}},
+        "panels": [{"board": "rail", "args": ["-s", "WNC"]}]}
+
+
+def test_freeze_and_thaw_round_trip():
+    frozen = freeze(BASE)
+    assert isinstance(frozen["ui"], FrozenConfig)
+    assert isinstance(frozen["panels"], tuple) and isinstance(frozen["panels"][0], FrozenConfig)
+    assert frozen["ui"] == BASE["ui"]
+    assert frozen.thaw() == BASE
+    assert freeze(frozen) is frozen
+
+
+def test_frozen_configs_are_read_only_and_hashable():
+    frozen = freeze(BASE)
+    with pytest.raises(TypeError):
+        frozen["ui"] = {}
+    assert hash(frozen) == hash(freeze(BASE))
+    assert {frozen: 1}[freeze(BASE)] == 1
+
+
+def test_merge_overrides_nested_values():
+    merged = deep_merge(BASE, {"ui": {"font_size": 24}, "remote": {"enabled": True}})
+    assert merged["ui"] == {"font_size": 24, "interleave": False}
+    assert merged["remote"] == {"enabled": True}
+    assert merged["defaults"] == BASE["defaults"]
+
+
+def test_merge_replaces_lists_and_values_of_another_type():
+    merged = deep_merge(BASE, {"panels": [{"board": "tube"}], "ui": {"interleave": 1}, "defaults": "none"})
+    assert merged["panels"] == ({"board": "tube"},)
+    assert merged["ui"]["interleave"] == 1 and merged["ui"]["interleave"] is not False
+    assert merged["defaults"] == "none"
+
+
+def test_merge_shares_what_it_leaves_alone():
+    base = freeze(BASE)
+    merged = deep_merge(base, {"defaults": {"tube": {"limit": 3}}})
+    assert merged["ui"] is base["ui"]
+    assert merged["defaults"]["national_rail"] is base["defaults"]["national_rail"]
+    assert merged["defaults"]["tube"] is not base["defaults"]["tube"]
+
+
+@pytest.mark.parametrize("overlay", [{}, None, {"ui": {"font_size": 22}}, {"ui": {}}])
+def test_merge_that_changes_nothing_returns_the_base(overlay):
+    base = freeze(BASE)
+    assert deep_merge(base, overlay) is base
+
+
+def test_merge_does_not_change_its_inputs():
+    overlay = {"ui": {"font_size": 24}}
+    deep_merge(BASE, overlay)
+    assert BASE["ui"]["font_size"] == 22 and overlay == {"ui": {"font_size": 24}}
+
+
+def test_diff_lists_changed_paths():
+    old = freeze(BASE)
+    new = deep_merge(old, {"ui": {"font_size": 24}, "remote": {"enabled": True}})
+    assert config_diff(old, new) == {("ui", "font_size"): (22, 24), ("remote",): (MISSING, freeze({"enabled": True}))}
+    assert config_diff(new, old)[("remote",)] == (freeze({"enabled": True}), MISSING)
+
+
+def test_diff_of_the_same_snapshot_is_empty():
+    config = freeze(BASE)
+    assert config_diff(config, config) == {}
+    assert config_diff(config, deep_merge(config, {"ui": {"font_size": 22}})) == {}
+
+
+def test_diff_tells_true_from_one():
+    assert config_diff({"ui": {"interleave": True}}, {"ui": {"interleave": 1}}) == {("ui", "interleave"): (True, 1)}
+
+
+def test_diff_touches():
+    diff = {("ui", "font_size"): (22, 24)}
+    assert diff_touches(diff, ("ui",))
+    assert diff_touches(diff, ("defaults",), ("ui", "font_size"))
+    assert not diff_touches(diff, ("ui", "line_height"))
+    assert not diff_touches({}, ("ui",))
+
+
+def test_env_overlay(monkeypatch):
+    for name in ("NR_CRS", "NR_TO_CRS", "NR_ARRIVALS", "NR_LIMIT", "TUBE_STOPPOINT", "TUBE_LIMIT", "FONT_SIZE",
+                 "INTERLEAVE", "TIME_FORMAT"):
+        monkeypatch.delenv(name, raising=False)
+    assert "defaults" not in read_env_overlay()
+    monkeypatch.setenv("NR_CRS", "PAD")
+    monkeypatch.setenv("NR_TO_CRS", "")
+    monkeypatch.setenv("FONT_SIZE", "not a number")
+    monkeypatch.setenv("INTERLEAVE", "yes")
+    monkeypatch.setenv("TIME_FORMAT", "12")
+    overlay = read_env_overlay()
+    assert overlay["defaults"]["national_rail"] == {"crs": "PAD", "to_crs": None}
+    assert overlay["ui"]["font_size"] == 22 and overlay["ui"]["interleave"] is True
+    assert overlay["john_options"]["time_format"] == "12"
+
+
+def test_load_layered_puts_the_env_over_the_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.yml"
+    path.write_text("defaults:\n  national_rail:\n    crs: WNC\n    limit: 6\n", encoding="utf-8")
+    monkeypatch.setenv("NR_CRS", "PAD")
+    config = load_layered(path)
+    assert isinstance(config, FrozenConfig)
+    assert config["defaults"]["national_rail"]["crs"] == "PAD"
+    assert config["defaults"]["national_rail"]["limit"] == 6
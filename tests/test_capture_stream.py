@@ -0,0 +1,94 @@
+import pytest
+from PIL import Image, ImageDraw, ImageSequence
+
+import capture_stream
+from capture_stream import StreamingCapture, grey4, pack4, read_raw
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def frame(*boxes, fill=(255, 255, 255)):
+    image = Image.new("RGB", (256, 64))
+    draw = ImageDraw.Draw(image)
+    for box in boxes:
+        draw.rectangle(box, fill=fill)
+    return image
+
+
+def shown(image):
+    """What the panel shows for `image`: its 16 greys spread over 0-255."""
+    return Image.frombytes("L", image.size, grey4(image)).point(lambda v: v * 17)
+
+
+def capture(tmp_path, format, frames, **kwargs):
+    """Displays (image, seconds on screen) frames on a StreamingCapture; returns the file written."""
+    clock = FakeClock()
+    path = str(tmp_path / ("capture." + format))
+    device = StreamingCapture(path, format, clock=clock, **kwargs)
+    for image, seconds in frames:
+        device.display(image)
+        clock.now += seconds
+    device.cleanup()
+    return path
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_grey4_and_pack4_with_and_without_numpy(monkeypatch, numpy):
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(capture_stream, "np", None)
+    image = frame((0, 0, 3, 0), fill=(255, 128, 0))
+    grey = grey4(image)
+    assert grey[:5] == bytes([9, 9, 9, 9, 0])
+    assert pack4(grey)[:3] == bytes([0x99, 0x99, 0x00])
+
+
+def test_raw_round_trip(tmp_path):
+    images = [frame(), frame((0, 0, 9, 9)), frame((0, 0, 9, 9), fill=(90, 90, 90))]
+    path = capture(tmp_path, "raw", [(image, 0.02) for image in images])
+    frames = list(read_raw(path))
+    assert [repeats for repeats, _ in frames] == [1, 1, 1]
+    assert [image.tobytes() for _, image in frames] == [shown(image).tobytes() for image in images]
+
+
+def test_dedupe_merges_identical_frames(tmp_path):
+    images = [frame(), frame(), frame(), frame((0, 0, 9, 9)), frame()]
+    path = capture(tmp_path, "raw", [(image, 0.02) for image in images], dedupe=True)
+    assert [repeats for repeats, _ in read_raw(path)] == [3, 1, 1]
+
+
+def test_read_raw_rejects_other_files(tmp_path):
+    path = tmp_path / "capture.raw"
+    path.write_bytes(b"GIF89a")
+    with pytest.raises(ValueError):
+        list(read_raw(str(path)))
+
+
+def test_gif_frames_and_timing(tmp_path):
+    images = [frame(), frame((100, 20, 109, 29)), frame((100, 20, 109, 29), (0, 0, 3, 3), fill=(60, 60, 60))]
+    path = capture(tmp_path, "gif", [(images[0], 0.5), (images[1], 0.255), (images[2], 0.1)])
+    with Image.open(path) as gif:
+        durations = [f.info["duration"] for f in ImageSequence.Iterator(gif)]
+        gif.seek(0)
+        pictures = [f.convert("L").tobytes() for f in ImageSequence.Iterator(gif)]
+    # Delays are whole centiseconds, rounded on the running total: 0.5, 0.755, 0.855 s.
+    assert durations == [500, 260, 100]
+    assert pictures == [shown(image).tobytes() for image in images]
+
+
+def test_max_frames_finishes_the_file_and_exits(tmp_path):
+    path = str(tmp_path / "capture.raw")
+    device = StreamingCapture(path, "raw", max_frames=2, clock=FakeClock())
+    device.display(frame())
+    with pytest.raises(SystemExit):
+        device.display(frame((0, 0, 9, 9)))
+    assert len(list(read_raw(path))) == 2
+    device.display(frame())  # ignored once finished
+    assert len(list(read_raw(path))) == 2
@@ -0,0 +1,83 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+
+def service(id, time="10:04"):
+    return SimpleNamespace(ID=id, DisplayTime=time)
+
+
+class Row:
+    """The state ScrollTime's prepareNextCard()/takeCard() use, with rendering counted rather than drawn."""
+
+    def __init__(self, current, upcoming):
+        self.position = 0
+        self.CurrentService = current
+        self.Controller = SimpleNamespace(peekNextService=lambda row: upcoming)
+        self.nextCard = None
+        self.nextCardChecked = False
+        self.rendered = []
+
+    def renderCard(self, service, previous_service):
+        self.rendered.append(service.ID)
+        return ("card", service.ID, previous_service.ID)
+
+
+@pytest.fixture(params=["NationalRailPy3", "NationalBusesPy3", "LondonUndergroundPy3"])
+def board(request):
+    return importlib.import_module(request.param)
+
+
+@pytest.fixture
+def scroll_time(board):
+    return board.ScrollTime
+
+
+def test_the_next_card_is_rendered_once_while_idle(scroll_time):
+    row = Row(service("1"), service("2"))
+    scroll_time.prepareNextCard(row)
+    scroll_time.prepareNextCard(row)
+    assert row.rendered == ["2"]
+
+
+def test_a_prepared_card_is_taken_without_rendering_again(scroll_time):
+    upcoming = service("2")
+    row = Row(service("1"), upcoming)
+    scroll_time.prepareNextCard(row)
+    assert scroll_time.takeCard(row, upcoming) == ("card", "2", "1")
+    assert row.rendered == ["2"]
+    assert (row.nextCard, row.nextCardChecked) == (None, False)
+
+
+@pytest.mark.parametrize("change", ["another service", "its time", "the shown service's time"])
+def test_a_card_that_no_longer_matches_is_rendered_afresh(scroll_time, change):
+    upcoming = service("2")
+    row = Row(service("1"), upcoming)
+    scroll_time.prepareNextCard(row)
+    if change == "another service":
+        upcoming = service("3")
+    elif change == "its time":
+        upcoming.DisplayTime = "Exp 10:06"
+    else:
+        row.CurrentService.DisplayTime = "Delayed"
+    assert scroll_time.takeCard(row, upcoming) == ("card", upcoming.ID, "1")
+    assert row.rendered == ["2", upcoming.ID]
+
+
+@pytest.mark.parametrize("upcoming", [None, service("0"), service("1")], ids=["fresh data due", "stud", "same"])
+def test_nothing_is_rendered_ahead_when_the_next_card_is_unknown_or_unchanged(scroll_time, upcoming):
+    row = Row(service("1"), upcoming)
+    scroll_time.prepareNextCard(row)
+    assert row.nextCard is None and row.rendered == [] and row.nextCardChecked
+
+
+@pytest.mark.parametrize("fetched, expected", [(True, None), (False, "1")])
+def test_no_card_is_peeked_past_the_end_of_a_cycle_when_fresh_data_is_in(board, monkeypatch, fetched, expected):
+    # The rows will change to the new data instead, so a card rendered from the old would be wasted.
+    monkeypatch.setattr(board, "Args", SimpleNamespace(NumberOfCards=9, FixToArrive=False), raising=False)
+    services = [service("1"), service("2")]
+    controller = SimpleNamespace(x=2, Services=services, pending=SimpleNamespace(done=lambda: fetched),
+                                 serviceFor=lambda row, x: services[x])
+    peeked = board.boardFixed.peekNextService(controller, 1)
+    assert (peeked and peeked.ID) == expected
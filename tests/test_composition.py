@@ -0,0 +1,155 @@
+import random
+
+import pytest
+from luma.core.device import dummy
+from luma.core.image_composition import ComposableImage, ImageComposition
+from luma.core.render import canvas
+from PIL import Image, ImageDraw
+
+from composition import TrackedComposition, create_composition, present
+from frame_diff import DirtyRegionFramebuffer
+
+
+def device():
+    return dummy(width=256, height=64, mode="RGB")
+
+
+def layer(width, height, position, seed=0):
+    image = Image.new("RGB", (width, height))
+    draw = ImageDraw.Draw(image)
+    rng = random.Random(seed)
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        draw.rectangle((x, y, x + 6, y + 3), fill=(rng.randrange(256),) * 3)
+    return ComposableImage(image, position=position)
+
+
+def test_starts_with_the_whole_frame_damaged():
+    composition = TrackedComposition(device())
+    assert composition.dirty
+    assert composition.take_damage() == (0, 0, 256, 64)
+    assert composition.take_damage() is None
+
+
+def test_damage_is_the_union_of_changed_footprints():
+    composition = TrackedComposition(device())
+    composition.take_damage()
+    composition.add_image(layer(40, 16, (10, 16)))
+    composition.mark_dirty(layer(20, 8, (100, 40)))
+    assert composition.take_damage() == (10, 16, 120, 48)
+
+
+def test_damage_is_clipped_to_the_device():
+    composition = TrackedComposition(device())
+    composition.take_damage()
+    composition.add_image(layer(100, 16, (200, 56)))
+    assert composition.take_damage() == (200, 56, 256, 64)
+    composition.mark_dirty(layer(10, 10, (300, 0)))
+    assert composition.take_damage() is None
+
+
+def test_footprint_is_limited_to_the_device_size():
+    composition = TrackedComposition(device())
+    assert composition.footprint(layer(600, 16, (4, 8))) == (4, 8, 260, 24)
+
+
+def test_mark_dirty_without_an_image_damages_everything():
+    composition = TrackedComposition(device())
+    composition.take_damage()
+    composition.mark_dirty()
+    assert composition.take_damage() == (0, 0, 256, 64)
+
+
+@pytest.mark.parametrize("compositor", ["pil", "numpy"])
+def test_partial_refresh_matches_a_full_recomposition(compositor):
+    if compositor == "numpy":
+        pytest.importorskip("numpy")
+    panel = device()
+    composition = create_composition(panel, compositor)
+    reference = ImageComposition(panel)
+    rows = [layer(300, 16, (0, 16 * n), seed=n) for n in range(4)]
+    for row in rows:
+        composition.add_image(row)
+        reference.add_image(row)
+    composition.refresh()
+
+    # Scroll one row and replace another, as the board does between frames.
+    rows[1].offset = (37, 0)
+    composition.mark_dirty(rows[1])
+    replacement = layer(120, 16, (60, 32), seed=9)
+    composition.remove_image(rows[2])
+    reference.remove_image(rows[2])
+    composition.add_image(replacement)
+    reference.add_image(replacement)
+    composition.refresh()
+    reference.refresh()
+
+    assert composition().convert("L").tobytes() == reference().convert("L").tobytes()
+
+
+class Recorder:
+    """Serial interface that keeps what the device sends."""
+
+    def __init__(self):
+        self.sent = []
+
+    def command(self, *cmd):
+        self.sent.append(("command",) + cmd)
+
+    def data(self, data):
+        self.sent.append(("data", bytes(data)))
+
+    def cleanup(self):
+        pass
+
+
+def overlay(draw):
+    # A header in the default ink would be black on the array path's L image, so the boards give fill="white".
+    draw.multiline_text((4, 0), "10:04 Reading", fill="white")
+    draw.bitmap((90, 48), Image.linear_gradient("L").resize((80, 16)), fill="white")
+
+
+def test_present_packs_the_array_as_the_canvas_would():
+    pytest.importorskip("numpy")
+    from oled_device import PackedSSD1322
+
+    panels = [PackedSSD1322(Recorder(), framebuffer=DirtyRegionFramebuffer()) for _ in range(2)]
+    composition = create_composition(panels[0], "numpy")
+    rows = [layer(300, 16, (0, 16 * n), seed=n) for n in range(4)]
+    for row in rows:
+        composition.add_image(row)
+    for panel in panels:
+        panel._serial_interface.sent.clear()
+
+    for scroll in (None, 37):
+        if scroll is not None:
+            rows[1].offset = (scroll, 0)
+            composition.mark_dirty(rows[1])
+        composition.refresh()
+        composed = composition.framebuffer.copy()
+        present(panels[0], composition, overlay)
+        assert (composition.framebuffer == composed).all()
+        with canvas(panels[1], background=composition()) as draw:
+            overlay(draw)
+        sent = [panel._serial_interface.sent for panel in panels]
+        assert sent[0] == sent[1] and sent[0]
+        sent[0].clear()
+        sent[1].clear()
+
+
+def test_present_publishes_array_frames_to_the_preview():
+    pytest.importorskip("numpy")
+    from oled_device import PackedSSD1322
+    from preview_server import PreviewServer
+
+    panel = PackedSSD1322(Recorder())
+    preview = PreviewServer()
+    preview.attach(panel)
+    composition = create_composition(panel, "numpy")
+    composition.add_image(layer(256, 16, (0, 0)))
+    composition.refresh()
+    present(panel, composition, overlay)
+    seq, image = preview.latest()
+    expected = composition().copy()
+    overlay(ImageDraw.Draw(expected))
+    assert seq == 1 and image.mode == "RGB" and image.tobytes() == expected.tobytes()
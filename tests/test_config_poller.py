@@ -0,0 +1,175 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config_poller import ConfigPoller
+from config_schema import compile_config
+from remote_config import RemoteConfig
+
+LOCAL = {"ui": {"font_size": 22, "line_height": 24}, "defaults": {"tube": {"limit": 6}},
+         "remote": {"cache_ttl_seconds": 30}}
+
+
+class FakeRemote:
+    """Stands in for RemoteConfig: fetch() gives the overrides set, the same object while they are unchanged."""
+
+    def __init__(self, overrides=None):
+        self.overrides = overrides
+
+    def set(self, overrides):
+        self.overrides = overrides
+
+    def fetch(self):
+        return self.overrides
+
+    def cached(self):
+        return self.overrides
+
+
+def test_starts_from_the_cached_overrides():
+    poller = ConfigPoller(LOCAL, FakeRemote({"ui": {"font_size": 24}}))
+    assert poller.config["ui"] == {"font_size": 24, "line_height": 24}
+    assert poller.version == 0
+
+
+def test_unchanged_or_failed_fetches_publish_nothing():
+    remote = FakeRemote({"ui": {"font_size": 24}})
+    poller = ConfigPoller(LOCAL, remote)
+    config = poller.config
+    assert poller.poll() == {}
+    remote.set(None)
+    assert poller.poll() == {}
+    remote.set({"ui": {"font_size": 24}})  # a new object, but the same overrides
+    assert poller.poll() == {}
+    assert poller.config is config and poller.version == 0
+
+
+def test_changes_go_to_the_subscribers_they_touch():
+    remote = FakeRemote({})
+    poller = ConfigPoller(LOCAL, remote)
+    calls = []
+    poller.subscribe(lambda config, diff: calls.append(("fonts", sorted(diff))), ("ui", "font_size"))
+    poller.subscribe(lambda config, diff: calls.append(("stations", sorted(diff))), ("defaults",))
+    poller.subscribe(lambda config, diff: calls.append(("all", config["ui"]["font_size"])))
+    remote.set({"defaults": {"tube": {"limit": 3}}})
+    assert poller.poll() == {("defaults", "tube", "limit"): (6, 3)}
+    assert calls == [("stations", [("defaults", "tube", "limit")]), ("all", 22)]
+    assert poller.version == 1
+
+
+def test_a_dropped_override_goes_back_to_its_local_value():
+    remote = FakeRemote({"ui": {"font_size": 24}})
+    poller = ConfigPoller(LOCAL, remote)
+    remote.set({})
+    assert poller.poll() == {("ui", "font_size"): (24, 22)}
+
+
+def test_a_failing_subscriber_does_not_stop_the_others(capsys):
+    remote = FakeRemote({})
+    poller = ConfigPoller(LOCAL, remote)
+    calls = []
+    poller.subscribe(lambda config, diff: 1 / 0)
+    poller.subscribe(lambda config, diff: calls.append(diff))
+    remote.set({"ui": {"line_height": 20}})
+    poller.poll()
+    assert len(calls) == 1
+    assert "Config reload ERROR" in capsys.readouterr().out
+
+
+def test_invalid_configs_are_not_published(capsys):
+    remote = FakeRemote({})
+    poller = ConfigPoller(LOCAL, remote, validate=compile_config)
+    calls = []
+    poller.subscribe(lambda config, diff: calls.append(diff))
+    remote.set({"ui": {"font_size": "huge"}})
+    assert poller.poll() == {}
+    assert poller.config["ui"]["font_size"] == 22 and calls == [] and poller.version == 0
+    assert "ui.font_size" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("ttl, overrides, expected", [
+    (5, None, 5),
+    (None, None, 30.0),
+    (None, {"remote": {"cache_ttl_seconds": 0.2}}, 1.0),
+    (None, {"remote": {"cache_ttl_seconds": "soon"}}, 60.0),
+])
+def test_ttl(ttl, overrides, expected):
+    assert ConfigPoller(LOCAL, FakeRemote(overrides), ttl=ttl).ttl == expected
+
+
+class ConfigHandler(BaseHTTPRequestHandler):
+    body = b"ui:\n  font_size: 24\n"
+    etag = '"1"'
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        type(self).requests.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Last-Modified", "Tue, 12 Mar 2024 08:00:00 GMT")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+
+@pytest.fixture
+def server():
+    handler = type("Handler", (ConfigHandler,), {"requests": []})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield handler, "http://127.0.0.1:%d/config.yml" % httpd.server_port
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_remote_config_sends_conditional_requests(server):
+    handler, url = server
+    remote = RemoteConfig(url, board_id="kiosk")
+    first = remote.fetch()
+    assert first == {"ui": {"font_size": 24}}
+    assert remote.fetch() is first
+    assert handler.requests[0]["X-Board-Id"] == "kiosk" and "If-None-Match" not in handler.requests[0]
+    assert handler.requests[1]["If-None-Match"] == '"1"'
+    assert handler.requests[1]["If-Modified-Since"] == "Tue, 12 Mar 2024 08:00:00 GMT"
+
+
+def test_remote_config_picks_up_a_change(server):
+    handler, url = server
+    remote = RemoteConfig(url)
+    first = remote.fetch()
+    handler.body, handler.etag = b"ui:\n  font_size: 30\n", '"2"'
+    second = remote.fetch()
+    assert second is not first and second == {"ui": {"font_size": 30}}
+
+
+def test_remote_config_forced_fetch_is_unconditional(server):
+    handler, url = server
+    remote = RemoteConfig(url)
+    remote.fetch()
+    remote.fetch(force=True)
+    assert "If-None-Match" not in handler.requests[1]
+
+
+def test_remote_config_unreachable():
+    remote = RemoteConfig("http://127.0.0.1:9/config.yml", timeout=1)
+    assert remote.fetch() is None and remote.cached() is None
+
+
+def test_poller_over_http(server):
+    handler, url = server
+    remote = RemoteConfig(url)
+    remote.fetch()
+    poller = ConfigPoller(LOCAL, remote)
+    assert poller.config["ui"]["font_size"] == 24
+    assert poller.poll() == {}
+    handler.body, handler.etag = b"ui:\n  font_size: 30\n", '"2"'
+    assert poller.poll() == {("ui", "font_size"): (24, 30)}
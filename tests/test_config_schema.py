@@ -0,0 +1,109 @@
+import os
+from datetime import time
+
+import pytest
+import yaml
+
+from board_sources import deep_merge, freeze
+from config_schema import BoardConfig, BoardOptions, ConfigError, PanelConfig, compile_config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_the_shipped_config_compiles():
+    with open(os.path.join(ROOT, "config.yml"), encoding="utf-8") as f:
+        config = compile_config(yaml.safe_load(f) or {})
+    assert isinstance(config, BoardConfig)
+
+
+def test_defaults_fill_in_what_is_left_out():
+    config = compile_config({})
+    assert config.defaults.national_rail.crs == "WNC"
+    assert config.ui.font_size == 22
+    assert config.remote.enabled is False
+    assert config.panels == ()
+    assert config.john_options == BoardOptions()
+
+
+def test_values_are_typed_as_the_env_overlay_gives_them():
+    config = compile_config({"ui": {"font_size": "24", "interleave": "yes"},
+                             "remote": {"timeout_seconds": "2.5", "board_id": ""},
+                             "john_options": {"time_format": "12", "inactive_hours": "23:00-07:00",
+                                              "excluded_platforms": "1,2 3"}})
+    assert (config.ui.font_size, config.ui.interleave) == (24, True)
+    assert (config.remote.timeout_seconds, config.remote.board_id) == (2.5, None)
+    assert config.john_options.time_format == 12
+    assert config.john_options.inactive_hours == (time(23, 0), time(7, 0))
+    assert config.john_options.excluded_platforms == ("1", "2", "3")
+
+
+def test_every_problem_is_reported_at_once():
+    with pytest.raises(ConfigError) as raised:
+        compile_config({"ui": {"font_size": "big", "colour": "amber"}, "tfl": "key",
+                        "john_options": {"rotation": 1, "inactive_hours": "late"}, "extra": 1})
+    problems = raised.value.problems
+    assert len(problems) == 6
+    assert "ui.font_size: must be a whole number, got 'big'" in problems
+    assert "ui.colour: unknown setting" in problems
+    assert "tfl: must be a section of settings, got 'key'" in problems
+    assert "extra: unknown setting" in problems
+    assert any(p.startswith("john_options.rotation: must be one of 0, 2") for p in problems)
+    assert any(p.startswith("john_options.inactive_hours:") for p in problems)
+    assert isinstance(raised.value, ValueError)
+
+
+@pytest.mark.parametrize("section, value", [
+    ({"ui": {"font_size": 0}}, "ui.font_size"),
+    ({"ui": {"font_size": 2.5}}, "ui.font_size"),
+    ({"ui": {"left_margin": -1}}, "ui.left_margin"),
+    ({"ui": {"interleave": "maybe"}}, "ui.interleave"),
+    ({"remote": {"timeout_seconds": 0}}, "remote.timeout_seconds"),
+    ({"rtt": {"username": ["a"]}}, "rtt.username"),
+    ({"panels": {"board": "rail"}}, "panels"),
+    ({"panels": [{"args": []}]}, "panels"),
+])
+def test_bad_values(section, value):
+    with pytest.raises(ConfigError) as raised:
+        compile_config(section)
+    assert [p.split(":")[0] for p in raised.value.problems] == [value]
+
+
+def test_panels():
+    config = compile_config({"panels": [{"board": "tube", "args": ["--limit", 3], "device": {"port": 1}},
+                                        {"board": "rail", "name": "left"}]})
+    assert config.panels == (PanelConfig("tube", ("--limit", "3"), {"port": 1}), PanelConfig("rail", name="left"))
+    assert type(config.panels[0].device) is dict
+
+
+def test_compiled_once_per_snapshot():
+    base = freeze({"ui": {"font_size": 24}})
+    assert compile_config(base) is compile_config(deep_merge(base, {})) is compile_config({"ui": {"font_size": 24}})
+    assert compile_config(base).source is base
+
+
+def test_configs_are_immutable():
+    config = compile_config({})
+    with pytest.raises(AttributeError):
+        config.ui.font_size = 30
+
+
+@pytest.mark.parametrize("board, expected", [
+    ("rail", ["--TimeFormat", "12", "--InactiveHours", "23:00-07:00", "--ExcludedPlatforms", "1", "2",
+              "--ShowIndex", "--FixNextToArrive", "--no-splashscreen"]),
+    ("bus", ["--TimeFormat", "12", "--InactiveHours", "23:00-07:00", "--ShowIndex", "--no-splashscreen"]),
+    ("tube", ["--TimeFormat", "12", "--InactiveHours", "23:00-07:00", "--FixNextToArrive", "--no-splashscreen",
+              "--ExcludeLines", "district"]),
+])
+def test_board_options_as_arguments(board, expected):
+    options = compile_config({"john_options": {
+        "time_format": 12, "inactive_hours": "23:00-07:00", "excluded_platforms": "1,2", "show_index": True,
+        "fix_next_to_arrive": True, "no_splashscreen": "yes", "exclude_lines": ["district"],
+        "no_pip_update": True}}).john_options
+    assert options.argv(board) == expected
+
+
+def test_switches_that_are_off_by_default():
+    options = compile_config({"john_options": {"show_index": False, "fix_next_to_arrive": False}}).john_options
+    assert options.argv("rail") == []
+    assert options.argv("tube") == ["--HideIndex"]
+    assert options.argv("bus") == ["--UnfixNextToArrive"]
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+import requests
+
+from config_server import ConfigServer
+from remote_config import RemoteConfig
+
+
+def write(directory, name, text, mtime=None):
+    path = os.path.join(directory, name + ".yml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def fleet(tmp_path):
+    directory = str(tmp_path)
+    write(directory, "all", "ui:\n  font_size: 22\n  line_height: 24\n")
+    server = ConfigServer(directory, port=0, host="127.0.0.1")
+    server.start()
+    yield server, directory, "http://%s:%d/config.yml" % server.address
+    server.stop()
+
+
+def get(url, board=None, encoding="identity", **headers):
+    if board:
+        headers["X-Board-Id"] = board
+    return requests.get(url, headers=dict(headers, **{"Accept-Encoding": encoding}), timeout=5)
+
+
+def test_overlays_go_over_all_yml(fleet):
+    server, directory, url = fleet
+    write(directory, "kiosk", "ui:\n  font_size: 30\n")
+    assert RemoteConfig(url, board_id="kiosk").fetch() == {"ui": {"font_size": 30, "line_height": 24}}
+    assert RemoteConfig(url, board_id="other").fetch() == {"ui": {"font_size": 22, "line_height": 24}}
+    assert get(url + "?board=kiosk").text == "ui:\n  font_size: 30\n  line_height: 24\n"
+
+
+def test_unchanged_documents_are_304s(fleet):
+    server, directory, url = fleet
+    first = get(url)
+    assert get(url, **{"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert get(url, **{"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+    assert server.stats()["renders"] == 1
+
+
+def test_gzip_has_its_own_etag(fleet):
+    server, directory, url = fleet
+    plain, zipped = get(url), get(url, encoding="gzip")
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert zipped.headers["ETag"] != plain.headers["ETag"]
+    assert zipped.text == plain.text
+    assert get(url, encoding="gzip", **{"If-None-Match": plain.headers["ETag"]}).status_code == 200
+
+
+def test_editing_a_file_renders_again(fleet):
+    server, directory, url = fleet
+    first = get(url)
+    write(directory, "all", "ui:\n  font_size: 24\n")
+    second = get(url, **{"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200 and "24" in second.text
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.headers["Last-Modified"] != first.headers["Last-Modified"]
+
+
+def test_touching_a_file_keeps_its_validators(fleet):
+    server, directory, url = fleet
+    first = get(url)
+    write(directory, "all", "ui:\n  font_size: 22\n  line_height: 24\n", mtime=1)
+    again = get(url, **{"If-Modified-Since": first.headers["Last-Modified"]})
+    assert again.status_code == 304 and again.headers["ETag"] == first.headers["ETag"]
+
+
+@pytest.mark.parametrize("change", ["delete", "older"])
+def test_if_modified_since_sees_an_overlay_go_back(fleet, change):
+    server, directory, url = fleet
+    write(directory, "kiosk", "ui:\n  font_size: 30\n")
+    overlaid = get(url, board="kiosk")
+    if change == "delete":
+        os.remove(os.path.join(directory, "kiosk.yml"))
+    else:
+        write(directory, "kiosk", "ui:\n  font_size: 26\n", mtime=1)
+    response = get(url, board="kiosk", **{"If-Modified-Since": overlaid.headers["Last-Modified"]})
+    assert response.status_code == 200 and "30" not in response.text
+
+
+def test_no_two_documents_share_a_date(fleet):
+    server, directory, url = fleet
+    for n in range(5):
+        write(directory, "board-%d" % n, "ui:\n  font_size: %d\n" % (20 + n))
+    dates = {get(url, board="board-%d" % n).headers["Last-Modified"] for n in range(5)}
+    assert len(dates | {get(url).headers["Last-Modified"]}) == 6
+
+
+def test_errors(fleet):
+    server, directory, url = fleet
+    assert get(url, board="../all").status_code == 400
+    os.remove(os.path.join(directory, "all.yml"))
+    assert get(url).status_code == 404
+    assert server.stats()["errors"] == 2
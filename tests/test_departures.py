@@ -0,0 +1,163 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from departures import Departure, ServiceDay, epoch_from_iso, hhmm
+
+
+def local(text: str) -> float:
+    return datetime.strptime(text, "%Y-%m-%d %H:%M").timestamp()
+
+
+def utc(text: str) -> float:
+    return datetime.strptime(text, "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize("now, feed, minutes", [
+    ("2024-03-12 08:00", "08:15", 15),
+    ("2024-03-12 23:58", "00:05", 7),            # rolls over to tomorrow
+    ("2024-03-12 23:58", "23:58", 0),
+    ("2024-03-13 00:02", "23:59", -3),           # still running from yesterday: in the past, not 24 hours away
+    ("2024-03-13 00:03", "23:55", -8),
+    ("2024-03-12 22:30", "03:10", 280),
+    ("2024-03-12 08:00", "02:00", -6 * 60),      # exactly the lookback ago: still today's
+    ("2024-03-12 08:00", "01:59", 18 * 60 - 1),  # further back, so tomorrow's
+])
+def test_resolve_around_midnight(london, now, feed, minutes):
+    start = local(now)
+    assert (ServiceDay(start).resolve(feed) - start) / 60 == minutes
+
+
+@pytest.mark.parametrize("feed, day", [
+    ("21:00", 12),   # 6 h before 03:00: yesterday's, as the lookback reaches back past midnight
+    ("20:59", 13),   # just beyond it: today's
+    ("02:00", 13),
+    ("23:59", 12),
+])
+def test_lookback_reaches_back_past_midnight(london, feed, day):
+    due = ServiceDay(local("2024-03-13 03:00")).resolve(feed)
+    assert datetime.fromtimestamp(due) == datetime(2024, 3, day, *map(int, feed.split(":")))
+
+
+@pytest.mark.parametrize("lookback, minutes", [(3600, 22 * 60 + 30), (2 * 3600, -90)])
+def test_lookback_can_be_set(london, lookback, minutes):
+    start = local("2024-03-12 08:00")
+    assert (ServiceDay(start, lookback=lookback).resolve("07:30") - start) / 60 == -30
+    assert (ServiceDay(start, lookback=lookback).resolve("06:30") - start) / 60 == minutes
+
+
+def test_rollover_lands_on_the_next_day(london):
+    due = ServiceDay(local("2024-03-12 23:58")).resolve("00:05")
+    assert datetime.fromtimestamp(due) == datetime(2024, 3, 13, 0, 5)
+
+
+def test_past_departure_stays_on_the_day_before(london):
+    due = ServiceDay(local("2024-03-13 00:02")).resolve("23:59")
+    assert datetime.fromtimestamp(due) == datetime(2024, 3, 12, 23, 59)
+
+
+# Europe/London springs forward at 01:00 GMT on 2024-03-31 (01:00 becomes 02:00 BST).
+@pytest.mark.parametrize("now, feed, minutes", [
+    ("2024-03-31 00:50", "02:10", 20),           # 00:50 GMT to 02:10 BST
+    ("2024-03-31 00:50", "01:30", 40),           # skipped time: taken as 02:30 BST
+    ("2024-03-30 23:50", "00:20", 30),
+    ("2024-03-31 03:00", "00:30", -90),          # 00:30 GMT was an hour and a half before 03:00 BST
+])
+def test_resolve_spring_forward(london, now, feed, minutes):
+    start = local(now)
+    assert (ServiceDay(start).resolve(feed) - start) / 60 == minutes
+
+
+def test_spring_forward_times_are_bst(london):
+    day = ServiceDay(utc("2024-03-31 00:50"))
+    assert day.resolve("02:10") == utc("2024-03-31 01:10")
+    assert day.resolve("00:55") == utc("2024-03-31 00:55")
+
+
+# Europe/London falls back at 02:00 BST on 2024-10-27 (01:00-02:00 happens twice).
+@pytest.mark.parametrize("now, feed, minutes", [
+    ("2024-10-27 00:50", "01:20", 30),           # repeated time: its first (BST) occurrence
+    ("2024-10-27 00:50", "02:10", 140),          # 02:10 GMT, after the extra hour
+    ("2024-10-26 23:55", "00:10", 15),
+])
+def test_resolve_fall_back(london, now, feed, minutes):
+    start = local(now)
+    assert (ServiceDay(start).resolve(feed) - start) / 60 == minutes
+
+
+def test_fall_back_times(london):
+    day = ServiceDay(utc("2024-10-27 00:10"))  # 01:10 BST
+    assert day.resolve("01:20") == utc("2024-10-27 00:20")
+    assert day.resolve("02:10") == utc("2024-10-27 02:10")
+
+
+@pytest.mark.parametrize("text", ["On time", "Delayed", None, "", "25:00", "12:60", "1200"])
+def test_resolve_non_times(london, text):
+    assert ServiceDay(local("2024-03-12 08:00")).resolve(text) is None
+
+
+@pytest.mark.parametrize("moment, expected", [
+    ("2024-03-12 23:59", "23:59"),
+    ("2024-03-13 00:00", "00:00"),
+    ("2024-03-31 00:59", "00:59"),               # GMT
+    ("2024-03-31 01:00", "02:00"),               # BST from here
+    ("2024-10-27 00:30", "01:30"),               # BST
+    ("2024-10-27 01:30", "01:30"),               # GMT: the same wall time an hour later
+])
+def test_hhmm_across_midnight_and_dst(london, moment, expected):
+    assert hhmm(utc(moment)) == expected
+
+
+def test_hhmm_twelve_hour(london):
+    assert hhmm(utc("2024-01-05 13:05"), time_format=12) == "01:05"
+    assert hhmm(utc("2024-01-05 13:05")) == "13:05"
+
+
+def test_departure_times_read_as_the_old_strings(london):
+    row = Departure(ID="1", Destination="Oxford", Scheduled=utc("2024-01-05 10:42"), Expected=utc("2024-01-05 10:47"))
+    assert (row.SchArrival, row.ExptArrival) == ("10:42", "10:47")
+    assert row.due() == utc("2024-01-05 10:47")
+    assert row.minutes_until(utc("2024-01-05 10:40")) == 7
+
+
+def test_departure_status_replaces_the_expected_time(london):
+    row = Departure(Scheduled=utc("2024-01-05 10:42"), Status="Delayed")
+    assert row.ExptArrival == "Delayed"
+    assert row.due() == utc("2024-01-05 10:42")
+
+
+def test_departure_without_times():
+    row = Departure()
+    assert (row.SchArrival, row.ExptArrival, row.due()) == ("--:--", "--:--", None)
+
+
+def test_departure_reads_and_writes_like_the_old_dicts(london):
+    row = Departure(ID="7", Destination="Bath", Scheduled=utc("2024-01-05 09:00"), Platforms="2")
+    assert row["ExptArrival"] == "09:00"
+    assert row.get("Platforms") == "2"
+    assert row.get("Nowhere", "-") == "-"
+    assert "SchArrival" in row and "Nowhere" not in row
+    row["Index"] = 3
+    assert row.Index == 3
+    assert list(row.as_dict()) == list(Departure.FIELDS)
+    with pytest.raises(KeyError):
+        row["SchArrival"] = "10:00"
+    with pytest.raises(KeyError):
+        row["Nowhere"]
+
+
+def test_departure_is_slotted():
+    with pytest.raises(AttributeError):
+        Departure().Via = "Reading"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024-03-12T08:15:30Z", utc("2024-03-12 08:15") + 30),
+    ("2024-03-12T08:15:30", utc("2024-03-12 08:15") + 30),          # no offset: UTC
+    ("2024-06-12T09:15:00+01:00", utc("2024-06-12 08:15")),
+    ("2024-03-12T08:15:30.5Z", utc("2024-03-12 08:15") + 30),
+    ("not a time", None),
+    (None, None),
+])
+def test_epoch_from_iso(text, expected):
+    assert epoch_from_iso(text) == expected
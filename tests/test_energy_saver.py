@@ -0,0 +1,51 @@
+from datetime import datetime, time
+
+import pytest
+
+from energy_saver import EnergySaver
+
+
+def at(text: str) -> datetime:
+    return datetime.strptime("2024-03-12 " + text, "%Y-%m-%d %H:%M:%S.%f" if "." in text else "%Y-%m-%d %H:%M:%S")
+
+
+@pytest.mark.parametrize("now, phase", [
+    ("22:59:59.999", "active"),
+    ("23:00:00", "inactive"),
+    ("03:00:00", "inactive"),
+    ("06:57:59.999", "inactive"),
+    ("06:58:00", "warming"),         # exactly the warm-up before the end
+    ("06:59:59.999", "warming"),
+    ("07:00:00", "active"),          # the end is not inactive
+])
+def test_phases_across_midnight(now, phase):
+    assert EnergySaver(time(23, 0), time(7, 0)).phase(at(now)) == phase
+
+
+@pytest.mark.parametrize("now, phase", [
+    ("00:59:59", "active"),
+    ("01:00:00", "inactive"),
+    ("04:54:59", "inactive"),
+    ("04:55:00", "warming"),
+    ("05:00:00", "active"),
+    ("23:00:00", "active"),
+])
+def test_phases_within_a_day(now, phase):
+    assert EnergySaver(time(1, 0), time(5, 0), warmup=300).phase(at(now)) == phase
+
+
+def test_a_warm_up_longer_than_the_inactive_hours_warms_throughout():
+    saver = EnergySaver(time(23, 0), time(23, 1))
+    assert [saver.phase(at(t)) for t in ("22:59:59", "23:00:00", "23:00:59", "23:01:00")] == [
+        "active", "warming", "warming", "active"]
+
+
+def test_no_warm_up():
+    saver = EnergySaver(time(23, 0), time(7, 0), warmup=0)
+    assert saver.phase(at("06:59:59.999")) == "inactive"
+    assert saver.phase(at("07:00:00")) == "active"
+
+
+def test_equal_times_are_never_active():
+    saver = EnergySaver(time(7, 0), time(7, 0))
+    assert all(saver.phase(at("%02d:%02d:00" % (h, m))) != "active" for h in range(24) for m in (0, 30, 59))
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from frame_diff import _GREY_WEIGHTS, DirtyRegionFramebuffer, quantise
+
+
+def frame(*boxes, fill="white"):
+    image = Image.new("RGB", (256, 64))
+    draw = ImageDraw.Draw(image)
+    for box in boxes:
+        draw.rectangle(box, fill=fill)
+    return image
+
+
+def packed_levels(image: Image.Image) -> bytes:
+    """The level PackedSSD1322.pack sends for each pixel, one byte a pixel."""
+    r, g, b = _GREY_WEIGHTS
+    rgb = image.convert("RGB").tobytes()
+    return bytes((rgb[i] * r + rgb[i + 1] * g + rgb[i + 2] * b) >> 14 for i in range(0, len(rgb), 3))
+
+
+@pytest.mark.parametrize("mode", ["RGB", "L", "1"])
+def test_quantise_matches_the_packer(mode):
+    image = Image.frombytes("RGB", (256, 64), random.Random(0).randbytes(256 * 64 * 3)).convert(mode)
+    assert quantise(image).tobytes() == packed_levels(image)
+
+
+def test_quantise_follows_the_packer_where_pil_rounds_differently():
+    # convert("L") makes this grey 16, level 1; the packer sends level 0.
+    image = Image.new("RGB", (1, 1), (16, 16, 12))
+    assert quantise(image).tobytes() == packed_levels(image) == bytes([0])
+
+
+def test_first_frame_is_sent_whole():
+    framebuffer = DirtyRegionFramebuffer()
+    assert list(framebuffer.redraw(frame((0, 0, 10, 10))))[0][1] == (0, 0, 256, 64)
+    assert framebuffer.full_frames == 1
+
+
+def test_unchanged_frame_sends_nothing():
+    framebuffer = DirtyRegionFramebuffer()
+    list(framebuffer.redraw(frame((0, 0, 10, 10))))
+    assert list(framebuffer.redraw(frame((0, 0, 10, 10)))) == []
+    assert framebuffer.skipped_frames == 1
+
+
+def test_change_below_the_panel_depth_sends_nothing():
+    framebuffer = DirtyRegionFramebuffer()
+    list(framebuffer.redraw(frame((0, 0, 10, 10), fill=(32, 32, 32))))
+    assert framebuffer.dirty_windows(frame((0, 0, 10, 10), fill=(47, 47, 47))) == []
+
+
+def test_changed_rows_are_trimmed_to_aligned_columns():
+    framebuffer = DirtyRegionFramebuffer()
+    list(framebuffer.redraw(frame()))
+    assert framebuffer.dirty_windows(frame((21, 17, 30, 20))) == [(20, 16, 32, 24)]
+
+
+def test_adjacent_bands_merge_into_one_window():
+    framebuffer = DirtyRegionFramebuffer()
+    list(framebuffer.redraw(frame()))
+    assert framebuffer.dirty_windows(frame((8, 4, 11, 12), (40, 13, 43, 14))) == [(8, 0, 44, 16)]
+
+
+def test_large_change_falls_back_to_a_full_frame():
+    framebuffer = DirtyRegionFramebuffer()
+    list(framebuffer.redraw(frame()))
+    assert framebuffer.dirty_windows(frame((0, 0, 255, 50))) is None
+
+
+def test_invalidate_resends_everything():
+    framebuffer = DirtyRegionFramebuffer()
+    list(framebuffer.redraw(frame()))
+    framebuffer.invalidate()
+    assert framebuffer.dirty_windows(frame()) is None
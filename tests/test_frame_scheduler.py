@@ -0,0 +1,152 @@
+import pytest
+
+from frame_scheduler import FrameScheduler, TickClock
+
+
+class FakeClock:
+    """A monotonic clock that only moves when slept on, or when the test moves it."""
+
+    def __init__(self, now: float = 100.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(round(seconds, 6))
+        self.now += seconds
+
+
+def scheduler(**kwargs) -> tuple[FrameScheduler, FakeClock]:
+    clock = FakeClock()
+    return FrameScheduler(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+def test_first_wait_does_not_sleep():
+    frames, clock = scheduler()
+    assert frames.wait() == 1
+    assert clock.slept == []
+
+
+def test_waits_sleep_to_the_next_deadline():
+    frames, clock = scheduler(interval=0.02)
+    frames.wait()
+    clock.now += 0.005  # the frame took 5ms to render
+    assert frames.wait() == 1
+    assert clock.slept == [0.015]
+
+
+def test_late_frames_report_the_ticks_missed():
+    frames, clock = scheduler(interval=0.02)
+    frames.wait()
+    clock.now += 0.065  # past the deadlines at 20, 40 and 60ms
+    assert frames.wait() == 3
+    assert clock.slept == []
+
+
+def test_stalls_drop_the_backlog_instead_of_bursting():
+    frames, clock = scheduler(interval=0.02, max_catchup=5)
+    frames.wait()
+    clock.now += 1.0
+    assert frames.wait() == 6
+    assert frames.stats()["dropped"] == 44
+    # The grid restarts from now rather than trying to catch up the dropped ticks.
+    assert frames.wait() == 1
+    assert clock.slept == [0.02]
+
+
+def test_defer_sleeps_through_idle_ticks():
+    frames, clock = scheduler(interval=0.02)
+    frames.wait()
+    frames.defer(10)
+    assert frames.wait() == 11
+    assert clock.slept == [0.22]
+
+
+def test_defer_counts_nominal_ticks_whatever_the_interval():
+    # As the render governor does at reduced_fps: frames every 40ms, idle waits still in 20ms ticks.
+    frames, clock = scheduler(interval=0.02)
+    frames.wait()
+    frames.interval = 0.04
+    frames.wait()
+    clock.slept.clear()
+    frames.defer(10)
+    frames.wait()
+    assert clock.slept == [0.24]  # the 40ms frame and 10 ticks of 20ms
+
+
+@pytest.mark.parametrize("ticks, wake_at, slept", [
+    (None, None, 1.02),    # no bound but max_idle past the next deadline
+    (1000, None, 1.02),
+    (1000, 100.3, 0.3),    # a clock change comes first
+    (1000, 100.01, 0.02),  # but never before the next deadline
+    (-5, None, 0.02),
+])
+def test_defer_is_bounded(ticks, wake_at, slept):
+    frames, clock = scheduler(interval=0.02, max_idle=1.0)
+    frames.wait()
+    frames.defer(ticks, wake_at)
+    frames.wait()
+    assert clock.slept == [slept]
+
+
+def test_sleep_until_goes_past_max_idle():
+    frames, clock = scheduler(interval=0.02, max_idle=1.0)
+    frames.wait()
+    frames.sleep_until(clock.now + 60)
+    frames.wait()
+    assert clock.slept == [60.0]
+
+
+def test_defer_before_the_first_wait_is_ignored():
+    frames, clock = scheduler()
+    frames.defer(10)
+    assert frames.wait() == 1
+    assert clock.slept == []
+
+
+def test_stats_and_report():
+    frames, clock = scheduler(interval=0.5, report_every=2.0)
+    for rendered in (True, True, False, True):
+        frames.wait()
+        frames.frame(rendered)
+    assert frames.report() is None
+    clock.now += 0.5
+    stats = frames.stats()
+    assert (stats["rendered"], stats["skipped"], stats["fps"], stats["idle_pct"]) == (3, 1, 1.5, 75.0)
+    assert frames.report() == "Frames: 1.5 fps, 75% idle, 1 skipped, 0 dropped"
+    assert frames.stats()["rendered"] == 0
+
+
+def test_tick_clock_counts_ticks_at_its_rate():
+    clock = FakeClock()
+    ticks = TickClock(rate=50.0, clock=clock)
+    assert ticks.step() == 1.0
+    for elapsed, step in ((0.02, 1.0), (0.05, 2.5), (0.0, 0.0), (0.1, 5.0)):
+        clock.now += elapsed
+        assert ticks.step() == step
+
+
+def test_tick_clock_caps_a_stall():
+    clock = FakeClock()
+    ticks = TickClock(rate=50.0, max_step=50.0, clock=clock)
+    ticks.step()
+    clock.now += 30
+    assert ticks.step() == 50.0
+
+
+def test_tick_clock_rounds_away_jitter():
+    clock = FakeClock()
+    ticks = TickClock(rate=50.0, clock=clock)
+    ticks.step()
+    clock.now += 0.0200001
+    assert ticks.step() == 1.0
+
+
+def test_tick_clock_never_goes_backwards():
+    clock = FakeClock()
+    ticks = TickClock(clock=clock)
+    ticks.step()
+    clock.now -= 1
+    assert ticks.step() == 0.0
@@ -0,0 +1,47 @@
+import pytest
+from luma.oled.device import ssd1322
+
+import oled_device
+from frame_diff import DirtyRegionFramebuffer
+
+
+class Serial:
+    """Stands in for the SPI interface; throws away what is sent."""
+
+    def command(self, *cmd):
+        pass
+
+    def data(self, data):
+        pass
+
+    def cleanup(self):
+        pass
+
+
+@pytest.fixture
+def spi(monkeypatch):
+    monkeypatch.setattr(oled_device, "spi", lambda **kwargs: Serial())
+    monkeypatch.delenv("OLED_ACCELERATED", raising=False)
+
+
+def test_ssd1322_is_stock_unless_asked(spi):
+    device = oled_device.create_device(driver="ssd1322", width=128, height=32, rotate=2)
+    assert type(device) is ssd1322
+    assert (device.width, device.height, device.rotate) == (128, 32, 2)
+    assert isinstance(device.framebuffer, DirtyRegionFramebuffer)
+
+
+@pytest.mark.parametrize("accelerated, env", [(True, None), (None, "1")])
+def test_accelerated_ssd1322_packs_with_numpy(spi, monkeypatch, accelerated, env):
+    pytest.importorskip("numpy")
+    if env:
+        monkeypatch.setenv("OLED_ACCELERATED", env)
+    device = oled_device.create_device(driver="ssd1322", accelerated=accelerated)
+    assert type(device) is oled_device.PackedSSD1322
+    assert isinstance(device.framebuffer, DirtyRegionFramebuffer)
+
+
+def test_accelerated_falls_back_without_numpy(spi, monkeypatch, capsys):
+    monkeypatch.setattr(oled_device, "_numpy", lambda: None)
+    assert type(oled_device.create_device(driver="ssd1322", accelerated=True)) is ssd1322
+    assert "numpy is not installed" in capsys.readouterr().out
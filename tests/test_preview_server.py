@@ -0,0 +1,94 @@
+import base64
+import io
+import json
+
+import pytest
+import requests
+from luma.core.device import dummy
+from PIL import Image, ImageDraw
+
+from preview_server import PreviewServer
+
+
+def frame(*boxes):
+    image = Image.new("RGB", (256, 64))
+    draw = ImageDraw.Draw(image)
+    for box in boxes:
+        draw.rectangle(box, fill="white")
+    return image
+
+
+def event(data: bytes) -> dict:
+    assert data.startswith(b"data: ") and data.endswith(b"\n\n")
+    return json.loads(data[len(b"data: "):])
+
+
+def test_nothing_is_published_before_the_first_frame():
+    assert PreviewServer().latest() == (0, None)
+
+
+def test_attach_publishes_what_the_device_displays():
+    device = dummy(width=256, height=64, mode="RGB")
+    preview = PreviewServer()
+    preview.attach(device)
+    image = frame((0, 0, 9, 9))
+    device.display(image)
+    assert preview.latest() == (1, image)
+    assert device.image.tobytes() == image.tobytes()
+
+
+def test_only_the_last_frames_are_kept():
+    preview = PreviewServer(history=2)
+    for _ in range(3):
+        preview.publish(frame())
+    # Frame 1 has gone, so a client still on it gets the whole of frame 3.
+    assert event(preview.delta(1, 3, preview.latest()[1]))["key"] is True
+
+
+def test_delta_sends_only_the_changed_box():
+    preview = PreviewServer()
+    first, second = frame((0, 0, 9, 9)), frame((0, 0, 9, 9), (100, 20, 109, 29))
+    preview.publish(first)
+    preview.publish(second)
+    key = event(preview.delta(None, 1, first))
+    assert (key["key"], key["box"]) == (True, [0, 0, 256, 64])
+    change = event(preview.delta(1, 2, second))
+    assert (change["key"], change["box"]) == (False, [100, 20, 110, 30])
+    crop = Image.open(io.BytesIO(base64.b64decode(change["png"])))
+    assert crop.tobytes() == second.crop((100, 20, 110, 30)).tobytes()
+
+
+def test_an_unchanged_frame_has_no_delta():
+    preview = PreviewServer()
+    preview.publish(frame((0, 0, 9, 9)))
+    preview.publish(frame((0, 0, 9, 9)))
+    assert preview.delta(1, 2, preview.latest()[1]) is None
+
+
+def test_each_frame_is_encoded_once_per_format():
+    preview = PreviewServer()
+    image = frame((0, 0, 9, 9))
+    preview.publish(image)
+    assert preview.png(1, image) is preview.png(1, image)
+    preview.jpeg(1, image)
+    assert preview.stats()["encodes"] == 2
+
+
+@pytest.fixture
+def served():
+    preview = PreviewServer(port=0, host="127.0.0.1")
+    preview.start()
+    yield preview, "http://%s:%d" % preview.address
+    preview.stop()
+
+
+def test_frame_png(served):
+    preview, url = served
+    assert requests.get(url + "/frame.png", timeout=5).status_code == 503
+    image = frame((0, 0, 9, 9))
+    preview.publish(image)
+    response = requests.get(url + "/frame.png", timeout=5)
+    assert response.status_code == 200 and response.headers["ETag"] == '"1"'
+    assert Image.open(io.BytesIO(response.content)).convert("RGB").tobytes() == image.tobytes()
+    assert requests.get(url + "/frame.png", headers={"If-None-Match": '"1"'}, timeout=5).status_code == 304
+    assert requests.get(url + "/missing", timeout=5).status_code == 404
@@ -0,0 +1,130 @@
+import pytest
+
+from render_governor import RenderGovernor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_governor(**kwargs) -> tuple[RenderGovernor, FakeClock]:
+    clock = FakeClock()
+    return RenderGovernor(interval=0.02, window=10, clock=clock, **kwargs), clock
+
+
+def window(governor: RenderGovernor, seconds: float, slow: int = 10, fast: float = 0.001):
+    """Records one window: `slow` frames taking `seconds`, the rest `fast`; returns the last record()'s result."""
+    result = None
+    for n in range(governor.window):
+        result = governor.record(seconds if n < slow else fast)
+    return result
+
+
+def test_starts_at_full_quality():
+    governor, _ = make_governor()
+    assert (governor.name, governor.interval, governor.partial_animations, governor.freeze_scrolling) == (
+        "full", 0.02, False, False)
+
+
+def test_only_judges_whole_windows():
+    governor, _ = make_governor()
+    for _ in range(9):
+        assert governor.record(1.0) is None
+    assert governor.level == 0
+    assert governor.record(1.0) is not None
+    assert governor.level == 1
+
+
+@pytest.mark.parametrize("slow, level", [(2, 0), (3, 1)])
+def test_steps_down_at_the_overrun_share(slow, level):
+    governor, _ = make_governor(overrun_share=0.25)
+    window(governor, 0.021, slow=slow)
+    assert governor.level == level
+
+
+def test_frames_on_the_budget_are_not_overruns():
+    governor, _ = make_governor()
+    window(governor, 0.02)
+    assert governor.level == 0
+
+
+def test_steps_down_one_level_at_a_time_to_frozen():
+    governor, _ = make_governor()
+    expected = [("reduced_fps", 0.04, False, False), ("partial", 0.04, True, False), ("frozen", 0.04, True, True),
+                ("frozen", 0.04, True, True)]
+    for name, interval, partial, frozen in expected:
+        window(governor, 1.0)
+        assert (governor.name, governor.interval, governor.partial_animations, governor.freeze_scrolling) == (
+            name, interval, partial, frozen)
+    assert governor.steps_down == 3
+
+
+def test_the_budget_follows_the_level():
+    # 30ms frames overrun 20ms, but fit the 40ms of reduced_fps.
+    governor, _ = make_governor()
+    window(governor, 0.03)
+    window(governor, 0.03)
+    assert governor.name == "reduced_fps"
+
+
+def test_steps_up_only_after_the_hold():
+    governor, clock = make_governor(hold=60.0)
+    window(governor, 1.0)
+    clock.now = 59.0
+    assert window(governor, 0.001) is None
+    clock.now = 60.0
+    assert window(governor, 0.001).startswith("Render governor: up level=0 quality=full")
+    assert governor.level == 0
+
+
+@pytest.mark.parametrize("p90, level", [(0.0119, 0), (0.012, 1)])
+def test_restoring_full_needs_headroom_in_its_own_budget(p90, level):
+    # From reduced_fps the frames must fit 60% of full's 20ms, not of the 40ms they run at now.
+    governor, clock = make_governor(hold=60.0, headroom=0.6)
+    window(governor, 1.0)
+    clock.now = 60.0
+    window(governor, p90)
+    assert governor.level == level
+
+
+def test_a_restore_undone_straight_away_doubles_the_hold():
+    governor, clock = make_governor(hold=60.0, max_hold=200.0)
+    window(governor, 1.0)
+    clock.now = 60.0
+    window(governor, 0.001)
+    clock.now = 70.0
+    assert "hold_s=120" in window(governor, 1.0)
+    clock.now = 180.0
+    window(governor, 0.001)
+    assert governor.level == 1
+    clock.now = 190.0
+    window(governor, 0.001)
+    assert governor.level == 0
+    clock.now = 200.0
+    window(governor, 1.0)
+    assert governor.hold == 200.0
+
+
+def test_a_steady_restore_forgets_the_backoff():
+    governor, clock = make_governor(hold=60.0)
+    window(governor, 1.0)
+    clock.now = 60.0
+    window(governor, 0.001)
+    clock.now = 70.0
+    window(governor, 1.0)
+    clock.now = 190.0
+    window(governor, 0.001)
+    assert governor.hold == 120.0
+    clock.now = 310.0
+    window(governor, 0.001)
+    assert governor.hold == 60.0
+
+
+def test_disabled():
+    governor, _ = make_governor(enabled=False)
+    assert window(governor, 1.0) is None
+    assert governor.level == 0
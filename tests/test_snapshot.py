@@ -0,0 +1,92 @@
+import os
+
+import pytest
+
+from departures import Departure
+from snapshot import Snapshot
+
+NOW = 1710230400.0  # 2024-03-12 08:00 UTC
+
+
+class RailService(Departure):
+    __slots__ = ("DisplayTime",)
+
+
+def services():
+    return [Departure(ID=str(n), Destination="Stop %d" % n, Scheduled=int(NOW) + 600 * n, Index=n + 1)
+            for n in range(4)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "board" / "rail.json")
+
+
+def test_round_trip(path):
+    Snapshot(path, {"StationID": "WNC"}).save(services(), {"StationName": "Windsor"}, now=NOW)
+    loaded, extra = Snapshot(path, {"StationID": "WNC"}).load(Departure, now=NOW)
+    assert [s.as_dict() for s in loaded] == [s.as_dict() for s in services()]
+    assert extra == {"StationName": "Windsor"}
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_departed_services_are_dropped(path):
+    Snapshot(path).save(services(), now=NOW)
+    loaded, _ = Snapshot(path).load(Departure, now=NOW + 601)
+    assert [s.ID for s in loaded] == ["2", "3"]
+
+
+@pytest.mark.parametrize("age", [3601, -60])
+def test_stale_or_future_snapshots_are_ignored(path, age):
+    Snapshot(path, max_age=3600).save(services(), now=NOW)
+    assert Snapshot(path, max_age=3600).load(Departure, now=NOW + age) == ([], {})
+
+
+def test_other_settings_are_ignored(path):
+    Snapshot(path, {"StationID": "WNC"}).save(services(), now=NOW)
+    assert Snapshot(path, {"StationID": "PAD"}).load(Departure, now=NOW) == ([], {})
+
+
+def test_runtime_settings_keep_the_snapshot(path):
+    Snapshot(path, {"StationID": "WNC", "Display": "ssd1322"}).save(services(), now=NOW)
+    loaded, _ = Snapshot(path, {"StationID": "WNC", "Display": "pygame"}).load(Departure, now=NOW)
+    assert len(loaded) == 4
+
+
+def test_settings_are_not_written_out(path):
+    Snapshot(path, {"APIToken": "secret-token"}).save(services(), now=NOW)
+    with open(path, encoding="utf-8") as f:
+        assert "secret-token" not in f.read()
+
+
+def test_a_different_record_is_ignored(path):
+    Snapshot(path).save(services(), now=NOW)
+    assert Snapshot(path).load(RailService, now=NOW) == ([], {})
+
+
+def test_subclass_slots_round_trip(path):
+    saved = RailService(ID="1", Scheduled=int(NOW) + 60)
+    saved.DisplayTime = " 1 min"
+    Snapshot(path).save([saved], now=NOW)
+    loaded, _ = Snapshot(path).load(RailService, now=NOW)
+    assert (type(loaded[0]), loaded[0].DisplayTime) == (RailService, " 1 min")
+
+
+def test_unchanged_services_are_not_written_again(path):
+    snapshot = Snapshot(path)
+    snapshot.save(services(), now=NOW)
+    os.utime(path, ns=(0, 0))
+    snapshot.save(services(), now=NOW + 60)
+    assert os.stat(path).st_mtime_ns == 0
+
+
+@pytest.mark.parametrize("content", ["", "{not json", "[]", '{"key": null}'])
+def test_unreadable_snapshots_are_ignored(path, content):
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    assert Snapshot(path).load(Departure, now=NOW) == ([], {})
+
+
+def test_missing_snapshot(path):
+    assert Snapshot(path).load(Departure, now=NOW) == ([], {})
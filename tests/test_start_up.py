@@ -0,0 +1,91 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+from luma.core.device import dummy
+
+
+@pytest.fixture(params=["NationalRailPy3", "NationalBusesPy3", "LondonUndergroundPy3"])
+def board(request, monkeypatch):
+    module = importlib.import_module(request.param)
+    monkeypatch.setattr(module, "device", dummy(width=256, height=64), raising=False)
+    return module
+
+
+def splash(board, monkeypatch, reachable=True, data=(), timeout=0.2):
+    """Runs the board's Splash() against a network that is (or is not) reachable and a feed giving `data`."""
+    fetches = []
+    monkeypatch.setattr(board, "Args", SimpleNamespace(SplashScreen=True, SplashTimeout=timeout))
+    monkeypatch.setattr(board, "reachable", lambda host: reachable)
+    monkeypatch.setattr(board.LiveTime, "GetData", staticmethod(lambda: fetches.append(1) or list(data)))
+    return board.Splash(), len(fetches)
+
+
+def test_no_splash_screen_fetches_nothing(board, monkeypatch):
+    monkeypatch.setattr(board, "Args", SimpleNamespace(SplashScreen=False, SplashTimeout=30))
+    assert board.Splash() is None
+
+
+def test_unreachable_network_times_out_with_nothing_fetched(board, monkeypatch):
+    assert splash(board, monkeypatch, reachable=False) == (None, 0)
+
+
+def test_an_empty_fetch_is_kept_when_the_time_runs_out(board, monkeypatch):
+    # [] is a fetch that found no services; the board starts from it rather than fetching again. One fetch straight away
+    # and a last one as the time runs out.
+    assert splash(board, monkeypatch) == ([], 2)
+
+
+def test_the_splash_ends_with_the_first_data(board, monkeypatch):
+    assert splash(board, monkeypatch, data=["service"], timeout=30) == (["service"], 1)
+
+
+class Fetch:
+    """Stands in for a BackgroundFetch, finished or still out."""
+
+    def __init__(self, result=None, done=True):
+        self._result, self._done = result, done
+
+    def done(self):
+        return self._done
+
+    def result(self):
+        return self._result if self._done else None
+
+
+@pytest.fixture
+def start(board, monkeypatch):
+    """StartBoard() with the board, snapshot, splash and background fetch stubbed; returns what the board was built from."""
+    monkeypatch.setattr(board, "Args", SimpleNamespace(Delay=0), raising=False)
+    monkeypatch.setattr(board, "image_composition", None, raising=False)
+    monkeypatch.setattr(board, "boardFixed", lambda composition, delay, device, **kwargs: kwargs)
+    monkeypatch.setattr(board, "Splash", lambda: ["splash"])
+    monkeypatch.setattr(board, "BackgroundFetch", lambda fetch: "refresh")
+
+    def start(warming=None, saved=()):
+        monkeypatch.setattr(board.LiveTime, "FromSnapshot", staticmethod(lambda: list(saved)))
+        return board.StartBoard(warming)
+    return start
+
+
+def test_a_cold_start_waits_on_the_splash_screen(start):
+    assert start() == {"services": ["splash"]}
+
+
+def test_a_cold_start_shows_the_snapshot_while_it_fetches(start):
+    assert start(saved=["saved"]) == {"services": ["saved"], "pending": "refresh"}
+
+
+def test_waking_with_the_warm_up_data_starts_from_it(start):
+    assert start(Fetch(["warm"]), saved=["saved"]) == {"services": ["warm"]}
+
+
+def test_waking_while_the_warm_up_fetch_is_out_waits_for_it_without_the_splash(start):
+    warming = Fetch(done=False)
+    assert start(warming, saved=["saved"]) == {"services": ["saved"], "pending": warming}
+    assert start(warming) == {"services": [], "pending": warming}
+
+
+def test_a_warm_up_that_found_nothing_is_not_fetched_again(start):
+    warming = Fetch([])
+    assert start(warming) == {"services": [], "pending": warming}
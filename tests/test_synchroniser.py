@@ -0,0 +1,50 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture(params=["NationalRailPy3", "NationalBusesPy3", "LondonUndergroundPy3"])
+def synchroniser(request):
+    return importlib.import_module(request.param).Synchroniser()
+
+
+class Row:
+    pass
+
+
+def test_new_rows_do_not_hold_the_board_up(synchroniser):
+    assert synchroniser.is_synchronised()
+    synchroniser.ready(Row())
+    assert synchroniser.is_synchronised()
+
+
+def test_synchronised_once_every_busy_row_is_ready(synchroniser):
+    rows = [Row(), Row(), Row()]
+    for row in rows:
+        synchroniser.busy(row)
+    for row in rows:
+        assert not synchroniser.is_synchronised()
+        synchroniser.ready(row)
+    assert synchroniser.is_synchronised()
+
+
+def test_repeated_calls_are_counted_once(synchroniser):
+    row = Row()
+    synchroniser.busy(row)
+    synchroniser.busy(row)
+    synchroniser.ready(row)
+    assert synchroniser.is_synchronised()
+    synchroniser.ready(row)
+    assert synchroniser.busyCount == 0
+
+
+def test_forgetting_a_busy_row_releases_it(synchroniser):
+    busy, idle = Row(), Row()
+    synchroniser.busy(busy)
+    synchroniser.ready(idle)
+    synchroniser.forget(idle)
+    assert not synchroniser.is_synchronised()
+    synchroniser.forget(busy)
+    assert synchroniser.is_synchronised()
+    synchroniser.forget(busy)
+    assert synchroniser.busyCount == 0
@@ -4,25 +4,20 @@ Place that file alongside this one (or ensure it's importable).
 """
 
 from __future__ import annotations
-import datetime as dt
 import typing as t
 
 import LondonUndergroundPy3 as LU  # ensure this is in your repo / PYTHONPATH
+from departures import Departure, epoch_from_iso
 
 class TubeLegacyAdapterError(Exception):
     pass
 
-def tube_legacy_as_livetimes(*, stop_point_id: str, app_id: str, app_key: str, limit: int = 12) -> list[dict]:
+def tube_legacy_as_livetimes(*, stop_point_id: str, app_id: str, app_key: str, limit: int = 12) -> list[Departure]:
     """
-    Expect LondonUndergroundPy3.py to expose a callable that returns arrivals for a StopPoint.
-    If your version is different, tweak this call accordingly.
+    Fetches arrivals for a StopPoint through LondonUndergroundPy3.GetArrivals
+    (importing the board script has no side effects; it only runs via run()).
     """
     try:
-        # Adjust this line if your copy exposes a slightly different API.
-        # Options to try if needed:
-        #   LU.GetArrivals(stop_point_id, app_id, app_key)
-        #   LU.getArrivals(stop_point_id, app_id, app_key)
-        #   LU.fetch_arrivals(stop_point_id, app_id, app_key)
         raw = LU.GetArrivals(stop_point_id, app_id, app_key)
     except AttributeError as e:
         raise TubeLegacyAdapterError(
@@ -38,29 +33,27 @@ def tube_legacy_as_livetimes(*, stop_point_id: str, app_id: str, app_key: str, l
             break
     return rows
 
-def _map_one(item: t.Any, index: int) -> dict:
-    """Map one item to the unified dict shape used by the board renderer."""
+def _map_one(item: t.Any, index: int) -> Departure:
+    """Map one item to the unified Departure record used by the board renderer."""
     destination = _get(item, "Destination", "destinationName", default="")
     expected_iso = _get(item, "Expected", "expectedArrival", default="")
     platform = _get(item, "Platform", "platformName", default="-")
     line = _get(item, "Line", "lineName", "lineId", default="Underground")
     direction = _get(item, "Direction", "direction", default="")
-    expt_hhmm = _iso_to_hhmm(expected_iso)
     ident = _get(item, "Id", "id", "vehicleId", default=f"{line}-{index}")
 
-    return {
-        "Index": index,
-        "ID": str(ident),
-        "Operator": "London Underground",
-        "Destination": destination,
-        "SchArrival": "--:--",
-        "ExptArrival": expt_hhmm,
-        "CallingAt": "",
-        "Platforms": platform,
-        "IsCancelled": False,
-        "DisruptionReason": "",
-        "DisplayText": f"{line} {direction}".strip(),
-    }
+    return Departure(
+        Index=index,
+        ID=str(ident),
+        Operator="London Underground",
+        Destination=destination,
+        Expected=epoch_from_iso(expected_iso) if expected_iso else None,
+        CallingAt="",
+        Platforms=platform,
+        IsCancelled=False,
+        DisruptionReason="",
+        DisplayText=f"{line} {direction}".strip(),
+    )
 
 def _get(obj: t.Any, *names: str, default=None):
     for n in names:
@@ -75,11 +68,3 @@ def _get(obj: t.Any, *names: str, default=None):
             if v is not None:
                 return v
     return default
-
-def _iso_to_hhmm(s: str) -> str:
-    if not s:
-        return "--:--"
-    try:
-        return dt.datetime.fromisoformat(s.replace("Z", "+00:00")).astimezone().strftime("%H:%M")
-    except Exception:
-        return "--:--"